@@ -4,6 +4,15 @@ from scripts.arbitrage_engine import ArbitrageEngine
 from scripts.execution.engine import ExecutionEngine
 from scripts.connectors.cex import CEXConnector
 from scripts.backtesting.backtest import BacktestEngine
+from scripts.feeds.scheduler import PollingScheduler
+from scripts.connectors.markets_cache import MarketMetadataCache
+from scripts.feeds.recorder import MarketDataRecorder
+from scripts.detection.venues import VenueGraph
+from scripts.detection.topk import select_top
+from scripts.detection.sharding import ShardedDetector
+from scripts.detection.spreads import SpreadTracker
+from scripts.simulator import exchange as simulator
+import time
 import asyncio
 from typing import List, Dict
 from websockets.exceptions import ConnectionClosed
@@ -13,33 +22,10 @@ from api.models import ArbitrageRequest, ArbitrageOpportunity, TriangularArbitra
 import yaml
 
 import logging
-from logging.handlers import RotatingFileHandler
-from pythonjsonlogger import jsonlogger
+from core.logs import configure_logging
 
-log_file = "arbitron.log"
-max_bytes = 10 * 1024 * 1024  # 10 MB
-backup_count = 5
-
-# Configurar o logger principal
+# Os handlers ficam no listener configurado em BotState.load_settings (core.logs)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-# Configurar o handler de arquivo com rotação
-file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
-
-# Configurar o formatador JSON
-formatter = jsonlogger.JsonFormatter(
-    '%(asctime)s %(levelname)s %(name)s %(message)s'
-)
-file_handler.setFormatter(formatter)
-
-# Adicionar o handler ao logger
-logger.addHandler(file_handler)
-
-# Opcional: Configurar um handler de console para ver os logs durante o desenvolvimento
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
 
 app = FastAPI(title="Arbitron - Cryptocurrency Arbitrage Bot API")
 
@@ -61,13 +47,105 @@ class BotState:
         self.current_daily_profit = 0
         self.current_daily_loss = 0
         self.last_day_reset = datetime.utcnow().date()
+        self.pairs = ["BTC/USDT", "ETH/USDT"]
+        self.scan_interval = 5
+        self.streaming = False
+        self.local_order_books = False
+        self.multi_leg = False
+        self.incremental = False
+        self.cross_exchange = False
+        self.top_k_per_cycle = None
+        self.stat_arb = False
+        self.journal_dir = "data/journal"
+        self.scan_cycles = 0  # Varreduras concluídas
+        self.scan_time = 0.0  # Segundos gastos em busca de dados + detecção
         self.load_settings()
 
     def load_settings(self):
         with open("config/settings.yaml", "r") as f:
             settings = yaml.safe_load(f)
+            configure_logging(**settings.get("logging", {}))
             self.daily_profit_limit = settings.get("risk_management", {}).get("daily_profit_limit", 0)
             self.daily_loss_limit = settings.get("risk_management", {}).get("daily_loss_limit", 0)
+            arbitrage = settings.get("arbitrage", {})
+            self.pairs = arbitrage.get("pairs", self.pairs)
+            self.scan_interval = arbitrage.get("scan_interval", self.scan_interval)
+            self.streaming = arbitrage.get("streaming", self.streaming)
+            self.engine.cycle_deadline = arbitrage.get("cycle_deadline", self.engine.cycle_deadline)
+            self.engine.max_quote_age = arbitrage.get("max_quote_age", self.engine.max_quote_age)
+            self.engine.max_quote_skew = arbitrage.get("max_quote_skew", self.engine.max_quote_skew)
+            self.local_order_books = arbitrage.get("order_books", self.local_order_books)
+            self.engine.max_trade_size = arbitrage.get("max_trade_size", self.engine.max_trade_size)
+            self.incremental = arbitrage.get("incremental", self.incremental)
+            top_k = arbitrage.get("top_k", {})
+            self.engine.top_k = top_k.get("per_detector", self.engine.top_k)
+            self.engine.top_k_per_pair = top_k.get("per_pair", self.engine.top_k_per_pair)
+            self.top_k_per_cycle = top_k.get("per_cycle", self.top_k_per_cycle)
+            stat_arb = arbitrage.get("stat_arb", {})
+            self.stat_arb = stat_arb.get("enabled", self.stat_arb)
+            self.engine.spread_tracker = SpreadTracker(
+                window=stat_arb.get("window", 100),
+                entry_z=stat_arb.get("entry_z", 2.0),
+                min_samples=stat_arb.get("min_samples", 30),
+                max_half_life=stat_arb.get("max_half_life"),
+            )
+            sharding = arbitrage.get("sharding", {})
+            if sharding.get("enabled"):
+                self.engine.sharding = ShardedDetector(
+                    shards=sharding.get("shards"),
+                    strategy=sharding.get("strategy", "hash"),
+                )
+            multi_leg = arbitrage.get("multi_leg", {})
+            self.multi_leg = multi_leg.get("enabled", self.multi_leg)
+            self.engine.max_cycle_length = multi_leg.get("max_length", self.engine.max_cycle_length)
+            self.engine.max_cycles = multi_leg.get("max_cycles", self.engine.max_cycles)
+            self.engine.cycle_time_budget = multi_leg.get("time_budget", self.engine.cycle_time_budget)
+            cross_exchange = arbitrage.get("cross_exchange", {})
+            self.cross_exchange = cross_exchange.get("enabled", self.cross_exchange)
+            self.engine.max_route_length = cross_exchange.get("max_length", self.engine.max_route_length)
+            self.engine.venue_graph = VenueGraph(
+                transfers=cross_exchange.get("transfers", {}),
+                latency_penalty=cross_exchange.get("latency_penalty", 0.0),
+                notional=cross_exchange.get("notional", 1000.0),
+            )
+            markets_cache = arbitrage.get("markets_cache", {})
+            if markets_cache.get("enabled"):
+                cache = MarketMetadataCache(
+                    directory=markets_cache.get("directory", "data/markets"),
+                    ttl=markets_cache.get("ttl", 6 * 3600),
+                )
+                self.engine.client_pool.markets_cache = cache
+                for connector in self.connectors.values():
+                    connector.markets_cache = cache
+            sim = arbitrage.get("simulator", {})
+            if sim.get("enabled"):
+                url = sim.get("url", "http://127.0.0.1:8900")
+                logger.warning(f"Usando o simulador local de exchanges em {url}")
+                # Mercados do simulador não podem substituir o cache das exchanges reais
+                self.engine.client_pool.markets_cache = None
+                for exchange_id in self.connectors:
+                    self.engine.client_pool.exchange_options[exchange_id] = simulator.ccxt_options(exchange_id, url)
+                    self.engine.feed_urls[exchange_id] = simulator.ws_url(exchange_id, url)
+            recording = arbitrage.get("recording", {})
+            self.journal_dir = recording.get("directory", self.journal_dir)
+            if recording.get("enabled"):
+                recorder = MarketDataRecorder(
+                    directory=self.journal_dir,
+                    block_records=recording.get("block_records", 1000),
+                    flush_interval=recording.get("flush_interval", 1.0),
+                )
+                self.engine.recorder = recorder
+                for connector in self.connectors.values():
+                    connector.recorder = recorder
+            polling = arbitrage.get("polling", {})
+            if polling.get("adaptive"):
+                self.engine.scheduler = PollingScheduler(
+                    budgets=polling.get("budgets", {}),
+                    threshold=self.engine.min_profit_threshold,
+                    default_budget=polling.get("default_budget", 1.0),
+                    min_interval=polling.get("min_interval", 1.0),
+                    max_interval=polling.get("max_interval", 60.0),
+                )
 
     async def broadcast(self, message: dict):
         """Envia mensagem para todos os clientes WebSocket conectados."""
@@ -105,25 +183,60 @@ class BotState:
                 break
 
             try:
-                market_data = await self.engine.fetch_market_data(list(self.connectors.keys()), ["BTC/USDT", "ETH/USDT"])
-                opportunities = self.engine.detect_simple_arbitrage(market_data)
+                started = time.perf_counter()
+                market_data = await self.engine.get_market_data(list(self.connectors.keys()), self.pairs)
+                # Um único snapshot colunar do ciclo, lido por todos os detectores
+                snapshot = self.engine.market_snapshot(market_data)
+                events = []
+                if self.incremental:
+                    # Só as oportunidades recém-abertas entre as melhores seguem para execução; as demais viram eventos
+                    events = self.engine.update_opportunities(market_data)
+                    best = {opp.id for opp in self.engine.top_live_opportunities()}
+                    opportunities = [opp for kind, opp in events if kind == "add" and opp.id in best]
+                elif self.engine.sharding is not None:
+                    # Simples e triangular no pool de processos; o loop segue atendendo a API
+                    opportunities = await self.engine.detect_sharded(snapshot, list(self.connectors.keys()))
+                else:
+                    opportunities = self.engine.detect_simple_arbitrage(snapshot)
                 for exchange in self.connectors.keys():
-                    triangular_opps = self.engine.detect_triangular_arbitrage(market_data, exchange)
-                    opportunities.extend(triangular_opps)
+                    if not self.incremental and self.engine.sharding is None:
+                        triangular_opps = self.engine.detect_triangular_arbitrage(snapshot, exchange)
+                        opportunities.extend(triangular_opps)
+                    if self.multi_leg:
+                        # Ciclos de 3 pernas já vêm do detector triangular
+                        opportunities.extend(self.engine.detect_multi_leg_arbitrage(snapshot, exchange, min_length=4))
+                if self.cross_exchange:
+                    opportunities.extend(self.engine.detect_cross_exchange_arbitrage(snapshot))
+                if self.top_k_per_cycle is not None:
+                    # Só as melhores da varredura seguem para broadcast e execução
+                    opportunities = select_top(opportunities, self.top_k_per_cycle, self.engine.top_k_per_pair)
+                signals = self.engine.detect_stat_arb(snapshot) if self.stat_arb else []
+                self.scan_time += time.perf_counter() - started
+                self.scan_cycles += 1
                 
+                for kind, opp in events:
+                    if kind == "update":
+                        await self.broadcast({"type": "opportunity_update", "data": opp.to_dict()})
+                    elif kind == "remove":
+                        await self.broadcast({"type": "opportunity_closed", "data": opp.to_dict()})
+
+                # Sinais de reversão à média não são arbitragem sem risco: só são enviados, nunca executados
+                for signal in signals:
+                    await self.broadcast({"type": "opportunity", "data": signal.to_dict()})
+
                 # Envia oportunidades para clientes WebSocket
                 for opp in opportunities:
-                    await self.broadcast({"type": "opportunity", "data": opp})
+                    await self.broadcast({"type": "opportunity", "data": opp.to_dict()})
                     if self.mode == "real" and self.status == "running":
                         success = await self.execution_engine.execute_trade(opp)
                         if success:
                             trade = Trade(
                                 id=f"trade-{datetime.utcnow().timestamp()}",
                                 timestamp=datetime.utcnow().isoformat(),
-                                pair=opp["pair"],
-                                buy_exchange=opp.get("buyExchange", opp.get("exchange")),
-                                sell_exchange=opp.get("sellExchange", opp.get("exchange")),
-                                profit=opp.get("estimatedProfit", opp.get("profitPercentage")),
+                                pair=opp.pair,
+                                buy_exchange=getattr(opp, "buy_exchange", None) or opp.exchange,
+                                sell_exchange=getattr(opp, "sell_exchange", None) or opp.exchange,
+                                profit=opp.estimated_profit,
                                 status="completed"
                             )
                             self.trades.append(trade.dict())
@@ -138,10 +251,37 @@ class BotState:
             
             except Exception as e:
                 logger.error(f"Erro ao escanear oportunidades: {str(e)}")
-            await asyncio.sleep(5)  # Intervalo configurável
+            interval = self.scan_interval
+            if self.engine.scheduler is not None:
+                # A próxima varredura acontece quando algum par estiver pronto para nova consulta
+                interval = min(interval, self.engine.scheduler.time_until_next())
+            if self.engine.is_streaming:
+                # Com streaming, a próxima varredura começa assim que chegar uma nova cotação
+                await self.engine.quote_table.wait_for_update(interval)
+            else:
+                await asyncio.sleep(interval)
 
 bot_state = BotState()
 
+@app.on_event("startup")
+async def startup_event():
+    """Abre e aquece os clientes das exchanges usados pelo scanner."""
+    exchanges = list(bot_state.connectors.keys())
+    if bot_state.engine.recorder is not None:
+        bot_state.engine.recorder.start()
+    await bot_state.engine.start(exchanges)
+    if bot_state.streaming:
+        await bot_state.engine.start_streaming(exchanges, bot_state.pairs)
+    if bot_state.local_order_books:
+        await bot_state.engine.start_order_books(exchanges, bot_state.pairs)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Fecha as sessões HTTP mantidas pelo motor de arbitragem."""
+    await bot_state.engine.close()
+    if bot_state.engine.recorder is not None:
+        await bot_state.engine.recorder.close()
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Endpoint WebSocket para oportunidades e status do bot."""
@@ -163,7 +303,7 @@ async def scan_arbitrage(request: ArbitrageRequest):
         opportunities = bot_state.engine.detect_simple_arbitrage(market_data)
         if not opportunities:
             raise HTTPException(status_code=404, detail="Nenhuma oportunidade encontrada")
-        return opportunities
+        return [opp.to_dict() for opp in opportunities]
     except Exception as e:
         logger.error(f"Erro ao escanear arbitragem: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -176,11 +316,16 @@ async def scan_triangular_arbitrage(exchange: str):
         opportunities = bot_state.engine.detect_triangular_arbitrage(market_data, exchange)
         if not opportunities:
             raise HTTPException(status_code=404, detail="Nenhuma oportunidade encontrada")
-        return opportunities
+        return [opp.to_dict() for opp in opportunities]
     except Exception as e:
         logger.error(f"Erro ao escanear arbitragem triangular: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/arbitrage/live")
+async def live_opportunities():
+    """Oportunidades abertas no momento (modo incremental)."""
+    return [opp.to_dict() for opp in bot_state.engine.live_opportunities.sorted()]
+
 @app.post("/api/v1/bot/start")
 async def start_bot():
     """Inicia o bot."""
@@ -228,10 +373,23 @@ async def get_exchange_status():
         statuses.append({
             "exchange": exchange_id,
             "status": "connected" if is_connected else "disconnected",
-            "last_checked": datetime.utcnow().isoformat()
+            "last_checked": datetime.utcnow().isoformat(),
+            "fetch_strategy": bot_state.engine.fetch_strategies.get(exchange_id)
         })
     return statuses
 
+@app.get("/api/v1/metrics/refresh-rates")
+async def get_refresh_rates():
+    """Retorna a taxa de atualização (consultas/s) de cada par por exchange."""
+    if bot_state.engine.scheduler is None:
+        return {}
+    return bot_state.engine.scheduler.refresh_rates()
+
+@app.get("/api/v1/metrics/clock")
+async def get_clock_metrics():
+    """Retorna o desvio de relógio e a latência estimados por exchange (segundos)."""
+    return bot_state.engine.clock.stats()
+
 @app.post("/api/v1/backtest", response_model=BacktestResult)
 async def run_backtest(request: BacktestRequest):
     """Executa um backtest com dados históricos."""
@@ -241,7 +399,9 @@ async def run_backtest(request: BacktestRequest):
             pairs=request.pairs,
             start_date=request.start_date,
             end_date=request.end_date,
-            initial_balance=request.initial_balance
+            initial_balance=request.initial_balance,
+            journal_dir=bot_state.journal_dir if request.replay_journal else None,
+            replay_interval=request.replay_interval,
         )
         result = await backtest_engine.run()
         return result
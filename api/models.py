@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 
 class ArbitrageRequest(BaseModel):
@@ -48,6 +48,7 @@ class ExchangeStatus(BaseModel):
     exchange: str
     status: str  # connected, disconnected
     last_checked: str
+    fetch_strategy: Optional[str] = None  # bulk_tickers, bulk_bids_asks, per_pair
 
 class BacktestRequest(BaseModel):
     exchanges: List[str]
@@ -55,6 +56,8 @@ class BacktestRequest(BaseModel):
     start_date: datetime
     end_date: datetime
     initial_balance: float = 10000.0
+    replay_journal: bool = False  # Usa os diários gravados em vez de preços simulados
+    replay_interval: float = 1.0
 
 class BacktestResult(BaseModel):
     total_profit: float
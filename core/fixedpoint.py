@@ -0,0 +1,114 @@
+from decimal import Decimal
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+# Taxas em partes por milhão (0,1% = 1000)
+FEE_SCALE = 1_000_000
+FEE_DECIMALS = 4  # Casas que levam um percentual a partes por milhão
+# Casas decimais usadas quando a exchange não informa a precisão do mercado
+DEFAULT_DECIMALS = 8
+
+Number = Union[int, float, str, Decimal]
+
+def precision_decimals(precision: Optional[Number], default: int = DEFAULT_DECIMALS) -> int:
+    """
+    Casas decimais de uma precisão de mercado do ccxt.
+
+    Aceita os dois modos do ccxt: tamanho do tick (0.01, 0.5) ou quantidade
+    de casas decimais (2). Inteiros a partir de 1 são lidos como casas.
+    :param precision: Valor de market["precision"]["price"] ou ["amount"]
+    :param default: Casas quando a precisão não é informada
+    :return: Casas decimais
+    """
+    if precision is None:
+        return default
+    value = Decimal(str(precision))
+    if value >= 1 and value == value.to_integral_value():
+        return int(value)
+    return max(0, -value.normalize().as_tuple().exponent)
+
+def decimal_places(value: Decimal) -> int:
+    """Casas decimais em que um Decimal é exato."""
+    return max(0, -value.as_tuple().exponent)
+
+class MarketPrecision(NamedTuple):
+    """Casas decimais de preço e quantidade de um mercado."""
+    price: int = DEFAULT_DECIMALS
+    amount: int = DEFAULT_DECIMALS
+
+    @classmethod
+    def from_market(cls, market: dict) -> "MarketPrecision":
+        """Precisão de um mercado do ccxt (exchange.markets[símbolo])."""
+        precision = market.get("precision") or {}
+        return cls(precision_decimals(precision.get("price")), precision_decimals(precision.get("amount")))
+
+    def finest(self, other: "MarketPrecision") -> "MarketPrecision":
+        """Precisão que representa exatamente os valores dos dois mercados."""
+        return MarketPrecision(max(self.price, other.price), max(self.amount, other.amount))
+
+    @property
+    def notional(self) -> int:
+        """Casas decimais de preço × quantidade."""
+        return self.price + self.amount
+
+def to_units(value, decimals: int):
+    """
+    Converte um valor para inteiro escalado por 10**decimals.
+
+    Decimal e str são convertidos exatamente. float (e arrays) são
+    arredondados para a unidade mais próxima, o que é exato enquanto
+    valor × 10**decimals ficar abaixo de 2**53.
+    :param value: Número ou array NumPy
+    :param decimals: Casas decimais
+    :return: int, ou array int64 para arrays
+    """
+    if isinstance(value, np.ndarray):
+        return np.rint(value * 10.0 ** decimals).astype(np.int64)
+    if isinstance(value, (Decimal, str)):
+        return int(Decimal(value).scaleb(decimals).to_integral_value())
+    return round(value * 10 ** decimals)
+
+def from_units(units, decimals: int) -> Decimal:
+    """Valor exato de um inteiro escalado por 10**decimals."""
+    return Decimal(int(units)).scaleb(-decimals)
+
+def to_float(units, decimals: int):
+    """Valor aproximado (float ou array float) de inteiros escalados, para exibição e ordenação."""
+    return units / 10 ** decimals
+
+def fee_ppm(percent: Number) -> int:
+    """Taxa percentual em partes por milhão (0.1 -> 1000)."""
+    return to_units(str(percent), FEE_DECIMALS)
+
+def fee_units(notional, ppm):
+    """
+    Taxa cobrada sobre um valor, arredondada para cima na menor unidade.
+
+    Funciona com int e com arrays int64 (inclusive ppm por elemento); a conta
+    é dividida em parte inteira e resto de FEE_SCALE para não estourar int64.
+    :param notional: Valor em unidades (não negativo)
+    :param ppm: Taxa em partes por milhão
+    :return: Taxa em unidades do valor
+    """
+    whole, rest = notional // FEE_SCALE, notional % FEE_SCALE
+    return whole * ppm + -(-(rest * ppm) // FEE_SCALE)
+
+def net_profit(buy_price, sell_price, amount, buy_ppm, sell_ppm):
+    """
+    Lucro líquido de comprar e vender a mesma quantidade, com taxa taker nas duas pernas.
+
+    Preços e quantidade em unidades de uma mesma MarketPrecision; o
+    resultado fica em unidades de preço × quantidade (10**precision.notional).
+    Aceita int ou arrays int64 (o produto preço × quantidade precisa caber em
+    int64; com int do Python não há limite).
+    :param buy_price: Preço de compra (ask)
+    :param sell_price: Preço de venda (bid)
+    :param amount: Quantidade
+    :param buy_ppm: Taxa da compra em partes por milhão
+    :param sell_ppm: Taxa da venda em partes por milhão
+    :return: Lucro líquido em unidades
+    """
+    cost = buy_price * amount
+    proceeds = sell_price * amount
+    return proceeds - fee_units(proceeds, sell_ppm) - cost - fee_units(cost, buy_ppm)
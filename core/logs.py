@@ -1,13 +1,188 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Dict, Optional, Tuple
 
-os.makedirs("logs", exist_ok=True)
+import structlog
 
 logger = logging.getLogger("Arbitron")
-logger.setLevel(logging.DEBUG)
 
-handler = RotatingFileHandler("logs/arbitron.log", maxBytes=500_000, backupCount=5)
-formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+# Listener ativo (um por processo)
+_listener: Optional[QueueListener] = None
+
+class CallSiteRateLimiter(logging.Filter):
+    """
+    Limita a quantidade de registros por ponto de chamada (arquivo e linha).
+
+    Cada ponto de chamada tem um balde de ``burst`` fichas reposto a ``rate``
+    fichas por segundo. Sem fichas, o registro é descartado ou, com
+    probabilidade ``sample_rate``, mantido como amostra. O próximo registro
+    que passar do mesmo ponto traz em ``suppressed`` quantos foram
+    descartados desde o anterior. Registros de nível ``exempt_level`` ou
+    acima nunca são limitados.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, sample_rate: float = 0.0,
+                 exempt_level: int = logging.WARNING, clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa o limitador.
+        :param rate: Registros por segundo permitidos em cada ponto de chamada
+        :param burst: Registros seguidos permitidos antes de limitar
+        :param sample_rate: Fração dos registros excedentes mantida como amostra
+        :param exempt_level: Nível a partir do qual nada é limitado
+        :param clock: Relógio em segundos (injetável para testes)
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_rate = sample_rate
+        self.exempt_level = exempt_level
+        self.clock = clock
+        # Ponto de chamada -> [fichas, último instante, descartados]
+        self._buckets: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.pathname, record.lineno)
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+            elif self.sample_rate and random.random() < self.sample_rate:
+                record.sampled = True
+            else:
+                bucket[2] += 1
+                return False
+            if bucket[2]:
+                record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler que não formata nada na thread que registra.
+
+    O QueueHandler padrão monta a mensagem em ``prepare`` para que o registro
+    possa ser serializado; como o listener roda em uma thread do mesmo
+    processo, o registro segue intacto e a formatação (``%s`` dos
+    argumentos, JSON, traceback) acontece no listener. Os argumentos são
+    lidos só nesse momento, então objetos alterados logo após o log podem
+    aparecer já alterados.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def _record_fields(_, __, event_dict: dict) -> dict:
+    """Nível, logger, instante de criação e contadores do limitador, lidos do LogRecord."""
+    record = event_dict.get("_record")
+    if record is not None:
+        event_dict.setdefault("level", record.levelname.lower())
+        event_dict.setdefault("logger", record.name)
+        event_dict.setdefault("timestamp", datetime.fromtimestamp(record.created, timezone.utc).isoformat())
+        for key in ("suppressed", "sampled"):
+            if hasattr(record, key):
+                event_dict[key] = getattr(record, key)
+    return event_dict
+
+def _formatter(renderer) -> structlog.stdlib.ProcessorFormatter:
+    """Formatador que estrutura tanto registros do logging padrão quanto do structlog."""
+    return structlog.stdlib.ProcessorFormatter(
+        processors=[
+            _record_fields,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.format_exc_info,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            renderer,
+        ],
+    )
+
+def configure_logging(level: str = "INFO", log_file: Optional[str] = "logs/arbitron.log",
+                      max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, console: bool = True,
+                      rate: float = 10.0, burst: int = 20, sample_rate: float = 0.0) -> QueueListener:
+    """
+    Configura o pipeline de logs não bloqueante do processo.
+
+    O logger raiz passa a ter um único handler, que aplica o limite por ponto
+    de chamada e enfileira o registro; um QueueListener em segundo plano
+    formata e grava no arquivo (JSON, com rotação) e no console. O structlog
+    é configurado para usar o mesmo caminho. Chamar de novo substitui a
+    configuração anterior.
+    :param level: Nível mínimo dos registros
+    :param log_file: Arquivo de log em JSON (None desativa)
+    :param max_bytes: Tamanho máximo do arquivo antes da rotação
+    :param backup_count: Arquivos rotacionados mantidos
+    :param console: Também escreve no console
+    :param rate: Registros por segundo permitidos em cada ponto de chamada
+    :param burst: Registros seguidos permitidos em cada ponto de chamada
+    :param sample_rate: Fração dos registros excedentes mantida como amostra
+    :return: QueueListener iniciado
+    """
+    global _listener
+    shutdown_logging()
+
+    handlers = []
+    if log_file:
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+        file_handler.setFormatter(_formatter(structlog.processors.JSONRenderer()))
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(_formatter(structlog.dev.ConsoleRenderer(colors=False)))
+        handlers.append(console_handler)
+
+    records = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    queue_handler.addFilter(CallSiteRateLimiter(rate=rate, burst=burst, sample_rate=sample_rate))
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def shutdown_logging() -> None:
+    """Para o listener, gravando os registros ainda na fila."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+def get_logger(name: Optional[str] = None):
+    """Logger estruturado (structlog) que segue o pipeline configurado."""
+    return structlog.get_logger(name)
+
+atexit.register(shutdown_logging)
@@ -54,17 +54,17 @@ class BotState:
                 
                 # Envia oportunidades para clientes WebSocket
                 for opp in opportunities:
-                    await self.broadcast({"type": "opportunity", "data": opp})
+                    await self.broadcast({"type": "opportunity", "data": opp.to_dict()})
                     if self.mode == "real" and self.status == "running":
                         success = await self.execution_engine.execute_trade(opp)
                         if success:
                             trade = Trade(
                                 id=f"trade-{datetime.utcnow().timestamp()}",
                                 timestamp=datetime.utcnow().isoformat(),
-                                pair=opp["pair"],
-                                buy_exchange=opp.get("buyExchange", opp.get("exchange")),
-                                sell_exchange=opp.get("sellExchange", opp.get("exchange")),
-                                profit=opp.get("estimatedProfit", opp.get("profitPercentage")),
+                                pair=opp.pair,
+                                buy_exchange=getattr(opp, "buy_exchange", None) or opp.exchange,
+                                sell_exchange=getattr(opp, "sell_exchange", None) or opp.exchange,
+                                profit=opp.estimated_profit,
                                 status="completed"
                             )
                             self.trades.append(trade.dict())
@@ -96,7 +96,7 @@ async def scan_arbitrage(request: ArbitrageRequest):
         opportunities = bot_state.engine.detect_simple_arbitrage(market_data)
         if not opportunities:
             raise HTTPException(status_code=404, detail="Nenhuma oportunidade encontrada")
-        return opportunities
+        return [opp.to_dict() for opp in opportunities]
     except Exception as e:
         logger.error(f"Erro ao escanear arbitragem: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -109,7 +109,7 @@ async def scan_triangular_arbitrage(exchange: str):
         opportunities = bot_state.engine.detect_triangular_arbitrage(market_data, exchange)
         if not opportunities:
             raise HTTPException(status_code=404, detail="Nenhuma oportunidade encontrada")
-        return opportunities
+        return [opp.to_dict() for opp in opportunities]
     except Exception as e:
         logger.error(f"Erro ao escanear arbitragem triangular: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
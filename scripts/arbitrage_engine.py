@@ -4,27 +4,126 @@
 import time
 import json
 from typing import Dict, List, Tuple, Optional
-import ccxt.async_support as ccxt
 import asyncio
 import logging
+import numpy as np
+from core.fixedpoint import MarketPrecision, fee_ppm, net_profit, to_float, to_units
+from scripts.connectors.pool import ExchangeClientPool
+from scripts.feeds.stream import QuoteTable, WebSocketFeed, create_feeds
+from scripts.feeds.orderbook import DEPTH_FEEDS, OrderBookManager
+from scripts.feeds.scheduler import PollingScheduler, best_net_spreads
+from scripts.feeds.clock import ClockTracker
+from scripts.feeds.recorder import MarketDataRecorder
+from scripts.detection.simple import QuoteMatrix, build_quote_matrix, find_crosses, taker_multipliers
+from scripts.detection.graph import CurrencyGraph
+from scripts.detection.triangular import TriangleIndex
+from scripts.detection.cycles import NegativeCycleDetector
+from scripts.detection.incremental import LiveOpportunities
+from scripts.detection.venues import VenueGraph
+from scripts.detection.depth import DepthCurve, optimal_size
+from scripts.detection.opportunity import Opportunity, RouteOpportunity, SimpleOpportunity, StatArbOpportunity
+from scripts.detection.snapshot import MarketSnapshot, SymbolRegistry
+from scripts.detection.topk import TopK, select_top
+from scripts.detection.sharding import ShardedDetector
+from scripts.detection.spreads import SpreadTracker
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Ticker fetch strategies reported per exchange
+FETCH_BULK_TICKERS = "bulk_tickers"
+FETCH_BULK_BIDS_ASKS = "bulk_bids_asks"
+FETCH_PER_PAIR = "per_pair"
+BULK_CAPABILITIES = {
+    FETCH_BULK_TICKERS: "fetchTickers",
+    FETCH_BULK_BIDS_ASKS: "fetchBidsAsks",
+}
+
+class CycleMarketData(dict):
+    """
+    Market data of one scan cycle (exchange -> pair -> price data)
+    
+    Behaves like the plain dictionary the detectors expect and additionally
+    records which venues did not make it into the cycle.
+    
+    Attributes:
+        missing: Exchanges that failed or had not answered when the cycle deadline hit
+        stale: Exchange -> age in seconds of responses that arrived after a previous cycle's deadline
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.missing: List[str] = []
+        self.stale: Dict[str, float] = {}
+    
+    def merge(self, other: Dict) -> None:
+        """
+        Add another cycle's data and metadata to this one
+        """
+        self.update(other)
+        self.missing.extend(getattr(other, "missing", []))
+        self.stale.update(getattr(other, "stale", {}))
+
 class ArbitrageEngine:
     """
     Core engine for detecting arbitrage opportunities across exchanges
     """
     
-    def __init__(self, min_profit_threshold: float = 0.5):
+    def __init__(self, min_profit_threshold: float = 0.5, client_pool: Optional[ExchangeClientPool] = None,
+                 fetch_mode: str = "auto", max_concurrent_requests: int = 10, cycle_deadline: Optional[float] = None,
+                 max_quote_age: Optional[float] = None, max_quote_skew: Optional[float] = None):
         """
         Initialize the arbitrage engine
         
         Args:
             min_profit_threshold: Minimum profit percentage to consider an opportunity valid
+            client_pool: Registry of long-lived exchange clients (a private one is created if omitted)
+            fetch_mode: "auto" to use bulk ticker endpoints when available, "per_pair" to always fetch one ticker at a time
+            max_concurrent_requests: Maximum in-flight per-pair ticker requests per exchange
+            cycle_deadline: Seconds a scan cycle waits for exchanges before detecting on what arrived (None waits for all)
+            max_quote_age: Quotes older than this many seconds are ignored by the detectors (None disables)
+            max_quote_skew: Maximum seconds between the two quotes of a simple opportunity (None disables)
         """
         self.min_profit_threshold = min_profit_threshold
+        self.client_pool = client_pool or ExchangeClientPool()
+        self.fetch_mode = fetch_mode
+        self.max_concurrent_requests = max_concurrent_requests
+        self.fetch_strategies: Dict[str, str] = {}
+        self.cycle_deadline = cycle_deadline
+        self._inflight: Dict[Tuple[str, frozenset], asyncio.Task] = {}  # (exchange, pairs) -> ticker fetch
+        self.last_cycle: Optional[CycleMarketData] = None
+        self.max_quote_age = max_quote_age
+        self.max_quote_skew = max_quote_skew
+        self.clock = ClockTracker()
+        self._clock_syncs: Dict[str, asyncio.Task] = {}
+        self.quote_table = QuoteTable()
+        self.feeds: Dict[str, WebSocketFeed] = {}
+        self.order_books = OrderBookManager(snapshot_fetcher=self.fetch_order_book_snapshot)
+        self.depth_feeds: Dict[str, WebSocketFeed] = {}
+        self.feed_urls: Dict[str, str] = {}
+        self.scheduler: Optional[PollingScheduler] = None
+        self.recorder: Optional[MarketDataRecorder] = None
+        self.symbol_registry = SymbolRegistry()  # Exchange, pair and currency IDs shared by every MarketSnapshot
+        self.currency_graphs: Dict[str, CurrencyGraph] = {}
+        self.triangle_indexes: Dict[str, TriangleIndex] = {}
+        self.cycle_detectors: Dict[str, NegativeCycleDetector] = {}
+        self.max_cycle_length = 5  # Maximum legs of a multi-leg cycle
+        self.max_cycles = 20  # Maximum multi-leg cycles reported per exchange and scan
+        self.cycle_time_budget: Optional[float] = 0.05  # Seconds of multi-leg search per exchange and scan
+        self.venue_graph = VenueGraph()  # Cross-exchange graph; transfers are configured in settings.yaml
+        self.venue_detector: Optional[NegativeCycleDetector] = None
+        self.max_route_length = 6  # Maximum legs (trades + transfers) of a cross-exchange route
+        self.max_trade_size: Optional[float] = None  # Cap on the base amount of a simple opportunity (None disables)
+        self.market_precisions: Dict[Tuple[str, str], MarketPrecision] = {}  # (exchange, pair) -> decimals from market metadata
+        self.top_k: Optional[int] = None  # Best opportunities kept per detector and scan (None keeps all)
+        self.top_k_per_pair: Optional[int] = None  # Best opportunities kept per pair (None keeps all)
+        self.sharding: Optional[ShardedDetector] = None  # Process pool for detect_sharded (configured in settings.yaml)
+        self._depth_curves: Dict[Tuple[str, str, str], Tuple[tuple, DepthCurve]] = {}  # (exchange, pair, side) -> (book version, curve)
+        self.spread_tracker = SpreadTracker()  # Rolling spread statistics for detect_stat_arb
+        self.live_opportunities = LiveOpportunities()
+        self._quote_signatures: Dict[Tuple[str, str], tuple] = {}
+        self._live_rates: Dict[str, Tuple[int, np.ndarray]] = {}  # Exchange -> (graph version, conversion rates)
         self.exchange_fees = {
             "binance": {"maker": 0.1, "taker": 0.1},  # Percentage
             "kraken": {"maker": 0.16, "taker": 0.26},
@@ -36,128 +135,560 @@ class ArbitrageEngine:
             "pancakeswap": {"maker": 0.25, "taker": 0.25, "gas": 1},
         }
     
+    async def start(self, exchanges: List[str]) -> None:
+        """
+        Open and warm the exchange clients used by the scan loop
+        
+        Args:
+            exchanges: List of exchange IDs
+        """
+        await self.client_pool.start(exchanges)
+        for exchange_id in exchanges:
+            if exchange_id in self.client_pool:
+                client = await self.client_pool.get(exchange_id)
+                self.load_market_precisions(exchange_id, client.markets or {})
+    
+    def load_market_precisions(self, exchange_id: str, markets: Dict) -> None:
+        """
+        Record the price and amount precision of an exchange's markets
+        
+        Args:
+            exchange_id: Exchange ID
+            markets: CCXT markets (``exchange.markets``)
+        """
+        for symbol, market in markets.items():
+            self.market_precisions[(exchange_id, symbol)] = MarketPrecision.from_market(market)
+    
+    def market_precision(self, exchange_id: str, pair: str) -> MarketPrecision:
+        """
+        Get the price and amount decimals of a market
+        
+        Args:
+            exchange_id: Exchange ID
+            pair: Trading pair
+            
+        Returns:
+            MarketPrecision from the exchange metadata, or the default decimals if unknown
+        """
+        return self.market_precisions.get((exchange_id, pair)) or MarketPrecision()
+    
+    async def start_streaming(self, exchanges: List[str], pairs: List[str]) -> None:
+        """
+        Subscribe to the WebSocket ticker feeds of the given exchanges
+        
+        Streamed quotes land in ``self.quote_table``; exchanges without a feed
+        keep being polled over REST by ``get_market_data``.
+        
+        Args:
+            exchanges: List of exchange IDs
+            pairs: List of trading pairs
+        """
+        for feed in create_feeds(self.quote_table, exchanges, pairs, clock=self.clock, recorder=self.recorder,
+                                 urls=self.feed_urls):
+            if feed.exchange_id not in self.feeds:
+                self.feeds[feed.exchange_id] = feed
+                feed.start()
+    
+    async def start_order_books(self, exchanges: List[str], pairs: List[str]) -> None:
+        """
+        Maintain local L2 order books from the exchanges' diff depth streams
+        
+        Books live in ``self.order_books`` and are (re)built from REST snapshots
+        whenever a sequence gap is detected.
+        
+        Args:
+            exchanges: List of exchange IDs
+            pairs: List of trading pairs
+        """
+        self.order_books.recorder = self.recorder
+        for exchange_id in exchanges:
+            feed_class = DEPTH_FEEDS.get(exchange_id)
+            if feed_class is None:
+                logger.warning(f"Livro de ofertas incremental não disponível para {exchange_id}")
+                continue
+            if exchange_id not in self.depth_feeds:
+                feed = feed_class(self.quote_table, pairs, self.order_books, url=self.feed_urls.get(exchange_id),
+                                  clock=self.clock)
+                self.depth_feeds[exchange_id] = feed
+                feed.start()
+    
+    async def fetch_order_book_snapshot(self, exchange_id: str, pair: str) -> Dict:
+        """
+        Fetch a full order book snapshot over REST with the pooled client
+        
+        Args:
+            exchange_id: Exchange ID
+            pair: Trading pair
+            
+        Returns:
+            CCXT order book (bids, asks and the update ID in ``nonce``)
+        """
+        exchange = await self.client_pool.get(exchange_id)
+        return await exchange.fetch_order_book(pair, 1000)
+    
+    async def close(self) -> None:
+        """
+        Stop the streaming feeds and close every pooled exchange client
+        """
+        inflight, self._inflight = self._inflight, {}
+        clock_syncs, self._clock_syncs = self._clock_syncs, {}
+        for task in list(inflight.values()) + list(clock_syncs.values()):
+            task.cancel()
+        feeds, self.feeds = self.feeds, {}
+        depth_feeds, self.depth_feeds = self.depth_feeds, {}
+        for feed in list(feeds.values()) + list(depth_feeds.values()):
+            await feed.stop()
+        await self.order_books.close()
+        await self.client_pool.close()
+        if self.sharding is not None:
+            self.sharding.close()
+    
+    @property
+    def is_streaming(self) -> bool:
+        """
+        Whether any WebSocket feed is writing to the quote table
+        """
+        return bool(self.feeds or self.depth_feeds)
+    
+    async def get_market_data(self, exchanges: List[str], pairs: List[str]) -> Dict:
+        """
+        Get the latest market data, preferring streamed quotes over REST polling
+        
+        Args:
+            exchanges: List of exchange IDs
+            pairs: List of trading pairs
+            
+        Returns:
+            Dictionary of exchange -> pair -> price data
+        """
+        streamed = [ex for ex in exchanges if ex in self.feeds or ex in self.depth_feeds]
+        polled = [ex for ex in exchanges if ex not in streamed]
+        market_data = CycleMarketData(self.quote_table.snapshot(streamed, pairs))
+        if polled and self.scheduler is not None:
+            market_data.merge(await self.fetch_scheduled(polled, pairs))
+        elif polled:
+            market_data.merge(await self.fetch_market_data(polled, pairs))
+        self.last_cycle = market_data
+        return market_data
+    
+    async def fetch_scheduled(self, exchanges: List[str], pairs: List[str]) -> Dict:
+        """
+        Poll only the pairs the scheduler considers due and merge them into the quote table
+        
+        Args:
+            exchanges: List of exchange IDs polled over REST
+            pairs: List of trading pairs
+            
+        Returns:
+            Dictionary of exchange -> pair -> latest known price data
+        """
+        due = self.scheduler.due(exchanges, pairs)
+        results = await asyncio.gather(*(
+            self.fetch_market_data([exchange_id], exchange_pairs) for exchange_id, exchange_pairs in due.items()
+        ))
+        market_data = CycleMarketData()
+        for result in results:
+            market_data.merge(result)
+        for exchange_id, quotes in market_data.items():
+            for pair, quote in quotes.items():
+                self.quote_table.update(exchange_id, pair, quote["bid"], quote["ask"], quote["volume"],
+                                        quote.get("timestamp"), quote.get("received"))
+        market_data.update(self.quote_table.snapshot(exchanges, pairs))
+        self.scheduler.observe(market_data, best_net_spreads(market_data, self.exchange_fees))
+        return market_data
+    
     async def fetch_market_data(self, exchanges: List[str], pairs: List[str]) -> Dict:
         """
         Fetch market data from multiple exchanges using CCXT
         
+        With ``cycle_deadline`` set, only exchanges that answer before the
+        deadline are returned; slower requests keep running and their result
+        is folded into the next call (listed in ``stale`` with its age). An
+        in-flight request is only reused by calls whose pairs it covers, so
+        overlapping callers (scan loop, API, scheduler) never lose pairs. The
+        strategy used for each exchange is recorded in ``self.fetch_strategies``.
+        
         Args:
             exchanges: List of exchange IDs
             pairs: List of trading pairs
             
         Returns:
-            Dictionary of exchange -> pair -> price data
+            CycleMarketData of exchange -> pair -> price data
+        """
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        requested = frozenset(pairs)
+        tasks = {}
+        for exchange_id in exchanges:
+            key = next((key for key, task in self._inflight.items()
+                        if key[0] == exchange_id and requested <= key[1] and task.get_loop() is loop), None)
+            if key is None:
+                # Resultados atrasados de pedidos contidos neste ficam obsoletos com a nova busca
+                for old in [old for old, task in self._inflight.items()
+                            if old[0] == exchange_id and old[1] <= requested and task.done()]:
+                    del self._inflight[old]
+                key = (exchange_id, requested)
+                self._inflight[key] = asyncio.create_task(self._fetch_exchange(exchange_id, pairs))
+            tasks[exchange_id] = (key, self._inflight[key])
+        
+        if tasks:
+            await asyncio.wait([task for _, task in tasks.values()], timeout=self.cycle_deadline)
+        
+        market_data = CycleMarketData()
+        now = time.monotonic()
+        for exchange_id, (key, task) in tasks.items():
+            if not task.done():
+                market_data.missing.append(exchange_id)
+                continue
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+            result = task.result()
+            if result is None:
+                market_data.missing.append(exchange_id)
+                continue
+            data, strategy, received_at = result
+            if key[1] != requested:
+                data = {pair: quote for pair, quote in data.items() if pair in requested}
+            market_data[exchange_id] = data
+            self.fetch_strategies[exchange_id] = strategy
+            if received_at < started:
+                market_data.stale[exchange_id] = now - received_at
+        
+        if market_data.missing:
+            logger.warning(f"Exchanges sem resposta neste ciclo: {', '.join(market_data.missing)}")
+        self.last_cycle = market_data
+        return market_data
+    
+    async def _fetch_exchange(self, exchange_id: str, pairs: List[str]) -> Optional[Tuple[Dict, str, float]]:
+        """
+        Fetch one exchange's tickers, returning (data, strategy, receive time) or None on error
+        """
+        try:
+            exchange = await self.client_pool.get(exchange_id)
+            self._schedule_clock_sync(exchange, exchange_id)
+            data, strategy = await self.fetch_exchange_tickers(exchange, exchange_id, pairs)
+            if self.recorder is not None:
+                self.recorder.record_tickers(exchange_id, data)
+            return data, strategy, time.monotonic()
+        except Exception as e:
+            logger.error(f"Erro ao buscar dados de {exchange_id}: {str(e)}")
+            return None
+    
+    async def fetch_exchange_tickers(self, exchange, exchange_id: str, pairs: List[str]) -> Tuple[Dict, str]:
+        """
+        Fetch the tickers of one exchange with the cheapest strategy it supports
+        
+        Bulk endpoints (``fetch_tickers`` then ``fetch_bids_asks``) are tried first;
+        exchanges without them fall back to concurrent ``fetch_ticker`` calls
+        bounded by ``max_concurrent_requests``.
+        
+        Args:
+            exchange: CCXT exchange instance
+            exchange_id: Exchange ID
+            pairs: List of trading pairs
+            
+        Returns:
+            Tuple of (pair -> price data, strategy name)
+        """
+        symbols = pairs
+        if exchange.markets:
+            symbols = [pair for pair in pairs if pair in exchange.markets]
+            for pair in set(pairs) - set(symbols):
+                logger.warning(f"Par {pair} não listado em {exchange_id}")
+        if not symbols:
+            return {}, FETCH_PER_PAIR
+        
+        if self.fetch_mode == "auto":
+            for strategy, method in ((FETCH_BULK_TICKERS, "fetch_tickers"), (FETCH_BULK_BIDS_ASKS, "fetch_bids_asks")):
+                if not exchange.has.get(BULK_CAPABILITIES[strategy]):
+                    continue
+                try:
+                    tickers = await getattr(exchange, method)(symbols)
+                    received = time.time()
+                    data = {
+                        pair: self._ticker_to_quote(tickers[pair], exchange_id, received)
+                        for pair in symbols if pair in tickers
+                    }
+                    return data, strategy
+                except Exception as e:
+                    logger.warning(f"Busca em lote ({method}) falhou em {exchange_id}: {str(e)}")
+        
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        data = {}
+        async def fetch_pair(pair):
+            async with semaphore:
+                try:
+                    ticker = await exchange.fetch_ticker(pair)
+                    data[pair] = self._ticker_to_quote(ticker, exchange_id, time.time())
+                except Exception as e:
+                    logger.warning(f"Par {pair} não disponível em {exchange_id}: {str(e)}")
+        
+        await asyncio.gather(*(fetch_pair(pair) for pair in symbols))
+        return data, FETCH_PER_PAIR
+    
+    def _ticker_to_quote(self, ticker: Dict, exchange_id: str, received: float) -> Dict:
+        """
+        Reduce a CCXT ticker to the price data used by the detectors
+        
+        ``timestamp`` is the exchange's own time in seconds (None if the
+        ticker has none) and ``received`` the local receive time.
         """
-        market_data = {}
-        async def fetch_exchange_data(exchange_id):
+        timestamp = ticker.get("timestamp")
+        timestamp = timestamp / 1000 if timestamp else None
+        self.clock.observe_quote(exchange_id, timestamp, received)
+        return {
+            "bid": ticker["bid"],
+            "ask": ticker["ask"],
+            "volume": ticker.get("baseVolume"),
+            "timestamp": timestamp,
+            "received": received
+        }
+    
+    async def sync_clock(self, exchange, exchange_id: str) -> None:
+        """
+        Measure an exchange's clock offset and round trip with its server-time endpoint
+        
+        Args:
+            exchange: CCXT exchange instance
+            exchange_id: Exchange ID
+        """
+        sent = time.time()
+        server_time = await exchange.fetch_time()
+        received = time.time()
+        self.clock.observe_round_trip(exchange_id, sent, server_time / 1000, received)
+    
+    def _schedule_clock_sync(self, exchange, exchange_id: str) -> None:
+        """
+        Start a background clock sync when the last one is older than the tracker's interval
+        """
+        if not exchange.has.get("fetchTime") or not self.clock.needs_sync(exchange_id):
+            return
+        task = self._clock_syncs.get(exchange_id)
+        if task is not None and not task.done():
+            return
+        
+        async def sync():
             try:
-                exchange = getattr(ccxt, exchange_id)({'enableRateLimit': True})
-                data = {}
-                for pair in pairs:
-                    try:
-                        ticker = await exchange.fetch_ticker(pair)
-                        data[pair] = {
-                            "bid": ticker["bid"],
-                            "ask": ticker["ask"],
-                            "volume": ticker["baseVolume"]
-                        }
-                    except Exception as e:
-                        logger.warning(f"Par {pair} não disponível em {exchange_id}: {str(e)}")
-                market_data[exchange_id] = data
-                await exchange.close()
+                await self.sync_clock(exchange, exchange_id)
             except Exception as e:
-                logger.error(f"Erro ao buscar dados de {exchange_id}: {str(e)}")
+                logger.warning(f"Falha ao sincronizar relógio de {exchange_id}: {str(e)}")
         
-        await asyncio.gather(*(fetch_exchange_data(ex) for ex in exchanges))
-        return market_data
+        self._clock_syncs[exchange_id] = asyncio.create_task(sync())
     
-    def detect_simple_arbitrage(self, market_data: Dict) -> List[Dict]:
+    def market_snapshot(self, market_data: Dict) -> MarketSnapshot:
+        """
+        Build the columnar snapshot of a scan cycle, shared by all detectors
+        
+        Every detector accepts either the plain dictionary or the snapshot;
+        with the snapshot the quote matrices and per-exchange rate vectors
+        are read from its arrays instead of being rebuilt from dictionaries.
+        
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data
+            
+        Returns:
+            MarketSnapshot using the engine's symbol registry
+        """
+        return MarketSnapshot.from_market_data(market_data, self.symbol_registry)
+    
+    def top_opportunities(self, select: bool = True) -> TopK:
+        """
+        Create the bounded selection a detector feeds its opportunities into
+        
+        Args:
+            select: Apply ``top_k`` and ``top_k_per_pair``; False keeps every opportunity
+            
+        Returns:
+            TopK keeping the best ``top_k`` opportunities, at most ``top_k_per_pair`` per pair
+        """
+        if not select:
+            return TopK()
+        return TopK(self.top_k, self.top_k_per_pair)
+    
+    def detect_simple_arbitrage(self, market_data: Dict, select: bool = True) -> List[SimpleOpportunity]:
         """
         Detect simple arbitrage opportunities (same pair across different exchanges)
         
+        Quotes are laid out as exchange x pair bid/ask matrices and every
+        (buy exchange, sell exchange, pair) cross is evaluated at once with
+        NumPy; only the profitable crosses are turned into (slotted)
+        opportunity objects.
+        When local L2 books are available for both legs, the cross is sized
+        against them (see ``size_opportunity``). With ``top_k`` or
+        ``top_k_per_pair`` set, crosses that cannot beat the worst one kept
+        are skipped before being built. The selection is only meaningful
+        over the whole book: callers re-evaluating a slice of it pass
+        ``select=False`` and select from the combined result themselves.
+        
         Args:
             market_data: Dictionary of exchange -> pair -> price data
+            select: Keep only the best ``top_k`` / ``top_k_per_pair`` opportunities
             
         Returns:
             List of arbitrage opportunities
         """
-        opportunities = []
+        matrix = build_quote_matrix(market_data, self.clock.offsets)
+        buy_multipliers, sell_multipliers = taker_multipliers(matrix.exchanges, self.exchange_fees)
+        crosses = find_crosses(matrix, buy_multipliers, sell_multipliers, self.min_profit_threshold,
+                               now=time.time(), max_age=self.max_quote_age, max_skew=self.max_quote_skew)
+        return self._simple_opportunities(market_data, matrix, crosses, select)
+    
+    def _simple_opportunities(self, market_data: Dict, matrix: QuoteMatrix, crosses: tuple,
+                              select: bool = True) -> List[SimpleOpportunity]:
+        """
+        Build, size and select the opportunities of the profitable crosses
         
-        # Get all pairs that exist on multiple exchanges
-        all_pairs = set()
-        for exchange_data in market_data.values():
-            all_pairs.update(exchange_data.keys())
-        
-        # Check each pair
-        for pair in all_pairs:
-            # Get all exchanges that have this pair
-            exchanges_with_pair = []
-            for exchange, exchange_data in market_data.items():
-                if pair in exchange_data:
-                    exchanges_with_pair.append({
-                        "exchange": exchange,
-                        "bid": exchange_data[pair]["bid"],
-                        "ask": exchange_data[pair]["ask"],
-                        "volume": exchange_data[pair].get("volume", 0)
-                    })
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data
+            matrix: Quote matrix the crosses index into
+            crosses: (buy indices, sell indices, pair indices, profit percentages) as returned by find_crosses
+            select: Keep only the best ``top_k`` / ``top_k_per_pair`` opportunities
             
-            # Need at least 2 exchanges to compare
-            if len(exchanges_with_pair) < 2:
+        Returns:
+            Selected opportunities sorted by profit percentage (descending)
+        """
+        best = self.top_opportunities(select)
+        created = time.time()
+        for buy_idx, sell_idx, pair_idx, profit_pct in zip(*(c.tolist() for c in crosses)):
+            buy_exchange = matrix.exchanges[buy_idx]
+            sell_exchange = matrix.exchanges[sell_idx]
+            pair = matrix.pairs[pair_idx]
+            if not best.accepts(profit_pct, pair):
                 continue
+            buy_quote = market_data[buy_exchange][pair]
+            sell_quote = market_data[sell_exchange][pair]
+            buy_price = buy_quote["ask"]  # Price to buy at
+            sell_price = sell_quote["bid"]  # Price to sell at
+            precision = self.market_precision(buy_exchange, pair).finest(self.market_precision(sell_exchange, pair))
             
-            # Find best bid and ask across exchanges
-            for buy_ex in exchanges_with_pair:
-                for sell_ex in exchanges_with_pair:
-                    # Skip same exchange
-                    if buy_ex["exchange"] == sell_ex["exchange"]:
-                        continue
-                    
-                    # Calculate potential profit
-                    buy_price = buy_ex["ask"]  # Price to buy at
-                    sell_price = sell_ex["bid"]  # Price to sell at
-                    
-                    # Calculate fees
-                    buy_fee_pct = self.exchange_fees[buy_ex["exchange"]]["taker"] / 100
-                    sell_fee_pct = self.exchange_fees[sell_ex["exchange"]]["taker"] / 100
-                    
-                    # Calculate effective prices after fees
-                    effective_buy = buy_price * (1 + buy_fee_pct)
-                    effective_sell = sell_price * (1 - sell_fee_pct)
-                    
-                    # Calculate profit percentage
-                    profit_pct = ((effective_sell / effective_buy) - 1) * 100
-                    
-                    # If profitable above threshold
-                    if profit_pct > self.min_profit_threshold:
-                        # Calculate estimated profit for 1 unit
-                        estimated_profit = sell_price - buy_price - (buy_price * buy_fee_pct) - (sell_price * sell_fee_pct)
-                        
-                        # Create opportunity object
-                        opportunity = {
-                            "id": f"{buy_ex['exchange']}-{sell_ex['exchange']}-{pair}-{time.time()}",
-                            "pair": pair,
-                            "type": "simple",
-                            "buyExchange": buy_ex["exchange"],
-                            "sellExchange": sell_ex["exchange"],
-                            "buyPrice": buy_price,
-                            "sellPrice": sell_price,
-                            "spreadPercentage": profit_pct,
-                            "estimatedProfit": estimated_profit,
-                            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                            "buyVolume": buy_ex["volume"],
-                            "sellVolume": sell_ex["volume"]
-                        }
-                        
-                        opportunities.append(opportunity)
-                        logger.info(f"Oportunidade simples encontrada: {opportunity}")
-        
-        # Sort by profit percentage (descending)
-        opportunities.sort(key=lambda x: x["spreadPercentage"], reverse=True)
+            # Calculate estimated profit for 1 unit in scaled integers, so fees are exact
+            units = net_profit(
+                to_units(buy_price, precision.price), to_units(sell_price, precision.price), 10 ** precision.amount,
+                fee_ppm(self.exchange_fees[buy_exchange]["taker"]), fee_ppm(self.exchange_fees[sell_exchange]["taker"]),
+            )
+            estimated_profit = to_float(units, precision.notional)
+            
+            opportunity = SimpleOpportunity(
+                pair, buy_exchange, sell_exchange, buy_price, sell_price, profit_pct, estimated_profit, created,
+                buy_volume=buy_quote.get("volume") or 0, sell_volume=sell_quote.get("volume") or 0
+            )
+            if not self.size_opportunity(opportunity):
+                logger.debug("Cruzamento %s %s -> %s sem quantidade lucrativa no livro", pair, buy_exchange,
+                             sell_exchange)
+                continue
+            best.push(opportunity)
+        
+        # Already sorted by profit percentage (descending)
+        opportunities = best.items()
+        for opportunity in opportunities:
+            # Formatação adiada: o repr só é montado se o nível INFO estiver ativo
+            logger.info("Oportunidade simples encontrada: %s", opportunity)
         return opportunities
     
-    def detect_triangular_arbitrage(self, market_data: Dict, exchange: str) -> List[Dict]:
+    def depth_curve(self, exchange_id: str, pair: str, side: str) -> Optional[DepthCurve]:
+        """
+        Get the cumulative depth curve of one side of a local L2 book
+        
+        Curves are rebuilt only when the book changed since the previous call.
+        
+        Args:
+            exchange_id: Exchange ID
+            pair: Trading pair
+            side: "bids" or "asks"
+            
+        Returns:
+            DepthCurve, or None if there is no synced book for the pair
+        """
+        book = self.order_books.get(exchange_id, pair)
+        if book is None:
+            return None
+        key = (exchange_id, pair, side)
+        version = (book.sequence, book.timestamp)
+        cached = self._depth_curves.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        curve = DepthCurve(*getattr(book, side).arrays())
+        self._depth_curves[key] = (version, curve)
+        return curve
+    
+    def size_opportunity(self, opportunity: SimpleOpportunity) -> bool:
+        """
+        Size a simple opportunity against the L2 books of both exchanges
+        
+        Walks the buy exchange's asks and the sell exchange's bids to find the
+        amount that maximizes absolute profit after taker fees, and fills in
+        ``max_size``, ``buy_vwap``, ``sell_vwap`` and ``slippage_percentage``;
+        ``estimated_profit`` becomes the profit at that size.
+        Opportunities without local books for both legs are left as they are.
+        
+        Args:
+            opportunity: Simple arbitrage opportunity
+            
+        Returns:
+            False if the books have no profitable size, True otherwise
+        """
+        pair = opportunity.pair
+        buy_exchange, sell_exchange = opportunity.buy_exchange, opportunity.sell_exchange
+        asks = self.depth_curve(buy_exchange, pair, "asks")
+        bids = self.depth_curve(sell_exchange, pair, "bids")
+        if asks is None or bids is None:
+            return True
+        sizing = optimal_size(asks, bids, self.exchange_fees[buy_exchange]["taker"] / 100,
+                              self.exchange_fees[sell_exchange]["taker"] / 100, max_size=self.max_trade_size)
+        if sizing is None:
+            return False
+        for attribute, value in sizing.items():
+            setattr(opportunity, attribute, value)
+        return True
+    
+    def currency_graph(self, exchange: str, symbols: Dict) -> CurrencyGraph:
+        """
+        Get the currency graph of an exchange, synced with its currently listed pairs
+        
+        The graph is created on first use, shared by the triangular and
+        multi-leg detectors, and only updated (incrementally) when pairs are
+        listed or delisted.
+        
+        Args:
+            exchange: Exchange ID
+            symbols: Dictionary of pair -> price data currently quoted on the exchange
+            
+        Returns:
+            CurrencyGraph of the exchange
+        """
+        graph = self.currency_graphs.get(exchange)
+        if graph is None:
+            graph = self.currency_graphs[exchange] = CurrencyGraph()
+        if symbols.keys() != graph.listed:
+            graph.sync(symbols)
+        return graph
+    
+    def triangle_index(self, exchange: str, symbols: Dict) -> TriangleIndex:
+        """
+        Get the triangle index of an exchange, synced with its currently listed pairs
+        
+        Args:
+            exchange: Exchange ID
+            symbols: Dictionary of pair -> price data currently quoted on the exchange
+            
+        Returns:
+            TriangleIndex over the exchange's currency graph
+        """
+        graph = self.currency_graph(exchange, symbols)
+        index = self.triangle_indexes.get(exchange)
+        if index is None:
+            index = self.triangle_indexes[exchange] = TriangleIndex(graph)
+        return index
+    
+    def detect_triangular_arbitrage(self, market_data: Dict, exchange: str) -> List[RouteOpportunity]:
         """
         Detect triangular arbitrage opportunities within a single exchange
         
+        Only currency triplets whose three legs are all listed are evaluated,
+        using the exchange's precomputed triangle index, and all of them are
+        priced in one vectorized pass. Each leg converts at the bid when
+        selling a pair's base currency and at 1 / ask when buying it.
+        
         Args:
             market_data: Dictionary of exchange -> pair -> price data
             exchange: The exchange to check for triangular arbitrage
@@ -169,114 +700,434 @@ class ArbitrageEngine:
             logger.warning(f"Exchange {exchange} não encontrada nos dados de mercado")
             return []
         
+        exchange_data = market_data[exchange]
+        index = self.triangle_index(exchange, exchange_data)
+        fee = self.exchange_fees[exchange]["taker"] / 100
+        rates = index.graph.conversion_rates(exchange_data)
+        hits, profits = index.evaluate(rates, fee, self.min_profit_threshold)
+        return self._triangular_hits(exchange, index, rates, fee, hits, profits)
+    
+    def _triangular_hits(self, exchange: str, index: TriangleIndex, rates: np.ndarray, fee: float,
+                         hits: np.ndarray, profits: np.ndarray) -> List[RouteOpportunity]:
+        """
+        Build and select the opportunities of the profitable directed triangles
+        
+        Args:
+            exchange: Exchange ID
+            index: Triangle index of the exchange
+            rates: Conversion rate of each directed edge
+            fee: Taker fee as a fraction
+            hits: Indices of the profitable cycles in ``index.cycles()``
+            profits: Profit percentage of each hit
+            
+        Returns:
+            Selected opportunities sorted by profit percentage (descending)
+        """
+        best = self.top_opportunities()
+        graph = index.graph
+        cycles, cycle_edges = index.cycles()
+        created = time.time()
+        for cycle, profit_pct in zip(hits.tolist(), profits.tolist()):
+            if not best.accepts(profit_pct):
+                continue
+            best.extend(self._triangular_opportunities(
+                exchange, graph, rates, fee, cycles[cycle].tolist(), cycle_edges[cycle].tolist(), profit_pct, created
+            ))
+        
+        # Already sorted by profit percentage (descending)
+        opportunities = best.items()
+        for opportunity in opportunities:
+            logger.info("Oportunidade triangular encontrada: %s", opportunity)
+        return opportunities
+    
+    def _triangular_opportunities(self, exchange: str, graph: CurrencyGraph, rates, fee: float, cycle: List[int],
+                                  edges: List[int], profit_pct: float, created: float) -> List[RouteOpportunity]:
+        """
+        Build the opportunities of one profitable directed triangle
+        
+        Args:
+            exchange: Exchange ID
+            graph: Currency graph of the exchange
+            rates: Conversion rate of each directed edge
+            fee: Taker fee as a fraction
+            cycle: Currency IDs in trade order
+            edges: Directed edge of each leg
+            profit_pct: Profit percentage of the cycle
+            created: Detection time (epoch seconds)
+            
+        Returns:
+            One opportunity per starting currency
+        """
         opportunities = []
+        currencies = [graph.currencies[c] for c in cycle]
+        legs = [(graph.edge_symbol(edge), float(rates[edge]), fee) for edge in edges]
+        # Report the cycle from each of its currencies, as every starting currency is a valid entry point
+        for start in range(3):
+            a, b, c = currencies[start:] + currencies[:start]
+            opportunities.append(RouteOpportunity("triangular", f"{a}/{b}/{c}", exchange,
+                                                  legs[start:] + legs[:start], profit_pct, created))
+        return opportunities
+    
+    async def detect_sharded(self, market_data: Dict, exchanges: List[str]) -> List[Opportunity]:
+        """
+        Run simple and triangular detection for a scan cycle on the sharding process pool
+        
+        The pair universe and each exchange's triangle set are split across
+        ``self.sharding``'s processes, which read the quote matrices and
+        conversion rates from shared memory and return only the profitable
+        indices; the event loop stays free while they run. Opportunities are
+        then built and sized here, exactly as in the single-process
+        detectors, and merged into one ranked list.
+        
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data (or its MarketSnapshot)
+            exchanges: Exchanges to search for triangular arbitrage
+            
+        Returns:
+            Simple and triangular opportunities sorted by profit percentage (descending)
+        """
+        snapshot = self.market_snapshot(market_data)
+        matrix = build_quote_matrix(snapshot, self.clock.offsets)
+        buy_multipliers, sell_multipliers = taker_multipliers(matrix.exchanges, self.exchange_fees)
+        triangles = {}
+        for exchange in exchanges:
+            if exchange not in snapshot:
+                logger.warning(f"Exchange {exchange} não encontrada nos dados de mercado")
+                continue
+            index = self.triangle_index(exchange, snapshot[exchange])
+            rates = index.graph.conversion_rates(snapshot[exchange])
+            triangles[exchange] = (index, rates, self.exchange_fees[exchange]["taker"] / 100, index.graph.version)
+        
+        crosses, cycle_hits = await self.sharding.detect(
+            matrix, buy_multipliers, sell_multipliers, self.min_profit_threshold,
+            {exchange: (rates, index.cycles()[1], fee) for exchange, (index, rates, fee, _) in triangles.items()},
+            now=time.time(), max_age=self.max_quote_age, max_skew=self.max_quote_skew,
+        )
+        opportunities = self._simple_opportunities(snapshot, matrix, crosses)
+        for exchange, (hits, profits) in cycle_hits.items():
+            index, rates, fee, version = triangles[exchange]
+            if index.graph.version != version:
+                # Os mercados mudaram durante a busca: os índices dos ciclos não valem mais
+                logger.debug("Triângulos de %s descartados: grafo alterado durante a busca", exchange)
+                continue
+            opportunities.extend(self._triangular_hits(exchange, index, rates, fee, hits, profits))
+        return select_top(opportunities)
+    
+    def detect_multi_leg_arbitrage(self, market_data: Dict, exchange: str,
+                                   min_length: int = 3) -> List[RouteOpportunity]:
+        """
+        Detect arbitrage cycles of 3 to ``max_cycle_length`` legs within a single exchange
+        
+        Profitable cycles are negative cycles of the exchange's currency graph
+        weighted by -log(rate * (1 - taker fee)). The search is capped at
+        ``max_cycles`` cycles and ``cycle_time_budget`` seconds, so it may
+        return a partial result on large universes.
+        
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data
+            exchange: The exchange to search
+            min_length: Minimum legs of a reported cycle (4 skips the cycles already covered by detect_triangular_arbitrage)
+            
+        Returns:
+            List of multi-leg arbitrage opportunities
+        """
+        if exchange not in market_data:
+            logger.warning(f"Exchange {exchange} não encontrada nos dados de mercado")
+            return []
+        
         exchange_data = market_data[exchange]
+        graph = self.currency_graph(exchange, exchange_data)
+        detector = self.cycle_detectors.get(exchange)
+        if detector is None or detector.graph is not graph:
+            detector = self.cycle_detectors[exchange] = NegativeCycleDetector(graph)
+        detector.max_length = self.max_cycle_length
+        detector.max_cycles = self.max_cycles
+        detector.time_budget = self.cycle_time_budget
+        fee = self.exchange_fees[exchange]["taker"] / 100
+        rates = graph.conversion_rates(exchange_data)
+        cycles = detector.find(rates, fee, self.min_profit_threshold, min_length=min_length)
+        if detector.timed_out:
+            logger.warning("Busca de ciclos em %s interrompida pelo limite de tempo", exchange)
         
-        # Extract all currencies from pairs
-        currencies = set()
-        for pair in exchange_data.keys():
-            base, quote = pair.split('/')
-            currencies.add(base)
-            currencies.add(quote)
-        
-        # For each currency triplet (A, B, C), check if we can go A->B->C->A
-        for a in currencies:
-            for b in currencies:
-                if a == b:
-                    continue
-                    
-                for c in currencies:
-                    if a == c or b == c:
-                        continue
-                    
-                    # Check if all required pairs exist
-                    ab_pair = f"{a}/{b}"
-                    bc_pair = f"{b}/{c}"
-                    ca_pair = f"{c}/{a}"
-                    
-                    # We might need to invert some pairs
-                    ab_exists = ab_pair in exchange_data
-                    ba_exists = f"{b}/{a}" in exchange_data
-                    bc_exists = bc_pair in exchange_data
-                    cb_exists = f"{c}/{b}" in exchange_data
-                    ca_exists = ca_pair in exchange_data
-                    ac_exists = f"{a}/{c}" in exchange_data
-                    
-                    if not ((ab_exists or ba_exists) and (bc_exists or cb_exists) and (ca_exists or ac_exists)):
-                        continue
-                    
-                    # Calculate rates for each step
-                    try:
-                        # Step 1: A -> B
-                        if ab_exists:
-                            rate_ab = 1 / exchange_data[ab_pair]["ask"]  # How much B we get for 1 A
-                            fee_ab = self.exchange_fees[exchange]["taker"] / 100
-                        else:
-                            rate_ab = exchange_data[f"{b}/{a}"]["bid"]  # How much B we get for 1 A
-                            fee_ab = self.exchange_fees[exchange]["taker"] / 100
-                        
-                        # Step 2: B -> C
-                        if bc_exists:
-                            rate_bc = 1 / exchange_data[bc_pair]["ask"]  # How much C we get for 1 B
-                            fee_bc = self.exchange_fees[exchange]["taker"] / 100
-                        else:
-                            rate_bc = exchange_data[f"{c}/{b}"]["bid"]  # How much C we get for 1 B
-                            fee_bc = self.exchange_fees[exchange]["taker"] / 100
-                        
-                        # Step 3: C -> A
-                        if ca_exists:
-                            rate_ca = 1 / exchange_data[ca_pair]["ask"]  # How much A we get for 1 C
-                            fee_ca = self.exchange_fees[exchange]["taker"] / 100
-                        else:
-                            rate_ca = exchange_data[f"{a}/{c}"]["bid"]  # How much A we get for 1 C
-                            fee_ca = self.exchange_fees[exchange]["taker"] / 100
-                        
-                        # Calculate final amount after all trades (starting with 1 unit of A)
-                        amount_b = rate_ab * (1 - fee_ab)  # A -> B
-                        amount_c = amount_b * rate_bc * (1 - fee_bc)  # B -> C
-                        final_amount_a = amount_c * rate_ca * (1 - fee_ca)  # C -> A
-                        
-                        # Calculate profit percentage
-                        profit_pct = ((final_amount_a / 1) - 1) * 100
-                        
-                        if profit_pct > self.min_profit_threshold:
-                            opportunity = {
-                                "id": f"{exchange}-triangular-{a}-{b}-{c}-{time.time()}",
-                                "pair": f"{a}/{b}/{c}",
-                                "type": "triangular",
-                                "exchange": exchange,
-                                "steps": [
-                                    {"pair": ab_pair if ab_exists else f"{b}/{a}", "rate": rate_ab, "fee": fee_ab},
-                                    {"pair": bc_pair if bc_exists else f"{c}/{b}", "rate": rate_bc, "fee": fee_bc},
-                                    {"pair": ca_pair if ca_exists else f"{a}/{c}", "rate": rate_ca, "fee": fee_ca}
-                                ],
-                                "profitPercentage": profit_pct,
-                                "estimatedProfit": final_amount_a - 1,
-                                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-                            }
-                            opportunities.append(opportunity)
-                            logger.info(f"Oportunidade triangular encontrada: {opportunity}")
-                    
-                    except Exception as e:
-                        logger.error(f"Erro ao calcular arbitragem triangular {a}-{b}-{c}: {str(e)}")
-                        continue
-        
-        # Sort by profit percentage (descending)
-        opportunities.sort(key=lambda x: x["profitPercentage"], reverse=True)
+        best = self.top_opportunities()
+        created = time.time()
+        for currencies, edges, profit_pct in cycles:
+            codes = [graph.currencies[c] for c in currencies]
+            legs = [(graph.edge_symbol(edge), float(rates[edge]), fee) for edge in edges]
+            best.push(RouteOpportunity("multi_leg", "/".join(codes), exchange, legs, profit_pct, created))
+        opportunities = best.items()
+        for opportunity in opportunities:
+            logger.info("Oportunidade multi-perna encontrada: %s", opportunity)
         return opportunities
 
+    def detect_cross_exchange_arbitrage(self, market_data: Dict) -> List[RouteOpportunity]:
+        """
+        Detect routes that trade on several exchanges and move funds between them
+        
+        The search runs over a multi-venue graph whose nodes are currencies
+        on each exchange: trading edges carry the exchange's taker fee and
+        transfer edges carry the configured withdrawal fee and latency
+        penalty. Only cycles with at least one transfer are reported, as
+        single-exchange cycles are covered by the other detectors.
+        
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data
+            
+        Returns:
+            List of cross-exchange arbitrage opportunities
+        """
+        known = {ex: quotes for ex, quotes in market_data.items() if ex in self.exchange_fees}
+        graph = self.venue_graph
+        rates, fees = graph.rates(known, self.exchange_fees)
+        detector = self.venue_detector
+        if detector is None or detector.graph is not graph:
+            detector = self.venue_detector = NegativeCycleDetector(graph)
+        detector.max_length = self.max_route_length
+        detector.max_cycles = self.max_cycles
+        detector.time_budget = self.cycle_time_budget
+        cycles = detector.find(rates, fees, self.min_profit_threshold,
+                               accept=lambda edges: any(graph.is_transfer(edge) for edge in edges))
+        if detector.timed_out:
+            logger.warning("Busca de rotas entre exchanges interrompida pelo limite de tempo")
+        
+        best = self.top_opportunities()
+        created = time.time()
+        for nodes, edges, profit_pct in cycles:
+            opportunity = RouteOpportunity(
+                "cross_exchange", "/".join(graph.nodes[node][1] for node in nodes), graph.nodes[nodes[0]][0],
+                [graph.describe(edge, rates, fees) for edge in edges], profit_pct, created,
+                exchanges=sorted({graph.nodes[node][0] for node in nodes}),
+                route=[graph.currencies[node] for node in nodes],
+            )
+            best.push(opportunity)
+        opportunities = best.items()
+        for opportunity in opportunities:
+            logger.info("Oportunidade entre exchanges encontrada: %s", opportunity)
+        return opportunities
+    
+    def detect_stat_arb(self, market_data: Dict, now: Optional[float] = None) -> List[StatArbOpportunity]:
+        """
+        Update the rolling spread statistics and emit mean-reversion signals
+        
+        Every (pair, exchange A, exchange B) spread quoted on both exchanges is
+        fed to ``self.spread_tracker``. A series whose spread deviates from its
+        rolling mean by at least ``entry_z`` standard deviations becomes a
+        signal to buy on the relatively cheap exchange and sell on the rich
+        one. ``estimated_profit`` is the per-unit gain if the spread reverts
+        to its mean, net of taker fees to open and close both legs.
+        
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data (or its MarketSnapshot)
+            now: Update time in epoch seconds (current time if None)
+            
+        Returns:
+            Signals sorted by absolute z-score (descending)
+        """
+        snapshot = self.market_snapshot(market_data)
+        tracker = self.spread_tracker
+        slots, first, second, columns, z = tracker.update(snapshot, now)
+        hits = np.flatnonzero(tracker.signals(slots, z))
+        half_lives = tracker.half_life(slots[hits])
+        deviations = np.abs(tracker.last[slots[hits]] - tracker.mean[slots[hits]])
+        
+        best = TopK(self.top_k, self.top_k_per_pair, key=lambda opportunity: abs(opportunity.z_score))
+        created = time.time()
+        for hit, half_life, deviation in zip(hits.tolist(), half_lives.tolist(), deviations.tolist()):
+            column, z_score = columns[hit], float(z[hit])
+            # Spread = ln(mid B / mid A): z > 0 means B is rich relative to A
+            buy_row, sell_row = (first[hit], second[hit]) if z_score > 0 else (second[hit], first[hit])
+            buy_exchange, sell_exchange = snapshot.exchanges[buy_row], snapshot.exchanges[sell_row]
+            if buy_exchange not in self.exchange_fees or sell_exchange not in self.exchange_fees:
+                continue
+            buy_price = float(snapshot.asks[buy_row, column])
+            sell_price = float(snapshot.bids[sell_row, column])
+            fees = (self.exchange_fees[buy_exchange]["taker"] + self.exchange_fees[sell_exchange]["taker"]) / 100
+            estimated_profit = buy_price * (np.expm1(deviation) - 2 * fees)
+            if estimated_profit <= 0:
+                continue
+            best.push(StatArbOpportunity(
+                snapshot.symbols[column], buy_exchange, sell_exchange, buy_price, sell_price,
+                (sell_price / buy_price - 1) * 100, float(estimated_profit), created, z_score,
+                half_life if np.isfinite(half_life) else None,
+                buy_volume=float(np.nan_to_num(snapshot.volumes[buy_row, column])),
+                sell_volume=float(np.nan_to_num(snapshot.volumes[sell_row, column])),
+            ))
+        opportunities = best.items()
+        for opportunity in opportunities:
+            logger.info("Sinal de reversão do spread: %s (z=%.2f)", opportunity, opportunity.z_score)
+        return opportunities
+    
+    def changed_quotes(self, market_data: Dict) -> set:
+        """
+        Find the (exchange, pair) quotes that changed since the previous call
+        
+        Streamed exchanges report their updates through the quote table's
+        change log; polled exchanges are compared with the previous cycle.
+        Quotes that disappeared also count as changed.
+        
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data
+            
+        Returns:
+            Set of (exchange, pair)
+        """
+        streamed = {ex for ex in market_data if ex in self.feeds or ex in self.depth_feeds}
+        changed = {
+            (ex, pair) for ex, pair in self.quote_table.drain_changes()
+            if ex in streamed and pair in market_data[ex]
+        }
+        signatures = {}
+        for exchange_id, quotes in market_data.items():
+            if exchange_id in streamed:
+                continue
+            for pair, quote in quotes.items():
+                key = (exchange_id, pair)
+                signature = (quote.get("bid"), quote.get("ask"), quote.get("timestamp"), quote.get("received"))
+                signatures[key] = signature
+                if self._quote_signatures.get(key) != signature:
+                    changed.add(key)
+        changed.update(key for key in self._quote_signatures if key not in signatures and key[0] not in streamed)
+        self._quote_signatures = signatures
+        return changed
+    
+    def update_opportunities(self, market_data: Dict, changed: Optional[set] = None) -> List[Tuple[str, Opportunity]]:
+        """
+        Re-evaluate only the crosses and triangles that depend on changed quotes
+        
+        A changed (exchange, pair) quote re-evaluates the pair across all
+        exchanges and the triangles that use the pair on its exchange (found
+        through the exchange's triangle index). ``live_opportunities`` keeps
+        the currently open opportunities; the differences are returned as
+        events. Simple opportunities whose quotes exceed ``max_quote_age``
+        are re-evaluated (and dropped) even without a new quote. The live set
+        keeps every profitable opportunity; ``top_k`` and ``top_k_per_pair``
+        apply only when selecting from it (see ``top_live_opportunities``).
+        
+        Args:
+            market_data: Dictionary of exchange -> pair -> price data
+            changed: Set of (exchange, pair) that changed (computed with changed_quotes if None)
+            
+        Returns:
+            List of ("add" | "update" | "remove", opportunity) events
+        """
+        if changed is None:
+            changed = self.changed_quotes(market_data)
+        events = []
+        
+        pairs = {pair for _, pair in changed}
+        if self.max_quote_age is not None:
+            now = time.time()
+            for opportunity in self.live_opportunities.opportunities.values():
+                if opportunity.type != "simple":
+                    continue
+                for exchange_id in (opportunity.buy_exchange, opportunity.sell_exchange):
+                    quote = market_data.get(exchange_id, {}).get(opportunity.pair)
+                    quote_time = None if quote is None else self.clock.quote_time(exchange_id, quote)
+                    if quote_time is not None and now - quote_time > self.max_quote_age:
+                        pairs.add(opportunity.pair)
+        if pairs:
+            subset = {
+                exchange_id: {pair: quotes[pair] for pair in pairs if pair in quotes}
+                for exchange_id, quotes in market_data.items()
+            }
+            crosses: Dict[str, Dict] = {pair: {} for pair in pairs}
+            # Sem top-K: a seleção de uma fatia do livro descartaria pares que seguem lucrativos
+            for opportunity in self.detect_simple_arbitrage(subset, select=False):
+                key = (opportunity.pair, opportunity.buy_exchange, opportunity.sell_exchange)
+                crosses[opportunity.pair][key] = opportunity
+            for pair, current in crosses.items():
+                events.extend(self.live_opportunities.replace(("simple", pair), current))
+        
+        by_exchange: Dict[str, List[str]] = {}
+        for exchange_id, pair in changed:
+            by_exchange.setdefault(exchange_id, []).append(pair)
+        for exchange_id, symbols in by_exchange.items():
+            if exchange_id in market_data:
+                events.extend(self._update_triangles(exchange_id, market_data[exchange_id], symbols))
+            else:
+                # Exchange left the cycle (deadline or failure): its triangles can no longer be traded
+                events.extend(self.live_opportunities.drop(
+                    lambda group: group[0] == "triangular" and group[1] == exchange_id
+                ))
+        return events
+    
+    def top_live_opportunities(self) -> List[Opportunity]:
+        """
+        Select the best open opportunities for broadcast and execution
+        
+        Returns:
+            The best ``top_k`` live opportunities (at most ``top_k_per_pair`` per pair), best first
+        """
+        return select_top(self.live_opportunities.sorted(), self.top_k, self.top_k_per_pair)
+    
+    def _update_triangles(self, exchange: str, exchange_data: Dict, symbols: List[str]) -> List[Tuple[str, Opportunity]]:
+        """
+        Re-evaluate the triangles of an exchange that use the changed pairs
+        
+        Args:
+            exchange: Exchange ID
+            exchange_data: Dictionary of pair -> price data of the exchange
+            symbols: Changed pairs
+            
+        Returns:
+            List of live opportunity events
+        """
+        index = self.triangle_indexes.get(exchange)
+        if index is None or any(symbol in exchange_data and symbol not in index.graph.listed for symbol in symbols):
+            # New listing: the index is updated incrementally; quotes that disappeared only leave NaN rates
+            index = self.triangle_index(exchange, exchange_data)
+        graph = index.graph
+        fee = self.exchange_fees[exchange]["taker"] / 100
+        
+        version, rates = self._live_rates.get(exchange, (None, None))
+        if version != graph.version:
+            rates = graph.conversion_rates(exchange_data)
+            self._live_rates[exchange] = (graph.version, rates)
+            triangles = set(index.triangles)
+            events = self.live_opportunities.drop(
+                lambda group: group[0] == "triangular" and group[1] == exchange and group[2] not in index.triangles
+            )
+        else:
+            triangles = set()
+            events = []
+            for symbol in symbols:
+                slot = graph.market_slots.get(symbol)
+                if slot is None:
+                    continue
+                quote = exchange_data.get(symbol) or {}
+                bid, ask = quote.get("bid"), quote.get("ask")
+                rates[2 * slot] = bid if bid else np.nan
+                rates[2 * slot + 1] = 1.0 / ask if ask else np.nan
+                _, base, quote_id = graph.markets[slot]
+                triangles |= index.touching((min(base, quote_id), max(base, quote_id)))
+        
+        created = time.time()
+        current: Dict[tuple, Dict] = {triangle: {} for triangle in triangles}
+        for cycle, edges, profit_pct in index.evaluate_triangles(triangles, rates, fee, self.min_profit_threshold):
+            triangle = tuple(sorted(cycle))
+            for opportunity in self._triangular_opportunities(exchange, graph, rates, fee, cycle, edges, profit_pct,
+                                                              created):
+                current[triangle][(exchange, opportunity.pair)] = opportunity
+        for triangle, opportunities in current.items():
+            events.extend(self.live_opportunities.replace(("triangular", exchange, triangle), opportunities))
+        return events
+
 async def main():
     engine = ArbitrageEngine(min_profit_threshold=0.5)
     exchanges = ["binance", "kraken"]
     pairs = ["BTC/USDT", "ETH/USDT"]
-    market_data = await engine.fetch_market_data(exchanges, pairs)
+    await engine.start(exchanges)
+    try:
+        market_data = await engine.fetch_market_data(exchanges, pairs)
+    finally:
+        await engine.close()
     simple_opportunities = engine.detect_simple_arbitrage(market_data)
     triangular_opportunities = engine.detect_triangular_arbitrage(market_data, "binance")
     
     for opp in simple_opportunities:
-        logger.info(f"Simple: {opp['buyExchange']} -> {opp['sellExchange']} ({opp['pair']}): {opp['spreadPercentage']:.2f}%")
+        logger.info(f"Simple: {opp.buy_exchange} -> {opp.sell_exchange} ({opp.pair}): {opp.spread_percentage:.2f}%")
     for opp in triangular_opportunities:
-        logger.info(f"Triangular: {opp['exchange']} ({opp['pair']}): {opp['profitPercentage']:.2f}%")
+        logger.info(f"Triangular: {opp.exchange} ({opp.pair}): {opp.profit_percentage:.2f}%")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,22 +1,32 @@
 import pandas as pd
 import numpy as np
+from core.fixedpoint import DEFAULT_DECIMALS, to_float, to_units
 from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.feeds.recorder import JournalReader
 import ccxt.async_support as ccxt
 import asyncio
 import logging
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Tuple
 from api.models import Trade
 
 logger = logging.getLogger(__name__)
 
 class BacktestEngine:
-    def __init__(self, exchanges: List[str], pairs: List[str], start_date: datetime, end_date: datetime, initial_balance: float):
+    def __init__(self, exchanges: List[str], pairs: List[str], start_date: datetime, end_date: datetime, initial_balance: float,
+                 journal_dir: Optional[str] = None, replay_interval: float = 1.0):
+        """
+        Inicializa o backtest.
+        :param journal_dir: Diretório dos diários gravados pelo MarketDataRecorder; sem ele os preços são simulados
+        :param replay_interval: Intervalo em segundos entre snapshots reproduzidos do diário
+        """
         self.exchanges = exchanges
         self.pairs = pairs
         self.start_date = start_date
         self.end_date = end_date
         self.initial_balance = initial_balance
+        self.journal_dir = journal_dir
+        self.replay_interval = replay_interval
         self.engine = ArbitrageEngine()
         self.trades = []
 
@@ -43,49 +53,66 @@ class BacktestEngine:
             await exchange.close()
         return market_data
 
+    def replay_journal(self) -> Iterator[Tuple[pd.Timestamp, Dict]]:
+        """Reproduz os snapshots de mercado gravados entre start_date e end_date."""
+        reader = JournalReader(self.journal_dir)
+        snapshots = reader.snapshots(self.exchanges, self.pairs, pd.Timestamp(self.start_date).timestamp(),
+                                     pd.Timestamp(self.end_date).timestamp(), self.replay_interval)
+        for ts, snapshot in snapshots:
+            yield pd.Timestamp(ts, unit="s"), snapshot
+
+    def simulated_snapshots(self, market_data: Dict) -> Iterator[Tuple[pd.Timestamp, Dict]]:
+        """Monta um snapshot por hora a partir dos dados simulados."""
+        for ts in pd.date_range(start=self.start_date, end=self.end_date, freq='1H'):
+            snapshot = {}
+            for exchange_id, pairs_data in market_data.items():
+                snapshot[exchange_id] = {}
+                for pair, candles in pairs_data.items():
+                    for candle in candles:
+                        if candle["timestamp"].startswith(ts.isoformat()):
+                            snapshot[exchange_id][pair] = {
+                                "bid": candle["bid"],
+                                "ask": candle["ask"],
+                                "volume": candle["volume"]
+                            }
+                            break
+            yield ts, snapshot
+
     async def run(self) -> Dict:
         """Executa o backtest."""
         try:
-            market_data = await self.fetch_historical_data()
-            balance = self.initial_balance
+            if self.journal_dir:
+                snapshots = self.replay_journal()
+            else:
+                snapshots = self.simulated_snapshots(await self.fetch_historical_data())
+            # Saldo em inteiros escalados: somar milhares de lucros em float acumula erro
+            balance = to_units(self.initial_balance, DEFAULT_DECIMALS)
             trades = []
 
-            for ts in pd.date_range(start=self.start_date, end=self.end_date, freq='1H'):
-                snapshot = {}
-                for exchange_id, pairs_data in market_data.items():
-                    snapshot[exchange_id] = {}
-                    for pair, candles in pairs_data.items():
-                        for candle in candles:
-                            if candle["timestamp"].startswith(ts.isoformat()):
-                                snapshot[exchange_id][pair] = {
-                                    "bid": candle["bid"],
-                                    "ask": candle["ask"],
-                                    "volume": candle["volume"]
-                                }
-                                break
-
+            for ts, snapshot in snapshots:
+                snapshot = self.engine.market_snapshot(snapshot)
                 opportunities = self.engine.detect_simple_arbitrage(snapshot)
                 for exchange in self.exchanges:
                     triangular_opps = self.engine.detect_triangular_arbitrage(snapshot, exchange)
                     opportunities.extend(triangular_opps)
 
                 for opp in opportunities:
-                    if opp.get("estimatedProfit", opp.get("profitPercentage", 0)) > 0:
+                    if opp.estimated_profit > 0:
                         trade = Trade(
                             id=f"backtest-{ts.timestamp()}",
                             timestamp=ts.isoformat(),
-                            pair=opp["pair"],
-                            buy_exchange=opp.get("buyExchange", opp.get("exchange")),
-                            sell_exchange=opp.get("sellExchange", opp.get("exchange")),
-                            profit=opp.get("estimatedProfit", opp.get("profitPercentage")),
+                            pair=opp.pair,
+                            buy_exchange=getattr(opp, "buy_exchange", None) or opp.exchange,
+                            sell_exchange=getattr(opp, "sell_exchange", None) or opp.exchange,
+                            profit=opp.estimated_profit,
                             status="completed"
                         )
                         trades.append(trade.dict())
-                        balance += trade.profit
+                        balance += to_units(trade.profit, DEFAULT_DECIMALS)
 
             # Calcula métricas
             total_trades = len(trades)
-            total_profit = balance - self.initial_balance
+            total_profit = to_float(balance - to_units(self.initial_balance, DEFAULT_DECIMALS), DEFAULT_DECIMALS)
             win_rate = len([t for t in trades if t["profit"] > 0]) / total_trades if total_trades > 0 else 0
             returns = pd.Series([t["profit"] for t in trades])
             max_drawdown = self.calculate_max_drawdown(returns)
@@ -1,24 +1,43 @@
 import ccxt.async_support as ccxt
 import asyncio
 import logging
+import time
+from scripts.connectors.markets_cache import MarketMetadataCache
+from scripts.feeds.recorder import MarketDataRecorder
 
 logger = logging.getLogger(__name__)
 
 class CEXConnector:
-    def __init__(self, exchange_id: str, api_key: str = None, api_secret: str = None):
+    def __init__(self, exchange_id: str, api_key: str = None, api_secret: str = None,
+                 markets_cache: MarketMetadataCache = None, recorder: MarketDataRecorder = None):
         """
         Inicializa um conector para uma exchange centralizada.
         :param exchange_id: ID da exchange (ex: 'binance')
         :param api_key: Chave API (opcional)
         :param api_secret: Chave secreta (opcional)
+        :param markets_cache: Cache em disco dos mercados (opcional)
+        :param recorder: Gravador que recebe os tickers buscados (opcional)
         """
         self.exchange_id = exchange_id
+        self.markets_cache = markets_cache
+        self.recorder = recorder
         self.exchange = getattr(ccxt, exchange_id)({
             'enableRateLimit': True,
             'apiKey': api_key,
             'secret': api_secret
         })
 
+    async def load_markets(self) -> dict:
+        """
+        Carrega os mercados da exchange, usando o cache em disco se configurado.
+        :return: Mercados no formato ccxt
+        """
+        if self.exchange.markets:
+            return self.exchange.markets
+        if self.markets_cache is not None:
+            return await self.markets_cache.load_markets(self.exchange)
+        return await self.exchange.load_markets()
+
     async def fetch_ticker(self, pair: str) -> dict:
         """
         Busca o ticker de um par de negociação.
@@ -26,12 +45,19 @@ class CEXConnector:
         :return: Dados do ticker
         """
         try:
+            await self.load_markets()
             ticker = await self.exchange.fetch_ticker(pair)
-            return {
+            quote = {
                 "bid": ticker["bid"],
                 "ask": ticker["ask"],
                 "volume": ticker["baseVolume"]
             }
+            if self.recorder is not None:
+                timestamp = ticker.get("timestamp")
+                self.recorder.record_ticker(self.exchange_id, pair, dict(
+                    quote, timestamp=timestamp / 1000 if timestamp else None, received=time.time()
+                ))
+            return quote
         except Exception as e:
             logger.error(f"Erro ao buscar ticker em {self.exchange_id}: {str(e)}")
             return None
@@ -44,6 +70,7 @@ class CEXConnector:
         :return: True se conectado, False caso contrário
         """
         try:
+            await self.load_markets()
             await self.exchange.fetch_tickers()
             logger.info(f"Conexão com {self.exchange_id} bem-sucedida")
             return True
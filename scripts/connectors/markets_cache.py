@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import ccxt.async_support as ccxt
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o formato do arquivo mudar
+CACHE_VERSION = 1
+
+class MarketMetadataCache:
+    """
+    Cache em disco do resultado de load_markets (mercados, moedas e precisões).
+
+    Cada exchange tem um arquivo JSON com a versão do formato, a versão do
+    ccxt e o instante de gravação. Um cache válido é aplicado na hora com
+    set_markets; se estiver vencido, os mercados são recarregados da
+    exchange em segundo plano e o arquivo é regravado.
+    """
+
+    def __init__(self, directory: str = "data/markets", ttl: float = 6 * 3600):
+        """
+        Inicializa o cache.
+        :param directory: Diretório dos arquivos de cache
+        :param ttl: Tempo em segundos após o qual os mercados são recarregados em segundo plano
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self._refreshes: Dict[str, asyncio.Task] = {}
+
+    def path(self, exchange_id: str) -> str:
+        return os.path.join(self.directory, f"{exchange_id}.json")
+
+    def read(self, exchange_id: str) -> Optional[dict]:
+        """
+        Lê o cache de uma exchange.
+        :param exchange_id: ID da exchange
+        :return: Entrada do cache ou None se ausente, corrompida ou de outra versão
+        """
+        try:
+            with open(self.path(exchange_id), "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache de mercados de {exchange_id} ilegível: {str(e)}")
+            return None
+        if entry.get("version") != CACHE_VERSION or entry.get("ccxt_version") != ccxt.__version__:
+            return None
+        return entry
+
+    def write(self, exchange_id: str, markets: dict, currencies: Optional[dict]) -> None:
+        """
+        Grava os mercados de uma exchange de forma atômica.
+        :param exchange_id: ID da exchange
+        :param markets: Mercados no formato ccxt
+        :param currencies: Moedas no formato ccxt
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            "version": CACHE_VERSION,
+            "ccxt_version": ccxt.__version__,
+            "saved_at": time.time(),
+            "markets": markets,
+            "currencies": currencies,
+        }
+        tmp_path = f"{self.path(exchange_id)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, self.path(exchange_id))
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("saved_at", 0) < self.ttl
+
+    async def load_markets(self, exchange: ccxt.Exchange) -> dict:
+        """
+        Prepara os mercados de uma instância ccxt usando o cache quando possível.
+        :param exchange: Instância ccxt
+        :return: Mercados carregados
+        """
+        exchange_id = exchange.id
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self.read, exchange_id)
+        if entry is None:
+            return await self.refresh(exchange)
+
+        exchange.set_markets(entry["markets"], entry.get("currencies"))
+        if not self.is_fresh(entry):
+            task = self._refreshes.get(exchange_id)
+            if task is None or task.done():
+                self._refreshes[exchange_id] = asyncio.create_task(self._refresh_quietly(exchange))
+        return exchange.markets
+
+    async def refresh(self, exchange: ccxt.Exchange) -> dict:
+        """
+        Recarrega os mercados da exchange e atualiza o arquivo de cache.
+        :param exchange: Instância ccxt
+        :return: Mercados carregados
+        """
+        markets = await exchange.load_markets(reload=True)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.write, exchange.id, exchange.markets, exchange.currencies
+        )
+        logger.info(f"Cache de mercados de {exchange.id} atualizado ({len(markets)} mercados)")
+        return markets
+
+    async def close(self) -> None:
+        """Cancela as atualizações em segundo plano pendentes."""
+        tasks, self._refreshes = self._refreshes, {}
+        for task in tasks.values():
+            task.cancel()
+
+    async def _refresh_quietly(self, exchange: ccxt.Exchange) -> None:
+        try:
+            await self.refresh(exchange)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar mercados de {exchange.id}: {str(e)}")
@@ -0,0 +1,114 @@
+import ccxt.async_support as ccxt
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional
+from scripts.connectors.markets_cache import MarketMetadataCache
+
+logger = logging.getLogger(__name__)
+
+class ExchangeClientPool:
+    """
+    Registro de clientes ccxt de longa duração, um por exchange.
+
+    Cada cliente mantém sua própria sessão aiohttp (keep-alive) e os mercados
+    já carregados, evitando novos handshakes TLS e um novo load_markets a cada
+    ciclo de varredura.
+    """
+
+    def __init__(self, options: Optional[dict] = None, markets_cache: Optional[MarketMetadataCache] = None,
+                 exchange_options: Optional[Dict[str, dict]] = None):
+        """
+        Inicializa o registro de clientes.
+        :param options: Opções extras repassadas ao construtor ccxt de cada exchange
+        :param markets_cache: Cache em disco dos mercados (sem cache se None)
+        :param exchange_options: Opções ccxt adicionais por exchange (ex: URLs do simulador local)
+        """
+        self.options = {'enableRateLimit': True}
+        self.options.update(options or {})
+        self.exchange_options = exchange_options or {}
+        self.markets_cache = markets_cache
+        self._clients: Dict[str, ccxt.Exchange] = {}
+        self._loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def __contains__(self, exchange_id: str) -> bool:
+        return exchange_id in self._clients
+
+    async def get(self, exchange_id: str) -> ccxt.Exchange:
+        """
+        Retorna o cliente da exchange, criando-o e aquecendo-o na primeira chamada.
+        :param exchange_id: ID da exchange (ex: 'binance')
+        :return: Instância ccxt compartilhada
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(exchange_id)
+        if client is not None and self._loops.get(exchange_id) is loop:
+            return client
+
+        lock = self._locks.get(exchange_id)
+        if lock is None or self._loops.get(exchange_id) is not loop:
+            lock = self._locks[exchange_id] = asyncio.Lock()
+        async with lock:
+            client = self._clients.get(exchange_id)
+            if client is not None and self._loops.get(exchange_id) is loop:
+                return client
+            if client is not None:
+                # A sessão aiohttp fica presa ao loop em que foi criada
+                logger.warning(f"Cliente {exchange_id} pertence a outro event loop, recriando")
+                await self._close_stale(exchange_id, client, self._loops.get(exchange_id))
+            options = dict(self.options)
+            options.update(self.exchange_options.get(exchange_id, {}))
+            client = getattr(ccxt, exchange_id)(options)
+            self._clients[exchange_id] = client
+            self._loops[exchange_id] = loop
+            try:
+                if self.markets_cache is not None:
+                    await self.markets_cache.load_markets(client)
+                else:
+                    await client.load_markets()
+            except Exception as e:
+                # Os mercados serão carregados sob demanda na próxima chamada
+                logger.warning(f"Falha ao carregar mercados de {exchange_id}: {str(e)}")
+            return client
+
+    async def _close_stale(self, exchange_id: str, client: ccxt.Exchange,
+                           loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """
+        Fecha, na medida do possível, um cliente criado em outro event loop.
+        :param exchange_id: ID da exchange
+        :param client: Cliente substituído
+        :param loop: Loop em que o cliente foi criado
+        """
+        try:
+            if loop is not None and not loop.is_closed() and loop.is_running():
+                # O loop original segue ativo em outra thread: a sessão é fechada nele
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+            else:
+                await client.close()
+        except Exception as e:
+            # Com o loop original encerrado a sessão pode não fechar de forma limpa
+            logger.debug(f"Erro ao fechar cliente antigo de {exchange_id}: {str(e)}")
+
+    async def start(self, exchange_ids: Iterable[str]) -> None:
+        """
+        Aquece os clientes das exchanges informadas em paralelo.
+        :param exchange_ids: IDs das exchanges a preparar
+        """
+        exchange_ids = list(exchange_ids)
+        results = await asyncio.gather(*(self.get(ex) for ex in exchange_ids), return_exceptions=True)
+        for exchange_id, result in zip(exchange_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Erro ao iniciar cliente {exchange_id}: {str(result)}")
+
+    async def close(self) -> None:
+        """Fecha todas as sessões abertas e esvazia o registro."""
+        if self.markets_cache is not None:
+            await self.markets_cache.close()
+        clients, self._clients = self._clients, {}
+        self._loops.clear()
+        self._locks.clear()
+        for exchange_id, client in clients.items():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar cliente {exchange_id}: {str(e)}")
@@ -0,0 +1,221 @@
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from scripts.detection.graph import CurrencyGraph
+
+# Ciclo encontrado: (moedas na ordem das pernas, arestas direcionadas, lucro percentual)
+Cycle = Tuple[List[int], List[int], float]
+
+class NegativeCycleDetector:
+    """
+    Detector de ciclos de arbitragem com 3 a N pernas em uma exchange.
+
+    Cada aresta direcionada recebe o peso -log(taxa × (1 - taxa taker)), de
+    modo que um ciclo lucrativo é um ciclo de peso negativo. O detector roda
+    Bellman-Ford com limite de N pernas a partir de todas as moedas ao mesmo
+    tempo (uma linha da matriz de distâncias por origem) e lê, a cada perna,
+    o caminho fechado mais negativo de volta à origem.
+
+    Podas aplicadas:
+      - arestas sem cotação são descartadas;
+      - moedas sem aresta de entrada, sem aresta de saída ou com menos de dois
+        vizinhos são removidas iterativamente (não fecham ciclos de 3+ pernas);
+      - as moedas são ordenadas da mais conectada para a menos conectada e
+        cada origem só caminha pelas moedas seguintes, então cada ciclo é
+        encontrado uma única vez, a partir da sua moeda mais conectada, e os
+        blocos de origens finais (moedas periféricas) só enxergam poucas arestas.
+
+    As origens são processadas em blocos de ``chunk_size``; se
+    ``time_budget`` estourar entre dois blocos a busca para e devolve o que
+    já encontrou (``timed_out`` fica True).
+    """
+
+    def __init__(self, graph: CurrencyGraph, max_length: int = 5, max_cycles: int = 20,
+                 time_budget: Optional[float] = 0.05, chunk_size: int = 32):
+        """
+        Inicializa o detector.
+        :param graph: Grafo de moedas compartilhado da exchange (ou um VenueGraph entre exchanges)
+        :param max_length: Número máximo de pernas de um ciclo
+        :param max_cycles: Número máximo de ciclos reportados por varredura
+        :param time_budget: Tempo máximo de busca em segundos por varredura (None desativa)
+        :param chunk_size: Origens processadas por bloco (limita a memória e a granularidade do limite de tempo)
+        """
+        self.graph = graph
+        self.max_length = max_length
+        self.max_cycles = max_cycles
+        self.time_budget = time_budget
+        self.chunk_size = chunk_size
+        self.timed_out = False  # Se a última busca parou por falta de tempo
+
+    def prune(self, valid: np.ndarray) -> np.ndarray:
+        """
+        Moedas que ainda podem participar de um ciclo de 3+ pernas.
+        :param valid: Máscara das arestas direcionadas com cotação (ordem de CurrencyGraph.edge_arrays)
+        :return: Máscara de moedas vivas
+        """
+        sources, targets, _ = self.graph.edge_arrays()
+        n = len(self.graph.currencies)
+        alive = np.ones(n, dtype=bool)
+        while True:
+            usable = valid & alive[sources] & alive[targets]
+            out_degree = np.bincount(sources[usable], minlength=n)
+            in_degree = np.bincount(targets[usable], minlength=n)
+            linked = usable[0::2] | usable[1::2]
+            neighbors = (np.bincount(sources[0::2][linked], minlength=n)
+                         + np.bincount(targets[0::2][linked], minlength=n))
+            dead = alive & ((out_degree == 0) | (in_degree == 0) | (neighbors < 2))
+            if not dead.any():
+                return alive
+            alive &= ~dead
+
+    def find(self, rates: np.ndarray, fee: float, threshold: float, min_length: int = 3,
+             accept: Optional[Callable[[List[int]], bool]] = None) -> List[Cycle]:
+        """
+        Procura ciclos lucrativos.
+        :param rates: Taxa bruta de cada aresta direcionada (CurrencyGraph.conversion_rates)
+        :param fee: Taxa taker em fração (0.001 = 0,1%), única ou por aresta direcionada (alinhada a rates)
+        :param threshold: Lucro mínimo em percentual
+        :param min_length: Número mínimo de pernas de um ciclo reportado
+        :param accept: Filtro opcional sobre as arestas direcionadas de um ciclo, aplicado antes do limite max_cycles
+        :return: Até max_cycles ciclos em ordem decrescente de lucro, começando pela moeda mais conectada
+        """
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        self.timed_out = False
+        sources, targets, directed = self.graph.edge_arrays()
+        if not len(sources):
+            return []
+        fees = np.broadcast_to(np.asarray(fee, dtype=float), rates.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = -np.log(rates[directed] * (1 - fees[directed]))
+        valid = np.isfinite(weights)
+        alive = self.prune(valid)
+        valid &= alive[sources] & alive[targets]
+        if not valid.any():
+            return []
+
+        # Renumera as moedas vivas da mais conectada para a menos conectada e agrupa as arestas por destino
+        nodes = np.flatnonzero(alive)
+        degree = np.bincount(sources[valid], minlength=len(alive))
+        nodes = nodes[np.lexsort((nodes, -degree[nodes]))]
+        compact = np.full(len(alive), -1, dtype=np.intp)
+        compact[nodes] = np.arange(len(nodes))
+        positions = np.flatnonzero(valid)
+        positions = positions[np.argsort(compact[targets[positions]], kind="stable")]
+        src, tgt, w = compact[sources[positions]], compact[targets[positions]], weights[positions]
+
+        limit = -np.log1p(threshold / 100)
+        candidates = {}
+        for first in range(0, len(nodes), self.chunk_size):
+            if deadline is not None and time.perf_counter() > deadline:
+                self.timed_out = True
+                break
+            # As origens do bloco só alcançam moedas de índice >= first
+            local = np.flatnonzero((src >= first) & (tgt >= first))
+            if not len(local):
+                break
+            origins = np.arange(min(self.chunk_size, len(nodes) - first))
+            walks = self._closed_walks(origins, len(nodes) - first, src[local] - first, tgt[local] - first,
+                                       w[local], limit)
+            for walk in walks:
+                for cycle in split_walk(local[walk], src):
+                    if not min_length <= len(cycle) <= self.max_length:
+                        continue
+                    key = tuple(src[cycle].tolist())
+                    if key not in candidates:
+                        candidates[key] = cycle
+
+        cycles = []
+        for key, cycle in candidates.items():
+            edges = directed[positions[cycle]].tolist()
+            if accept is not None and not accept(edges):
+                continue
+            profit = (float(np.prod(rates[edges] * (1 - fees[edges]))) - 1) * 100
+            if profit > threshold:
+                cycles.append((nodes[list(key)].tolist(), edges, profit))
+        cycles.sort(key=lambda cycle: cycle[2], reverse=True)
+        return cycles[:self.max_cycles]
+
+    def _closed_walks(self, origins: np.ndarray, n: int, src: np.ndarray, tgt: np.ndarray, w: np.ndarray,
+                      limit: float) -> List[np.ndarray]:
+        """
+        Caminhos fechados de peso abaixo de limit para um bloco de origens.
+
+        Para cada origem e cada número de pernas, guarda o caminho mais
+        negativo de volta à origem passando só por moedas de índice maior.
+        :param origins: Índices das origens do bloco
+        :param n: Número de moedas
+        :param src: Moeda de origem de cada aresta (arestas ordenadas por destino)
+        :param tgt: Moeda de destino de cada aresta
+        :param w: Peso de cada aresta
+        :param limit: Peso máximo de um caminho fechado reportado
+        :return: Lista de caminhos (posições das arestas em src/tgt, na ordem das pernas)
+        """
+        group_targets, group_starts = np.unique(tgt, return_index=True)
+        columns = np.arange(len(origins))
+        # Matrizes moeda × origem: cada coluna é uma execução independente de Bellman-Ford
+        allowed = np.arange(n)[:, None] >= origins[None, :]  # A origem e as moedas de índice maior
+        distance = np.full((n, len(origins)), np.inf)
+        distance[origins, columns] = 0.0
+        group_of_edge = np.repeat(np.arange(len(group_targets)), np.diff(np.append(group_starts, len(src))))
+        edge_ids = np.arange(len(src))[:, None]
+        choices = []
+        walks = []
+        for legs in range(1, self.max_length + 1):
+            candidate = distance[src] + w[:, None]
+            best = np.minimum.reduceat(candidate, group_starts, axis=0)
+            # Aresta que atingiu o mínimo de cada grupo (a última em caso de empate)
+            reached = np.where(candidate <= best[group_of_edge], edge_ids, -1)
+            choice = np.full((n, len(origins)), -1, dtype=np.intp)
+            choice[group_targets] = np.maximum.reduceat(reached, group_starts, axis=0)
+            distance = np.full((n, len(origins)), np.inf)
+            distance[group_targets] = best
+            distance[~allowed] = np.inf
+            choices.append(choice)
+
+            closed = distance[origins, columns]
+            if legs >= 3:
+                for column in np.flatnonzero(closed < limit).tolist():
+                    walks.append(self._trace(column, int(origins[column]), legs, choices, src))
+            # Caminhos que já voltaram à origem não continuam
+            distance[origins, columns] = np.inf
+        return walks
+
+    @staticmethod
+    def _trace(column: int, origin: int, legs: int, choices: List[np.ndarray], src: np.ndarray) -> np.ndarray:
+        """Reconstrói, de trás para frente, o caminho fechado de uma origem com o número de pernas dado."""
+        walk = []
+        node = origin
+        for step in range(legs - 1, -1, -1):
+            edge = int(choices[step][node, column])
+            walk.append(edge)
+            node = int(src[edge])
+        walk.reverse()
+        return np.array(walk, dtype=np.intp)
+
+def split_walk(walk: np.ndarray, src: np.ndarray) -> List[np.ndarray]:
+    """
+    Separa um caminho fechado nos ciclos simples que o compõem.
+    :param walk: Posições das arestas na ordem das pernas
+    :param src: Moeda de origem de cada aresta
+    :return: Ciclos simples, cada um começando pela sua menor moeda
+    """
+    cycles = []
+    stack_nodes: List[int] = []
+    stack_edges: List[int] = []
+    for edge in walk.tolist():
+        node = int(src[edge])
+        if node in stack_nodes:
+            start = stack_nodes.index(node)
+            cycles.append(stack_edges[start:])
+            del stack_nodes[start:], stack_edges[start:]
+        stack_nodes.append(node)
+        stack_edges.append(edge)
+    cycles.append(stack_edges)
+    result = []
+    for cycle in cycles:
+        heads = [int(src[edge]) for edge in cycle]
+        start = heads.index(min(heads))
+        result.append(np.array(cycle[start:] + cycle[:start], dtype=np.intp))
+    return result
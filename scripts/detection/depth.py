@@ -0,0 +1,86 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+class DepthCurve:
+    """
+    Custo acumulado de executar contra um lado do livro L2.
+
+    Guarda os preços do melhor para o pior nível e as quantidades e valores
+    acumulados até cada nível (com um zero inicial). O valor de executar uma
+    quantidade qualquer sai de uma busca binária nos acumulados, então o
+    custo de vários tamanhos é calculado de uma vez em O(k log n).
+    """
+
+    def __init__(self, prices: np.ndarray, sizes: np.ndarray):
+        """
+        Inicializa a curva.
+        :param prices: Preços do melhor para o pior nível
+        :param sizes: Quantidade disponível em cada nível
+        """
+        self.prices = np.asarray(prices, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)
+        self.cumulative_sizes = np.concatenate(([0.0], np.cumsum(sizes)))
+        self.cumulative_notional = np.concatenate(([0.0], np.cumsum(self.prices * sizes)))
+
+    @property
+    def depth(self) -> float:
+        """Quantidade total disponível."""
+        return float(self.cumulative_sizes[-1])
+
+    @property
+    def best(self) -> Optional[float]:
+        """Preço do melhor nível ou None se o lado estiver vazio."""
+        return float(self.prices[0]) if len(self.prices) else None
+
+    def notional(self, size):
+        """
+        Valor (na moeda de cotação) de executar uma ou mais quantidades.
+        :param size: Quantidade ou array de quantidades, até ``depth``
+        :return: Valor executado (mesmo formato de size)
+        """
+        level = np.searchsorted(self.cumulative_sizes, size, side="left") - 1
+        level = np.clip(level, 0, len(self.prices) - 1)
+        return self.cumulative_notional[level] + (size - self.cumulative_sizes[level]) * self.prices[level]
+
+def optimal_size(asks: DepthCurve, bids: DepthCurve, buy_fee: float, sell_fee: float,
+                 max_size: Optional[float] = None) -> Optional[Dict[str, float]]:
+    """
+    Quantidade que maximiza o lucro absoluto de comprar pelos asks e vender pelos bids.
+
+    Com taxas proporcionais, o lucro é linear por partes e côncavo na
+    quantidade (cada nível a mais compra mais caro e vende mais barato), então
+    o máximo está em uma das quebras: os acumulados de um dos dois lados.
+    :param asks: Curva do lado de venda da exchange de compra
+    :param bids: Curva do lado de compra da exchange de venda
+    :param buy_fee: Taxa taker da exchange de compra em fração
+    :param sell_fee: Taxa taker da exchange de venda em fração
+    :param max_size: Quantidade máxima permitida (sem limite se None)
+    :return: {"max_size", "buy_vwap", "sell_vwap", "estimated_profit", "slippage_percentage"} (atributos de
+             SimpleOpportunity) ou None se nenhuma quantidade é lucrativa
+    """
+    limit = min(asks.depth, bids.depth)
+    if max_size is not None:
+        limit = min(limit, max_size)
+    if limit <= 0:
+        return None
+    breaks = np.concatenate((asks.cumulative_sizes[1:], bids.cumulative_sizes[1:], [limit]))
+    sizes = np.unique(breaks[breaks <= limit])
+    cost = asks.notional(sizes) * (1 + buy_fee)
+    proceeds = bids.notional(sizes) * (1 - sell_fee)
+    profits = proceeds - cost
+    best = int(np.argmax(profits))
+    if profits[best] <= 0:
+        return None
+
+    size = float(sizes[best])
+    buy_vwap = float(asks.notional(size)) / size
+    sell_vwap = float(bids.notional(size)) / size
+    return {
+        "max_size": size,
+        "buy_vwap": buy_vwap,
+        "sell_vwap": sell_vwap,
+        "estimated_profit": float(profits[best]),
+        # Perda em relação ao topo do livro, somando as duas pernas
+        "slippage_percentage": ((buy_vwap / asks.best - 1) + (1 - sell_vwap / bids.best)) * 100,
+    }
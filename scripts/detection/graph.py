@@ -0,0 +1,184 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Aresta não direcionada entre duas moedas (menor ID primeiro)
+Edge = Tuple[int, int]
+
+class CurrencyGraph:
+    """
+    Grafo de conversão entre as moedas listadas em uma exchange.
+
+    As moedas recebem IDs inteiros na ordem em que aparecem e cada mercado
+    spot 'BASE/QUOTE' ocupa um slot fixo. Um mercado gera duas arestas
+    direcionadas: 2 * slot (vender a base pelo bid) e 2 * slot + 1 (comprar
+    a base pagando o ask). Quando dois mercados ligam as mesmas moedas, o
+    primeiro listado é usado e o outro fica de reserva.
+
+    Detectores se inscrevem em ``listeners`` para receber as arestas
+    incluídas e removidas quando a lista de mercados muda.
+    """
+
+    def __init__(self):
+        self.currency_ids: Dict[str, int] = {}
+        self.currencies: List[str] = []
+        self.listed: Set[str] = set()
+        self.market_slots: Dict[str, int] = {}
+        self.markets: List[Optional[Tuple[str, int, int]]] = []
+        self.neighbors: Dict[int, Set[int]] = {}
+        self.edges: Dict[Edge, List[int]] = {}
+        self.listeners: List = []
+        self.version = 0
+        self._free: List[int] = []
+        self._edge_arrays_version = None
+        self._edge_arrays = (np.empty(0, dtype=np.intp),) * 3
+        self._slot_ids_key = None
+        self._slot_ids = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+
+    def currency_id(self, code: str) -> int:
+        """ID inteiro de uma moeda, criando-o se necessário."""
+        currency_id = self.currency_ids.get(code)
+        if currency_id is None:
+            currency_id = self.currency_ids[code] = len(self.currencies)
+            self.currencies.append(code)
+            self.neighbors[currency_id] = set()
+        return currency_id
+
+    def sync(self, symbols: Iterable[str]) -> bool:
+        """
+        Ajusta o grafo à lista atual de mercados, notificando os inscritos.
+        :param symbols: Pares listados no formato ccxt
+        :return: True se algum mercado foi incluído ou removido
+        """
+        # Inclusões na ordem recebida, para que os IDs não dependam da ordem de iteração de um set
+        ordered = list(dict.fromkeys(symbols))
+        self.listed = set(ordered)
+        removed = [symbol for symbol in self.market_slots if symbol not in self.listed]
+        added = [symbol for symbol in ordered if symbol not in self.market_slots]
+        for symbol in removed:
+            self.remove_market(symbol)
+        for symbol in added:
+            self.add_market(symbol)
+        return bool(removed or added)
+
+    def add_market(self, symbol: str) -> None:
+        """Inclui um mercado spot; contratos ('BASE/QUOTE:SETTLE') são ignorados."""
+        if symbol in self.market_slots or ":" in symbol or symbol.count("/") != 1:
+            return
+        base_code, quote_code = symbol.split("/")
+        base, quote = self.currency_id(base_code), self.currency_id(quote_code)
+        if base == quote:
+            return
+        if self._free:
+            slot = self._free.pop()
+            self.markets[slot] = (symbol, base, quote)
+        else:
+            slot = len(self.markets)
+            self.markets.append((symbol, base, quote))
+        self.market_slots[symbol] = slot
+        self.version += 1
+
+        edge = (min(base, quote), max(base, quote))
+        slots = self.edges.setdefault(edge, [])
+        slots.append(slot)
+        if len(slots) == 1:
+            self.neighbors[base].add(quote)
+            self.neighbors[quote].add(base)
+            for listener in self.listeners:
+                listener.edge_added(edge)
+
+    def remove_market(self, symbol: str) -> None:
+        """Remove um mercado deslistado."""
+        slot = self.market_slots.pop(symbol, None)
+        if slot is None:
+            return
+        _, base, quote = self.markets[slot]
+        self.markets[slot] = None
+        self._free.append(slot)
+        self.version += 1
+
+        edge = (min(base, quote), max(base, quote))
+        slots = self.edges[edge]
+        slots.remove(slot)
+        if not slots:
+            del self.edges[edge]
+            for listener in self.listeners:
+                listener.edge_removed(edge)
+            self.neighbors[base].discard(quote)
+            self.neighbors[quote].discard(base)
+
+    def directed_edge(self, source: int, target: int) -> int:
+        """Índice da aresta direcionada source -> target no vetor de taxas."""
+        slot = self.edges[(min(source, target), max(source, target))][0]
+        return 2 * slot if self.markets[slot][1] == source else 2 * slot + 1
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Arestas direcionadas em arrays, reconstruídos apenas quando a lista de mercados muda.
+
+        As posições 2k e 2k + 1 são os dois sentidos da mesma aresta não direcionada.
+        :return: (moedas de origem, moedas de destino, índices no vetor de taxas)
+        """
+        if self._edge_arrays_version != self.version:
+            sources, targets, directed = [], [], []
+            for u, v in sorted(self.edges):
+                sources += (u, v)
+                targets += (v, u)
+                directed += (self.directed_edge(u, v), self.directed_edge(v, u))
+            self._edge_arrays = tuple(np.array(values, dtype=np.intp) for values in (sources, targets, directed))
+            self._edge_arrays_version = self.version
+        return self._edge_arrays
+
+    def edge_symbol(self, directed_edge: int) -> str:
+        """Par ccxt usado por uma aresta direcionada."""
+        return self.markets[directed_edge // 2][0]
+
+    def slot_symbol_ids(self, registry) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        IDs no SymbolRegistry dos mercados ocupados, refeitos só quando a lista de mercados muda.
+        :return: (slots, IDs dos pares)
+        """
+        key = (self.version, id(registry))
+        if self._slot_ids_key != key:
+            slots = np.array(list(self.market_slots.values()), dtype=np.intp)
+            self._slot_ids = (slots, registry.symbol_ids(self.market_slots))
+            self._slot_ids_key = key
+        return self._slot_ids
+
+    def quote_vectors(self, quotes: Dict[str, dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bids e asks alinhados aos slots de mercado (NaN onde não há cotação).
+        :param quotes: Dicionário par -> dados de preço de uma exchange (ou a ExchangeView de um MarketSnapshot)
+        :return: (bids, asks)
+        """
+        bids = np.full(len(self.markets), np.nan)
+        asks = np.full(len(self.markets), np.nan)
+        if hasattr(quotes, "vectors"):
+            slots, symbol_ids = self.slot_symbol_ids(quotes.snapshot.registry)
+            bids[slots], asks[slots] = quotes.vectors(symbol_ids)
+            # Mesma regra do caminho por dicionário: zero equivale a sem cotação
+            bids[bids == 0] = np.nan
+            asks[asks == 0] = np.nan
+            return bids, asks
+        for symbol, slot in self.market_slots.items():
+            quote = quotes.get(symbol)
+            if quote is None:
+                continue
+            bid, ask = quote.get("bid"), quote.get("ask")
+            if bid:
+                bids[slot] = bid
+            if ask:
+                asks[slot] = ask
+        return bids, asks
+
+    def conversion_rates(self, quotes: Dict[str, dict]) -> np.ndarray:
+        """
+        Taxa bruta de cada aresta direcionada: bid para vender a base, 1 / ask para comprá-la.
+        :param quotes: Dicionário par -> dados de preço de uma exchange
+        :return: Vetor de tamanho 2 * número de slots (NaN sem cotação)
+        """
+        bids, asks = self.quote_vectors(quotes)
+        rates = np.empty(2 * len(self.markets))
+        rates[0::2] = bids
+        rates[1::2] = 1.0 / asks
+        return rates
@@ -0,0 +1,61 @@
+from typing import Callable, Dict, Hashable, List, Set, Tuple
+
+from scripts.detection.opportunity import Opportunity
+
+# Evento do conjunto de oportunidades: ("add" | "update" | "remove", oportunidade)
+Event = Tuple[str, Opportunity]
+
+class LiveOpportunities:
+    """
+    Conjunto das oportunidades atualmente abertas, mantido por grupos.
+
+    Um grupo reúne as oportunidades que são sempre recalculadas juntas (os
+    cruzamentos de um par entre exchanges ou as rotações de um triângulo).
+    Ao substituir um grupo, apenas as diferenças viram eventos: oportunidades
+    novas geram "add", as que continuam abertas geram "update" (mantendo o
+    ``id`` original) e as que sumiram geram "remove".
+    """
+
+    def __init__(self):
+        self.opportunities: Dict[Hashable, Opportunity] = {}
+        self._groups: Dict[Hashable, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self.opportunities)
+
+    def replace(self, group: Hashable, current: Dict[Hashable, Opportunity]) -> List[Event]:
+        """
+        Substitui as oportunidades de um grupo pelo resultado da reavaliação.
+        :param group: Grupo reavaliado
+        :param current: Chave -> oportunidade lucrativa no momento
+        :return: Eventos gerados
+        """
+        events = []
+        for key in self._groups.pop(group, set()) - current.keys():
+            events.append(("remove", self.opportunities.pop(key)))
+        for key, opportunity in current.items():
+            existing = self.opportunities.get(key)
+            if existing is None:
+                events.append(("add", opportunity))
+            else:
+                opportunity.id = existing.id
+                events.append(("update", opportunity))
+            self.opportunities[key] = opportunity
+        if current:
+            self._groups[group] = set(current)
+        return events
+
+    def drop(self, predicate: Callable[[Hashable], bool]) -> List[Event]:
+        """
+        Fecha todas as oportunidades dos grupos que satisfazem um predicado.
+        :param predicate: Função grupo -> bool
+        :return: Eventos "remove"
+        """
+        events = []
+        for group in [group for group in self._groups if predicate(group)]:
+            events.extend(self.replace(group, {}))
+        return events
+
+    def sorted(self) -> List[Opportunity]:
+        """Oportunidades abertas, as mais lucrativas primeiro."""
+        return sorted(self.opportunities.values(), key=lambda o: o.profit_percentage, reverse=True)
@@ -0,0 +1,205 @@
+import itertools
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+# IDs inteiros crescentes, compartilhados por todos os tipos de oportunidade
+_ids = itertools.count(1)
+
+def next_id() -> int:
+    """Próximo ID de oportunidade."""
+    return next(_ids)
+
+def iso_timestamp(created: float) -> str:
+    """Instante de detecção no formato da API ('2024-01-01T00:00:00Z')."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(created))
+
+class Opportunity(ABC):
+    """
+    Base das oportunidades internas dos detectores.
+
+    As oportunidades são objetos com __slots__, ID inteiro e instante de
+    detecção numérico; o dicionário no formato de api/models.py só é montado
+    por ``to_dict`` na borda (API, WebSocket, logs). ``opp["campo"]`` e
+    ``opp.get("campo")`` leem um campo nesse formato sem montar o dicionário,
+    para o código que ainda consulta oportunidades pelos nomes da API.
+    """
+
+    __slots__ = ()
+    type = ""
+    # Campo da API -> atributo
+    _fields: Dict[str, str] = {}
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Oportunidade no formato de api/models.py."""
+        pass
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "id":
+            return str(self.id)
+        if key == "type":
+            return self.type
+        if key == "timestamp":
+            return iso_timestamp(self.created)
+        attribute = self._fields.get(key)
+        value = None if attribute is None else getattr(self, attribute)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return f"<{self.type} #{self.id} {self.pair} {self.profit_percentage:.4f}%>"
+
+class SimpleOpportunity(Opportunity):
+    """Compra de um par em uma exchange e venda na outra."""
+
+    __slots__ = ("id", "pair", "buy_exchange", "sell_exchange", "buy_price", "sell_price", "spread_percentage",
+                 "estimated_profit", "created", "buy_volume", "sell_volume", "max_size", "buy_vwap", "sell_vwap",
+                 "slippage_percentage")
+    type = "simple"
+    _fields = {
+        "pair": "pair", "buyExchange": "buy_exchange", "sellExchange": "sell_exchange", "buyPrice": "buy_price",
+        "sellPrice": "sell_price", "spreadPercentage": "spread_percentage", "estimatedProfit": "estimated_profit",
+        "buyVolume": "buy_volume", "sellVolume": "sell_volume", "maxSize": "max_size", "buyVwap": "buy_vwap",
+        "sellVwap": "sell_vwap", "slippagePercentage": "slippage_percentage",
+    }
+
+    def __init__(self, pair: str, buy_exchange: str, sell_exchange: str, buy_price: float, sell_price: float,
+                 spread_percentage: float, estimated_profit: float, created: float, buy_volume: float = 0,
+                 sell_volume: float = 0, id: Optional[int] = None):
+        self.id = next_id() if id is None else id
+        self.pair = pair
+        self.buy_exchange = buy_exchange
+        self.sell_exchange = sell_exchange
+        self.buy_price = buy_price
+        self.sell_price = sell_price
+        self.spread_percentage = spread_percentage
+        self.estimated_profit = estimated_profit
+        self.created = created
+        self.buy_volume = buy_volume
+        self.sell_volume = sell_volume
+        # Preenchidos pelo dimensionamento sobre os livros L2
+        self.max_size: Optional[float] = None
+        self.buy_vwap: Optional[float] = None
+        self.sell_vwap: Optional[float] = None
+        self.slippage_percentage: Optional[float] = None
+
+    @property
+    def profit_percentage(self) -> float:
+        return self.spread_percentage
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Oportunidade no formato ArbitrageOpportunity."""
+        data = {
+            "id": str(self.id),
+            "pair": self.pair,
+            "type": self.type,
+            "buyExchange": self.buy_exchange,
+            "sellExchange": self.sell_exchange,
+            "buyPrice": self.buy_price,
+            "sellPrice": self.sell_price,
+            "spreadPercentage": self.spread_percentage,
+            "estimatedProfit": self.estimated_profit,
+            "timestamp": iso_timestamp(self.created),
+            "buyVolume": self.buy_volume,
+            "sellVolume": self.sell_volume,
+        }
+        if self.max_size is not None:
+            data.update(maxSize=self.max_size, buyVwap=self.buy_vwap, sellVwap=self.sell_vwap,
+                        slippagePercentage=self.slippage_percentage)
+        return data
+
+class StatArbOpportunity(SimpleOpportunity):
+    """
+    Sinal de reversão à média do spread de um par entre duas exchanges.
+
+    Mesmo formato de SimpleOpportunity (compra na exchange relativamente
+    barata e venda na cara); ``z_score`` e ``half_life`` descrevem o desvio
+    do spread e vão para o dicionário como campos extras.
+    """
+
+    __slots__ = ("z_score", "half_life")
+    type = "stat_arb"
+    _fields = dict(SimpleOpportunity._fields, zScore="z_score", halfLife="half_life")
+
+    def __init__(self, pair: str, buy_exchange: str, sell_exchange: str, buy_price: float, sell_price: float,
+                 spread_percentage: float, estimated_profit: float, created: float, z_score: float,
+                 half_life: float, buy_volume: float = 0, sell_volume: float = 0, id: Optional[int] = None):
+        super().__init__(pair, buy_exchange, sell_exchange, buy_price, sell_price, spread_percentage,
+                         estimated_profit, created, buy_volume=buy_volume, sell_volume=sell_volume, id=id)
+        self.z_score = z_score
+        self.half_life = half_life
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Oportunidade no formato ArbitrageOpportunity, com z-score e meia-vida."""
+        data = super().to_dict()
+        data.update(zScore=self.z_score, halfLife=self.half_life)
+        return data
+
+class RouteOpportunity(Opportunity):
+    """
+    Ciclo de conversões: triangular, multi-perna ou entre exchanges.
+
+    As pernas de negociação em uma exchange ficam como tuplas
+    (par, taxa, custo) e só viram dicionários em ``to_dict``; as rotas entre
+    exchanges guardam os passos já descritos pelo VenueGraph.
+    """
+
+    __slots__ = ("id", "type", "pair", "exchange", "legs", "profit_percentage", "estimated_profit", "created",
+                 "exchanges", "route")
+    _fields = {
+        "pair": "pair", "exchange": "exchange", "profitPercentage": "profit_percentage",
+        "estimatedProfit": "estimated_profit", "exchanges": "exchanges", "route": "route",
+    }
+
+    def __init__(self, type: str, pair: str, exchange: str, legs: Sequence, profit_percentage: float,
+                 created: float, exchanges: Optional[List[str]] = None, route: Optional[List[str]] = None,
+                 id: Optional[int] = None):
+        self.id = next_id() if id is None else id
+        self.type = type
+        self.pair = pair
+        self.exchange = exchange
+        self.legs = legs
+        self.profit_percentage = profit_percentage
+        self.estimated_profit = profit_percentage / 100
+        self.created = created
+        self.exchanges = exchanges
+        self.route = route
+
+    @property
+    def steps(self) -> List[dict]:
+        """Pernas no formato da API."""
+        return [
+            leg if isinstance(leg, dict) else {"pair": leg[0], "rate": leg[1], "fee": leg[2]}
+            for leg in self.legs
+        ]
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "steps":
+            return self.steps
+        return super().__getitem__(key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Oportunidade no formato TriangularArbitrageOpportunity (mais exchanges e rota entre exchanges)."""
+        data = {
+            "id": str(self.id),
+            "pair": self.pair,
+            "type": self.type,
+            "exchange": self.exchange,
+            "steps": self.steps,
+            "profitPercentage": self.profit_percentage,
+            "estimatedProfit": self.estimated_profit,
+            "timestamp": iso_timestamp(self.created),
+        }
+        if self.exchanges is not None:
+            data["exchanges"] = self.exchanges
+        if self.route is not None:
+            data["route"] = self.route
+        return data
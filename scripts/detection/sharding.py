@@ -0,0 +1,212 @@
+import asyncio
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.detection.simple import QuoteMatrix, find_crosses
+from scripts.detection.triangular import cycle_profits
+
+# Estratégias de partição do universo de pares
+STRATEGIES = ("hash", "contiguous", "round_robin")
+
+# Nome do bloco e, para cada array, (chave, dtype, formato, deslocamento em bytes)
+Layout = Tuple[str, Tuple[Tuple[str, str, tuple, int], ...]]
+
+def partition_pairs(symbols: Sequence[str], shards: int, strategy: str = "hash") -> List[np.ndarray]:
+    """
+    Divide as colunas (pares) de um ciclo entre os shards.
+
+    Com "hash" cada par fica sempre no mesmo shard, não importa quais outros
+    pares estejam no ciclo; "contiguous" divide em faixas e "round_robin"
+    intercala as colunas.
+    :param symbols: Pares na ordem das colunas
+    :param shards: Quantidade de shards
+    :param strategy: Uma de STRATEGIES
+    :return: Colunas de cada shard (alguns podem ficar vazios)
+    """
+    columns = np.arange(len(symbols))
+    if strategy == "hash":
+        owners = np.array([zlib.crc32(symbol.encode()) % shards for symbol in symbols], dtype=np.intp)
+        return [columns[owners == shard] for shard in range(shards)]
+    if strategy == "round_robin":
+        return [columns[shard::shards] for shard in range(shards)]
+    return np.array_split(columns, shards)
+
+def partition_cycles(count: int, shards: int, strategy: str = "hash") -> List[slice]:
+    """
+    Divide os ciclos de um índice de triângulos entre os shards.
+
+    Ciclos não têm chave estável entre versões do índice, então "hash" se
+    comporta como "round_robin" (ciclos intercalados, o que equilibra os
+    shards); "contiguous" divide em faixas.
+    :param count: Quantidade de ciclos
+    :param shards: Quantidade de shards
+    :param strategy: Uma de STRATEGIES
+    :return: Fatia dos ciclos de cada shard
+    """
+    if strategy == "contiguous":
+        bounds = np.linspace(0, count, shards + 1).astype(int).tolist()
+        return [slice(start, stop) for start, stop in zip(bounds, bounds[1:])]
+    return [slice(shard, count, shards) for shard in range(shards)]
+
+class SharedArrays:
+    """
+    Bloco de memória compartilhada por onde as matrizes do ciclo chegam aos processos.
+
+    O bloco é reaproveitado de um ciclo para o outro e só é recriado (maior)
+    quando os arrays não cabem mais nele.
+    """
+
+    def __init__(self):
+        self._shm: Optional[SharedMemory] = None
+
+    def publish(self, arrays: Dict[str, np.ndarray]) -> Layout:
+        """
+        Copia os arrays para o bloco.
+        :param arrays: Chave -> array
+        :return: Layout para os processos lerem os arrays com ``attach``
+        """
+        fields, offset = [], 0
+        arrays = {key: np.ascontiguousarray(array) for key, array in arrays.items()}
+        for key, array in arrays.items():
+            fields.append((key, array.dtype.str, array.shape, offset))
+            offset += -(-array.nbytes // 8) * 8  # Alinhado em 8 bytes
+        if self._shm is None or self._shm.size < offset:
+            self.close()
+            self._shm = SharedMemory(create=True, size=max(offset * 2, 4096))
+        for (key, dtype, shape, start), array in zip(fields, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=start)[...] = array
+        return self._shm.name, tuple(fields)
+
+    def close(self) -> None:
+        """Libera o bloco."""
+        shm, self._shm = self._shm, None
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+# Blocos abertos neste processo (apenas o mais recente é mantido)
+_attached: Dict[str, SharedMemory] = {}
+
+def attach(layout: Layout) -> Dict[str, np.ndarray]:
+    """
+    Arrays publicados por SharedArrays, como views sem cópia do bloco.
+    :param layout: Layout devolvido por ``publish``
+    :return: Chave -> array
+    """
+    name, fields = layout
+    shm = _attached.get(name)
+    if shm is None:
+        for previous in _attached.values():
+            previous.close()
+        _attached.clear()
+        shm = _attached[name] = SharedMemory(name=name)
+    return {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for key, dtype, shape, offset in fields}
+
+def _simple_shard(layout: Layout, exchanges: List[str], columns: np.ndarray, buy_multipliers: np.ndarray,
+                  sell_multipliers: np.ndarray, threshold: float, now: float, max_age: Optional[float],
+                  max_skew: Optional[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Cruzamentos lucrativos das colunas de um shard (roda no processo do pool)."""
+    arrays = attach(layout)
+    matrix = QuoteMatrix(exchanges, [], arrays["bids"][:, columns], arrays["asks"][:, columns],
+                         arrays["times"][:, columns])
+    buy_idx, sell_idx, pair_idx, profit = find_crosses(matrix, buy_multipliers, sell_multipliers, threshold,
+                                                       now=now, max_age=max_age, max_skew=max_skew)
+    return buy_idx, sell_idx, columns[pair_idx], profit
+
+def _triangle_shard(layout: Layout, exchange: str, cycles: slice, fee: float,
+                    threshold: float) -> Tuple[str, np.ndarray, np.ndarray]:
+    """Ciclos lucrativos de uma fatia do índice de triângulos (roda no processo do pool)."""
+    arrays = attach(layout)
+    cycle_edges = arrays[f"cycle_edges:{exchange}"]
+    hits, profits = cycle_profits(arrays[f"rates:{exchange}"], cycle_edges[cycles], fee, threshold)
+    return exchange, np.arange(len(cycle_edges))[cycles][hits], profits
+
+class ShardedDetector:
+    """
+    Detecção simples e triangular dividida entre processos.
+
+    A cada ciclo as matrizes de cotações, as taxas de conversão e os ciclos
+    de triângulos de cada exchange são copiados uma vez para memória
+    compartilhada; cada processo do pool avalia seu shard de pares e de
+    ciclos lendo os arrays sem cópia e devolve só os índices e lucros
+    encontrados. Montar as oportunidades a partir deles fica com o chamador.
+    """
+
+    def __init__(self, shards: Optional[int] = None, strategy: str = "hash",
+                 executor: Optional[ProcessPoolExecutor] = None):
+        """
+        Inicializa o detector.
+        :param shards: Quantidade de shards e de processos (núcleos da máquina se None)
+        :param strategy: Partição dos pares, uma de STRATEGIES
+        :param executor: Pool de processos (um novo, com processos "spawn", se None)
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia de partição desconhecida: {strategy}")
+        self.shards = shards or os.cpu_count() or 1
+        self.strategy = strategy
+        # "spawn" evita copiar para os processos as threads do servidor (fork com threads é inseguro)
+        self.executor = executor or ProcessPoolExecutor(max_workers=self.shards,
+                                                        mp_context=multiprocessing.get_context("spawn"))
+        self.arrays = SharedArrays()
+
+    async def detect(self, matrix: QuoteMatrix, buy_multipliers: np.ndarray, sell_multipliers: np.ndarray,
+                     threshold: float, triangles: Dict[str, Tuple[np.ndarray, np.ndarray, float]],
+                     now: Optional[float] = None, max_age: Optional[float] = None,
+                     max_skew: Optional[float] = None):
+        """
+        Avalia os shards no pool sem bloquear o loop de eventos.
+        :param matrix: Cotações do ciclo
+        :param buy_multipliers: 1 + taxa taker de cada exchange
+        :param sell_multipliers: 1 - taxa taker de cada exchange
+        :param threshold: Lucro mínimo em percentual
+        :param triangles: Exchange -> (taxas das arestas direcionadas, arestas dos ciclos n×3, taxa taker em fração)
+        :param now: Hora local atual (necessária com max_age)
+        :param max_age: Idade máxima de uma cotação em segundos (sem limite se None)
+        :param max_skew: Diferença máxima em segundos entre as cotações de compra e venda (sem limite se None)
+        :return: (cruzamentos como em find_crosses, exchange -> (índices dos ciclos lucrativos, lucros))
+        """
+        arrays = {"bids": matrix.bids, "asks": matrix.asks, "times": matrix.times}
+        for exchange, (rates, cycle_edges, _) in triangles.items():
+            arrays[f"rates:{exchange}"] = rates
+            arrays[f"cycle_edges:{exchange}"] = cycle_edges
+        layout = self.arrays.publish(arrays)
+
+        futures = []
+        for columns in partition_pairs(matrix.pairs, self.shards, self.strategy):
+            if len(columns):
+                futures.append(self.executor.submit(
+                    _simple_shard, layout, matrix.exchanges, columns, buy_multipliers, sell_multipliers,
+                    threshold, now, max_age, max_skew,
+                ))
+        simple_count = len(futures)
+        for exchange, (_, cycle_edges, fee) in triangles.items():
+            for cycles in partition_cycles(len(cycle_edges), self.shards, self.strategy):
+                if len(range(*cycles.indices(len(cycle_edges)))):
+                    futures.append(self.executor.submit(_triangle_shard, layout, exchange, cycles, fee, threshold))
+        results = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+
+        empty = np.empty(0, dtype=np.intp)
+        if simple_count:
+            crosses = tuple(np.concatenate(parts) for parts in zip(*results[:simple_count]))
+        else:
+            crosses = (empty, empty, empty, np.empty(0))
+        cycles: Dict[str, Tuple[list, list]] = {exchange: ([], []) for exchange in triangles}
+        for exchange, hits, profits in results[simple_count:]:
+            cycles[exchange][0].append(hits)
+            cycles[exchange][1].append(profits)
+        cycle_hits = {exchange: (np.concatenate(hits) if hits else empty,
+                                 np.concatenate(profits) if profits else np.empty(0))
+                      for exchange, (hits, profits) in cycles.items()}
+        return crosses, cycle_hits
+
+    def close(self) -> None:
+        """Encerra o pool e libera a memória compartilhada."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.arrays.close()
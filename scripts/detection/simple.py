@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+class QuoteMatrix:
+    """
+    Cotações de um ciclo em matrizes exchange × par.
+
+    Posições sem cotação ficam com NaN. ``times`` traz o instante local em
+    que cada cotação foi gerada (timestamp da exchange corrigido pelo desvio
+    do relógio ou, na falta dele, a hora de recebimento).
+    """
+
+    def __init__(self, exchanges: List[str], pairs: List[str], bids: np.ndarray, asks: np.ndarray,
+                 times: np.ndarray):
+        self.exchanges = exchanges
+        self.pairs = pairs
+        self.bids = bids
+        self.asks = asks
+        self.times = times
+
+def build_quote_matrix(market_data: Dict, offsets: Optional[Dict[str, float]] = None) -> QuoteMatrix:
+    """
+    Converte os dados de mercado do ciclo em matrizes.
+    :param market_data: Dicionário exchange -> par -> dados de preço ou MarketSnapshot
+    :param offsets: Desvio do relógio de cada exchange em segundos (ClockTracker.offsets)
+    :return: QuoteMatrix com uma linha por exchange e uma coluna por par
+    """
+    if hasattr(market_data, "quote_matrix"):
+        # MarketSnapshot: as matrizes já estão montadas
+        return market_data.quote_matrix(offsets)
+    exchanges = list(market_data)
+    pair_index: Dict[str, int] = {}
+    rows, cols, bids, asks, timestamps, received = [], [], [], [], [], []
+    nan = float("nan")
+    for row, exchange_id in enumerate(exchanges):
+        for pair, quote in market_data[exchange_id].items():
+            col = pair_index.setdefault(pair, len(pair_index))
+            rows.append(row)
+            cols.append(col)
+            bid, ask = quote.get("bid"), quote.get("ask")
+            bids.append(nan if bid is None else bid)
+            asks.append(nan if ask is None or ask <= 0 else ask)
+            timestamp, local = quote.get("timestamp"), quote.get("received")
+            timestamps.append(nan if timestamp is None else timestamp)
+            received.append(nan if local is None else local)
+
+    shape = (len(exchanges), len(pair_index))
+    bid_matrix = np.full(shape, np.nan)
+    ask_matrix = np.full(shape, np.nan)
+    ts_matrix = np.full(shape, np.nan)
+    received_matrix = np.full(shape, np.nan)
+    if rows:
+        index = (np.array(rows), np.array(cols))
+        bid_matrix[index] = bids
+        ask_matrix[index] = asks
+        ts_matrix[index] = timestamps
+        received_matrix[index] = received
+    offset_vector = np.array([(offsets or {}).get(ex, 0.0) for ex in exchanges]).reshape(-1, 1)
+    times = np.where(np.isnan(ts_matrix), received_matrix, ts_matrix - offset_vector)
+    return QuoteMatrix(exchanges, list(pair_index), bid_matrix, ask_matrix, times)
+
+def taker_multipliers(exchanges: Sequence[str], exchange_fees: Dict[str, dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Multiplicadores de taxa taker por exchange.
+    :param exchanges: Exchanges na ordem das linhas da matriz
+    :param exchange_fees: Taxas por exchange em percentual ({"taker": 0.1, ...})
+    :return: (multiplicador de compra 1 + taxa, multiplicador de venda 1 - taxa)
+    """
+    fees = np.array([exchange_fees[ex]["taker"] / 100 for ex in exchanges], dtype=float)
+    return 1 + fees, 1 - fees
+
+def find_crosses(matrix: QuoteMatrix, buy_multipliers: np.ndarray, sell_multipliers: np.ndarray, threshold: float,
+                 now: Optional[float] = None, max_age: Optional[float] = None,
+                 max_skew: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Encontra todas as combinações (exchange de compra, exchange de venda, par) lucrativas.
+
+    Os pares cujo melhor bid líquido não supera o melhor ask líquido pelo
+    limiar são descartados antes de montar o cubo compra × venda × par.
+    :param matrix: Cotações do ciclo
+    :param buy_multipliers: 1 + taxa taker de cada exchange
+    :param sell_multipliers: 1 - taxa taker de cada exchange
+    :param threshold: Lucro mínimo em percentual
+    :param now: Hora local atual (necessária com max_age)
+    :param max_age: Idade máxima de uma cotação em segundos (sem limite se None)
+    :param max_skew: Diferença máxima em segundos entre as cotações de compra e venda (sem limite se None)
+    :return: (índices de compra, índices de venda, índices de par, lucro percentual)
+    """
+    effective_buy = matrix.asks * buy_multipliers[:, None]
+    effective_sell = matrix.bids * sell_multipliers[:, None]
+    valid = ~(np.isnan(effective_buy) | np.isnan(effective_sell))
+    if max_age is not None:
+        with np.errstate(invalid="ignore"):
+            valid &= ~(now - matrix.times > max_age)
+    effective_buy = np.where(valid, effective_buy, np.inf)
+    effective_sell = np.where(valid, effective_sell, -np.inf)
+
+    empty = np.empty(0, dtype=np.intp)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        best = (effective_sell.max(axis=0, initial=-np.inf) / effective_buy.min(axis=0, initial=np.inf) - 1) * 100
+        candidates = np.flatnonzero(best > threshold)
+        if candidates.size == 0:
+            return empty, empty, empty, np.empty(0)
+        buy = effective_buy[:, candidates]
+        sell = effective_sell[:, candidates]
+        profit = (sell[None, :, :] / buy[:, None, :] - 1) * 100
+
+    mask = profit > threshold
+    mask &= ~np.eye(len(matrix.exchanges), dtype=bool)[:, :, None]
+    if max_skew is not None:
+        times = matrix.times[:, candidates]
+        with np.errstate(invalid="ignore"):
+            mask &= ~(np.abs(times[:, None, :] - times[None, :, :]) > max_skew)
+    buy_idx, sell_idx, pair_idx = np.nonzero(mask)
+    return buy_idx, sell_idx, candidates[pair_idx], profit[buy_idx, sell_idx, pair_idx]
@@ -0,0 +1,250 @@
+import itertools
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from scripts.detection.simple import QuoteMatrix
+
+# Campos numéricos de uma cotação, na ordem das matrizes do snapshot
+QUOTE_FIELDS = ("bid", "ask", "volume", "timestamp", "received")
+
+class SymbolRegistry:
+    """
+    IDs inteiros estáveis para exchanges, pares e moedas.
+
+    Cada par é separado em moeda base e de cotação uma única vez, na
+    primeira vez em que aparece; contratos e símbolos fora do formato
+    'BASE/QUOTE' ficam com moedas -1.
+    """
+
+    def __init__(self):
+        self.exchanges: List[str] = []
+        self.symbols: List[str] = []
+        self.currencies: List[str] = []
+        self._exchange_ids: Dict[str, int] = {}
+        self._symbol_ids: Dict[str, int] = {}
+        self._currency_ids: Dict[str, int] = {}
+        self._bases: List[int] = []
+        self._quotes: List[int] = []
+
+    def exchange_id(self, exchange_id: str) -> int:
+        """ID inteiro de uma exchange, criando-o se necessário."""
+        index = self._exchange_ids.get(exchange_id)
+        if index is None:
+            index = self._exchange_ids[exchange_id] = len(self.exchanges)
+            self.exchanges.append(exchange_id)
+        return index
+
+    def currency_id(self, code: str) -> int:
+        """ID inteiro de uma moeda, criando-o se necessário."""
+        index = self._currency_ids.get(code)
+        if index is None:
+            index = self._currency_ids[code] = len(self.currencies)
+            self.currencies.append(code)
+        return index
+
+    def symbol_id(self, symbol: str) -> int:
+        """ID inteiro de um par, criando-o (e às suas moedas) se necessário."""
+        index = self._symbol_ids.get(symbol)
+        if index is None:
+            index = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if ":" not in symbol and symbol.count("/") == 1:
+                base, quote = symbol.split("/")
+                self._bases.append(self.currency_id(base))
+                self._quotes.append(self.currency_id(quote))
+            else:
+                self._bases.append(-1)
+                self._quotes.append(-1)
+        return index
+
+    def symbol_ids(self, symbols) -> np.ndarray:
+        """IDs de vários pares em um array."""
+        return np.array([self.symbol_id(symbol) for symbol in symbols], dtype=np.intp)
+
+    def currencies_of(self, symbol_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Moedas base e de cotação de vários pares.
+        :param symbol_ids: IDs de pares
+        :return: (IDs das bases, IDs das cotações), -1 nos símbolos que não são spot
+        """
+        symbol_ids = np.asarray(symbol_ids, dtype=np.intp)
+        return np.array(self._bases, dtype=np.intp)[symbol_ids], np.array(self._quotes, dtype=np.intp)[symbol_ids]
+
+class MarketSnapshot(Mapping):
+    """
+    Cotações de um ciclo em matrizes contíguas exchange × par.
+
+    ``bids``, ``asks``, ``volumes``, ``timestamps`` e ``received`` têm uma
+    linha por exchange e uma coluna por par (NaN sem valor) e ``present``
+    marca as cotações recebidas. A linha de uma exchange e a coluna de um par
+    são views sem cópia. Exchanges, pares e moedas usam os IDs de um
+    SymbolRegistry compartilhado entre ciclos, então os detectores podem
+    guardar índices de um ciclo para o outro.
+
+    Para o código que ainda espera o dicionário exchange -> par -> dados de
+    preço, o snapshot se comporta como esse dicionário (somente leitura): os
+    dicionários de cotação são montados só quando lidos.
+    """
+
+    _versions = itertools.count(1)
+
+    def __init__(self, registry: SymbolRegistry, exchanges: List[str], symbols: List[str], values: np.ndarray,
+                 present: np.ndarray):
+        """
+        Inicializa o snapshot.
+        :param registry: Registro de IDs compartilhado
+        :param exchanges: Exchanges na ordem das linhas
+        :param symbols: Pares na ordem das colunas
+        :param values: Array (campo, exchange, par) com os campos de QUOTE_FIELDS
+        :param present: Matriz booleana das cotações recebidas
+        """
+        self.version = next(self._versions)
+        self.registry = registry
+        self.exchanges = exchanges
+        self.symbols = symbols
+        self.exchange_ids = np.array([registry.exchange_id(ex) for ex in exchanges], dtype=np.intp)
+        self.symbol_ids = registry.symbol_ids(symbols)
+        self.bids, self.asks, self.volumes, self.timestamps, self.received = values
+        self.present = present
+        self.missing: List[str] = []
+        self.stale: Dict[str, float] = {}
+        self._rows = {exchange_id: row for row, exchange_id in enumerate(exchanges)}
+        self._columns = {symbol: column for column, symbol in enumerate(symbols)}
+        # ID do par -> coluna neste snapshot (-1 se ausente)
+        self.column_by_id = np.full(len(registry.symbols), -1, dtype=np.intp)
+        self.column_by_id[self.symbol_ids] = np.arange(len(symbols))
+
+    @classmethod
+    def from_market_data(cls, market_data: Dict, registry: Optional[SymbolRegistry] = None) -> "MarketSnapshot":
+        """
+        Monta o snapshot a partir do dicionário exchange -> par -> dados de preço.
+        :param market_data: Dados de mercado do ciclo (``missing`` e ``stale`` são preservados)
+        :param registry: Registro de IDs compartilhado (um novo se None)
+        :return: MarketSnapshot
+        """
+        if isinstance(market_data, MarketSnapshot):
+            return market_data
+        registry = registry or SymbolRegistry()
+        exchanges = list(market_data)
+        columns: Dict[str, int] = {}
+        rows, cols, entries = [], [], []
+        for row, exchange_id in enumerate(exchanges):
+            for pair, quote in market_data[exchange_id].items():
+                rows.append(row)
+                cols.append(columns.setdefault(pair, len(columns)))
+                entries.append(tuple(quote.get(field) for field in QUOTE_FIELDS))
+
+        values = np.full((len(QUOTE_FIELDS), len(exchanges), len(columns)), np.nan)
+        present = np.zeros((len(exchanges), len(columns)), dtype=bool)
+        if rows:
+            index = (np.array(rows), np.array(cols))
+            # None vira NaN na conversão para float
+            values[(slice(None),) + index] = np.array(entries, dtype=float).T
+            present[index] = True
+        snapshot = cls(registry, exchanges, list(columns), values, present)
+        snapshot.missing = list(getattr(market_data, "missing", []))
+        snapshot.stale = dict(getattr(market_data, "stale", {}))
+        return snapshot
+
+    def row(self, exchange_id: str) -> int:
+        """Linha de uma exchange (KeyError se ausente)."""
+        return self._rows[exchange_id]
+
+    def column(self, symbol: str) -> Optional[int]:
+        """Coluna de um par ou None se ausente."""
+        return self._columns.get(symbol)
+
+    def symbol_view(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Cotações de um par em todas as exchanges, como views das colunas.
+        :return: Campo ("bid", "ask", ...) -> array por exchange, ou None se o par não está no snapshot
+        """
+        column = self._columns.get(symbol)
+        if column is None:
+            return None
+        fields = (self.bids, self.asks, self.volumes, self.timestamps, self.received)
+        return {field: matrix[:, column] for field, matrix in zip(QUOTE_FIELDS, fields)}
+
+    def quote_matrix(self, offsets: Optional[Dict[str, float]] = None) -> QuoteMatrix:
+        """
+        QuoteMatrix do detector simples sobre as mesmas matrizes.
+        :param offsets: Desvio do relógio de cada exchange em segundos (ClockTracker.offsets)
+        """
+        with np.errstate(invalid="ignore"):
+            asks = np.where(self.asks > 0, self.asks, np.nan)
+        offset_vector = np.array([(offsets or {}).get(ex, 0.0) for ex in self.exchanges]).reshape(-1, 1)
+        times = np.where(np.isnan(self.timestamps), self.received, self.timestamps - offset_vector)
+        return QuoteMatrix(self.exchanges, self.symbols, self.bids, asks, times)
+
+    def __getitem__(self, exchange_id: str) -> "ExchangeView":
+        return ExchangeView(self, self._rows[exchange_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.exchanges)
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+    def __contains__(self, exchange_id) -> bool:
+        return exchange_id in self._rows
+
+class ExchangeView(Mapping):
+    """
+    Cotações de uma exchange: views da linha do snapshot.
+
+    Como mapeamento par -> dados de preço, monta o dicionário de cada cotação
+    apenas quando lido; ``vectors`` entrega bids e asks de vários pares sem
+    passar por dicionários.
+    """
+
+    def __init__(self, snapshot: MarketSnapshot, row: int):
+        self.snapshot = snapshot
+        self.exchange_id = snapshot.exchanges[row]
+        self.bids = snapshot.bids[row]
+        self.asks = snapshot.asks[row]
+        self.volumes = snapshot.volumes[row]
+        self.timestamps = snapshot.timestamps[row]
+        self.received = snapshot.received[row]
+        self.present = snapshot.present[row]
+
+    def vectors(self, symbol_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bids e asks de vários pares.
+        :param symbol_ids: IDs de pares no SymbolRegistry do snapshot
+        :return: (bids, asks), NaN onde não há cotação
+        """
+        symbol_ids = np.asarray(symbol_ids, dtype=np.intp)
+        known = symbol_ids < len(self.snapshot.column_by_id)
+        columns = np.full(len(symbol_ids), -1, dtype=np.intp)
+        columns[known] = self.snapshot.column_by_id[symbol_ids[known]]
+        found = columns >= 0
+        found[found] = self.present[columns[found]]
+        bids = np.full(len(symbol_ids), np.nan)
+        asks = np.full(len(symbol_ids), np.nan)
+        bids[found] = self.bids[columns[found]]
+        asks[found] = self.asks[columns[found]]
+        return bids, asks
+
+    def _column(self, symbol: str) -> Optional[int]:
+        column = self.snapshot.column(symbol)
+        return column if column is not None and self.present[column] else None
+
+    def __getitem__(self, symbol: str) -> dict:
+        column = self._column(symbol)
+        if column is None:
+            raise KeyError(symbol)
+        fields = (self.bids, self.asks, self.volumes, self.timestamps, self.received)
+        return {field: None if np.isnan(values[column]) else float(values[column])
+                for field, values in zip(QUOTE_FIELDS, fields)}
+
+    def __contains__(self, symbol) -> bool:
+        return self._column(symbol) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        symbols = self.snapshot.symbols
+        return (symbols[column] for column in np.flatnonzero(self.present).tolist())
+
+    def __len__(self) -> int:
+        return int(self.present.sum())
@@ -0,0 +1,173 @@
+import math
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from scripts.detection.snapshot import MarketSnapshot
+
+# Estatísticas por série, cada uma em um array indexado pelo slot da série
+STAT_FIELDS = ("mean", "var", "last", "last_time", "interval", "lag_cov", "lag_var")
+
+class SpreadTracker:
+    """
+    Estatísticas contínuas do spread de cada (par, exchange A, exchange B).
+
+    O spread é ln(mid B / mid A), com A a exchange de menor ID no
+    SymbolRegistry, então a série não depende da ordem das exchanges no
+    ciclo. Cada série ocupa um slot nos arrays de estatísticas e é
+    encontrada por uma chave inteira (par, A, B) via busca binária: não há
+    objeto Python por série, e cada atualização é O(1) por série, vetorizada
+    sobre todas as séries do ciclo.
+
+    Média e variância são médias móveis exponenciais (fórmula de Welford
+    ponderada) com alpha = 2 / (window + 1). A meia-vida da reversão vem de
+    um AR(1) estimado com as mesmas médias: a variação do spread é regredida
+    sobre o desvio anterior em relação à média.
+    """
+
+    def __init__(self, window: int = 100, entry_z: float = 2.0, min_samples: int = 30,
+                 max_half_life: Optional[float] = None, capacity: int = 1024):
+        """
+        Inicializa o rastreador.
+        :param window: Janela equivalente (em atualizações) das médias exponenciais
+        :param entry_z: |z-score| mínimo para um sinal
+        :param min_samples: Atualizações mínimas de uma série antes de gerar sinais
+        :param max_half_life: Meia-vida máxima em segundos de um sinal (sem limite se None)
+        :param capacity: Séries alocadas inicialmente (os arrays dobram quando enchem)
+        """
+        self.alpha = 2.0 / (window + 1)
+        self.entry_z = entry_z
+        self.min_samples = min_samples
+        self.max_half_life = max_half_life
+        self.size = 0
+        self.keys = np.empty(capacity, dtype=np.int64)  # Chave (par, A, B) de cada slot
+        self.count = np.zeros(capacity, dtype=np.int64)
+        for field in STAT_FIELDS:
+            setattr(self, field, np.zeros(capacity))
+        # Chaves ordenadas e seus slots, para a busca binária
+        self._sorted_keys = np.empty(0, dtype=np.int64)
+        self._sorted_slots = np.empty(0, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @staticmethod
+    def series_keys(symbol_ids: np.ndarray, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """Chaves inteiras das séries (IDs de par e de exchanges do SymbolRegistry)."""
+        return (symbol_ids.astype(np.int64) << 32) | (first.astype(np.int64) << 16) | second.astype(np.int64)
+
+    def slots(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Slots das séries, criando as que ainda não existem.
+        :param keys: Chaves distintas de series_keys
+        :return: Slot de cada chave
+        """
+        position = np.searchsorted(self._sorted_keys, keys)
+        found = position < len(self._sorted_keys)
+        found[found] = self._sorted_keys[position[found]] == keys[found]
+        slots = np.empty(len(keys), dtype=np.intp)
+        slots[found] = self._sorted_slots[position[found]]
+        new = np.flatnonzero(~found)
+        if len(new):
+            start = self.size
+            self._reserve(start + len(new))
+            slots[new] = np.arange(start, start + len(new))
+            self.keys[start:start + len(new)] = keys[new]
+            self.size += len(new)
+            order = np.argsort(self.keys[:self.size], kind="stable")
+            self._sorted_keys = self.keys[:self.size][order]
+            self._sorted_slots = order
+        return slots
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self.count)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for field in ("keys", "count") + STAT_FIELDS:
+            values = getattr(self, field)
+            grown = np.zeros(capacity, dtype=values.dtype)
+            grown[:len(values)] = values
+            setattr(self, field, grown)
+
+    def update(self, snapshot: MarketSnapshot,
+               now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Atualiza todas as séries com cotação nas duas exchanges.
+
+        O z-score é calculado com as estatísticas anteriores à atualização,
+        ou seja, fora da amostra.
+        :param snapshot: Cotações do ciclo
+        :param now: Instante da atualização (hora atual se None)
+        :return: (slots, linha da exchange A, linha da exchange B, coluna do par, z-score) das séries atualizadas
+        """
+        now = time.time() if now is None else now
+        with np.errstate(invalid="ignore"):
+            quoted = snapshot.present & (snapshot.bids > 0) & (snapshot.asks > 0)
+        mids = (snapshot.bids + snapshot.asks) / 2
+        first, second = np.triu_indices(len(snapshot.exchanges), 1)
+        combo, columns = np.nonzero(quoted[first] & quoted[second])
+        first, second = first[combo], second[combo]
+        # A é sempre a exchange de menor ID, qualquer que seja a ordem das linhas
+        swap = snapshot.exchange_ids[first] > snapshot.exchange_ids[second]
+        first, second = np.where(swap, second, first), np.where(swap, first, second)
+        spreads = np.log(mids[second, columns] / mids[first, columns])
+        slots = self.slots(self.series_keys(snapshot.symbol_ids[columns], snapshot.exchange_ids[first],
+                                            snapshot.exchange_ids[second]))
+
+        count = self.count[slots]
+        mean, var, last = self.mean[slots], self.var[slots], self.last[slots]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where((count > 1) & (var > 0), (spreads - mean) / np.sqrt(var), 0.0)
+
+        alpha = self.alpha
+        seen = count > 0
+        interval = now - self.last_time[slots]
+        interval = np.where(count > 1, self.interval[slots] + alpha * (interval - self.interval[slots]), interval)
+        # AR(1): variação do spread contra o desvio anterior em relação à média
+        lag = last - mean
+        change = spreads - last
+        lag_cov = self.lag_cov[slots] + alpha * (lag * change - self.lag_cov[slots])
+        lag_var = self.lag_var[slots] + alpha * (lag * lag - self.lag_var[slots])
+        diff = spreads - mean
+        increment = alpha * diff
+        self.mean[slots] = np.where(seen, mean + increment, spreads)
+        self.var[slots] = np.where(seen, (1 - alpha) * (var + diff * increment), 0.0)
+        self.interval[slots] = np.where(seen, interval, 0.0)
+        self.lag_cov[slots] = np.where(seen, lag_cov, 0.0)
+        self.lag_var[slots] = np.where(seen, lag_var, 0.0)
+        self.last[slots] = spreads
+        self.last_time[slots] = now
+        self.count[slots] = count + 1
+        return slots, first, second, columns, z
+
+    def half_life(self, slots: np.ndarray) -> np.ndarray:
+        """
+        Meia-vida estimada da reversão à média.
+        :param slots: Slots das séries
+        :return: Meia-vida em segundos (inf se a série não reverte)
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            phi = 1 + self.lag_cov[slots] / self.lag_var[slots]
+            reverting = (phi > 0) & (phi < 1)
+            samples = np.where(reverting, -math.log(2) / np.log(np.where(reverting, phi, 0.5)), np.inf)
+        return samples * self.interval[slots]
+
+    def zscore(self, slots: np.ndarray) -> np.ndarray:
+        """z-score do último spread de cada série em relação às estatísticas atuais."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.var[slots] > 0, (self.last[slots] - self.mean[slots]) / np.sqrt(self.var[slots]), 0.0)
+
+    def signals(self, slots: np.ndarray, z: np.ndarray) -> np.ndarray:
+        """
+        Séries atualizadas que geram sinal de reversão à média.
+        :param slots: Slots devolvidos por ``update``
+        :param z: z-scores devolvidos por ``update``
+        :return: Máscara booleana sobre ``slots``
+        """
+        mask = (self.count[slots] > self.min_samples) & (np.abs(z) >= self.entry_z)
+        if self.max_half_life is not None:
+            mask &= self.half_life(slots) <= self.max_half_life
+        return mask
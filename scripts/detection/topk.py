@@ -0,0 +1,111 @@
+import heapq
+import itertools
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Optional
+
+from scripts.detection.opportunity import Opportunity
+
+class TopK:
+    """
+    Seleção das melhores oportunidades com heaps limitados.
+
+    Mantém no máximo ``per_pair`` oportunidades por par e, no resultado,
+    as ``k`` melhores no total. Cada heap é de mínimo com tamanho limitado:
+    uma oportunidade nova só entra se superar a pior mantida, que sai. A
+    memória fica limitada por ``k`` (ou por pares × ``per_pair``), não pela
+    quantidade de oportunidades encontradas. Sem limites (ambos None), guarda
+    tudo e apenas ordena.
+
+    Em caso de empate vale a ordem de chegada, como em uma ordenação estável.
+    """
+
+    def __init__(self, k: Optional[int] = None, per_pair: Optional[int] = None,
+                 key: Callable[[Opportunity], float] = attrgetter("profit_percentage")):
+        """
+        Inicializa a seleção.
+        :param k: Oportunidades mantidas no total (None = sem limite)
+        :param per_pair: Oportunidades mantidas por par (None = sem limite)
+        :param key: Valor a maximizar (lucro percentual por padrão)
+        """
+        self.k = k
+        self.per_pair = per_pair
+        self.key = key
+        self.seen = 0  # Oportunidades oferecidas, mantidas ou não
+        # Heaps de (valor, -ordem de chegada, oportunidade); um por par se per_pair for usado
+        self._heaps: Dict[Optional[str], list] = {}
+        self._order = itertools.count()
+
+    def _heap(self, pair: Optional[str]) -> list:
+        return self._heaps.setdefault(pair if self.per_pair is not None else None, [])
+
+    @property
+    def _limit(self) -> Optional[int]:
+        return self.per_pair if self.per_pair is not None else self.k
+
+    def accepts(self, score: float, pair: Optional[str] = None) -> bool:
+        """
+        Indica se uma oportunidade com esse valor entraria na seleção.
+
+        Permite descartar um candidato antes de montar a oportunidade.
+        :param score: Valor da oportunidade (mesma escala de ``key``)
+        :param pair: Par da oportunidade (necessário com per_pair)
+        """
+        limit = self._limit
+        if limit is None:
+            return True
+        if limit <= 0:
+            return False
+        if self.per_pair is not None and pair is None:
+            return True
+        heap = self._heaps.get(pair if self.per_pair is not None else None, ())
+        return len(heap) < limit or score > heap[0][0]
+
+    def push(self, opportunity: Opportunity) -> bool:
+        """
+        Oferece uma oportunidade à seleção.
+        :return: True se ela foi mantida (pode sair depois, superada por outras)
+        """
+        self.seen += 1
+        score = self.key(opportunity)
+        heap = self._heap(opportunity.pair)
+        entry = (score, -next(self._order), opportunity)
+        limit = self._limit
+        if limit is None or len(heap) < limit:
+            heapq.heappush(heap, entry)
+            return True
+        if limit and entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+            return True
+        return False
+
+    def extend(self, opportunities: Iterable[Opportunity]) -> "TopK":
+        """Oferece várias oportunidades; devolve a própria seleção."""
+        for opportunity in opportunities:
+            self.push(opportunity)
+        return self
+
+    def __len__(self) -> int:
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def items(self) -> List[Opportunity]:
+        """
+        Oportunidades selecionadas.
+        :return: As melhores, em ordem decrescente de valor
+        """
+        entries = itertools.chain.from_iterable(self._heaps.values())
+        if self.k is None:
+            selected = sorted(entries, key=lambda entry: entry[:2], reverse=True)
+        else:
+            selected = heapq.nlargest(self.k, entries, key=lambda entry: entry[:2])
+        return [entry[2] for entry in selected]
+
+def select_top(opportunities: Iterable[Opportunity], k: Optional[int] = None,
+               per_pair: Optional[int] = None) -> List[Opportunity]:
+    """
+    Seleciona as melhores oportunidades de uma lista.
+    :param opportunities: Oportunidades de um ou mais detectores
+    :param k: Oportunidades mantidas no total (None = sem limite)
+    :param per_pair: Oportunidades mantidas por par (None = sem limite)
+    :return: As melhores, em ordem decrescente de lucro percentual
+    """
+    return TopK(k, per_pair).extend(opportunities).items()
@@ -0,0 +1,127 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from scripts.detection.graph import CurrencyGraph, Edge
+
+# Triângulo de moedas em ordem crescente de ID
+Triangle = Tuple[int, int, int]
+
+def cycle_profits(rates: np.ndarray, cycle_edges: np.ndarray, fee: float,
+                  threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Avalia ciclos de três pernas de uma vez.
+    :param rates: Taxa bruta de cada aresta direcionada (CurrencyGraph.conversion_rates)
+    :param cycle_edges: Arestas direcionadas de cada ciclo (n×3)
+    :param fee: Taxa taker da exchange em fração (0.001 = 0,1%)
+    :param threshold: Lucro mínimo em percentual
+    :return: (índices dos ciclos lucrativos, lucro percentual de cada um)
+    """
+    if not len(cycle_edges):
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    with np.errstate(invalid="ignore"):
+        profit = (rates[cycle_edges].prod(axis=1) * (1 - fee) ** 3 - 1) * 100
+        hits = np.flatnonzero(profit > threshold)
+    return hits, profit[hits]
+
+class TriangleIndex:
+    """
+    Índice dos ciclos de três moedas de um CurrencyGraph.
+
+    O conjunto de triângulos é mantido de forma incremental pelas arestas
+    incluídas e removidas no grafo. Cada triângulo gera os dois ciclos
+    direcionados (a -> b -> c -> a e a -> c -> b -> a), materializados em
+    arrays de moedas e de arestas direcionadas que são reconstruídos apenas
+    quando a lista de mercados muda.
+    """
+
+    def __init__(self, graph: CurrencyGraph):
+        """
+        Inicializa o índice e o inscreve no grafo.
+        :param graph: Grafo de moedas compartilhado da exchange
+        """
+        self.graph = graph
+        self.triangles: Set[Triangle] = set()
+        self._by_edge: Dict[Edge, Set[Triangle]] = {}
+        self._version = None
+        self._cycles = np.empty((0, 3), dtype=np.intp)
+        self._cycle_edges = np.empty((0, 3), dtype=np.intp)
+        graph.listeners.append(self)
+        for edge in list(graph.edges):
+            self.edge_added(edge)
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+    def edge_added(self, edge: Edge) -> None:
+        u, v = edge
+        for w in self.graph.neighbors[u] & self.graph.neighbors[v]:
+            triangle = tuple(sorted((u, v, w)))
+            if triangle in self.triangles:
+                continue
+            self.triangles.add(triangle)
+            a, b, c = triangle
+            for side in ((a, b), (b, c), (a, c)):
+                self._by_edge.setdefault(side, set()).add(triangle)
+
+    def edge_removed(self, edge: Edge) -> None:
+        for triangle in self._by_edge.pop(edge, ()):
+            self.triangles.discard(triangle)
+            a, b, c = triangle
+            for side in ((a, b), (b, c), (a, c)):
+                if side != edge:
+                    self._by_edge.get(side, set()).discard(triangle)
+
+    def cycles(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ciclos direcionados do índice.
+        :return: (moedas n×3, arestas direcionadas n×3), com a aresta i indo da moeda i para a i+1
+        """
+        if self._version != self.graph.version:
+            directed = []
+            for a, b, c in self.triangles:
+                directed.append((a, b, c))
+                directed.append((a, c, b))
+            cycles = np.array(directed, dtype=np.intp).reshape(-1, 3)
+            edge = self.graph.directed_edge
+            self._cycle_edges = np.array(
+                [(edge(x, y), edge(y, z), edge(z, x)) for x, y, z in directed], dtype=np.intp
+            ).reshape(-1, 3)
+            self._cycles = cycles
+            self._version = self.graph.version
+        return self._cycles, self._cycle_edges
+
+    def evaluate(self, rates: np.ndarray, fee: float, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Avalia todos os ciclos de uma vez.
+        :param rates: Taxa bruta de cada aresta direcionada (CurrencyGraph.conversion_rates)
+        :param fee: Taxa taker da exchange em fração (0.001 = 0,1%)
+        :param threshold: Lucro mínimo em percentual
+        :return: (índices dos ciclos lucrativos, lucro percentual de cada um)
+        """
+        _, cycle_edges = self.cycles()
+        return cycle_profits(rates, cycle_edges, fee, threshold)
+
+    def touching(self, edge: Edge) -> Set[Triangle]:
+        """Triângulos que usam uma aresta não direcionada."""
+        return self._by_edge.get(edge, set())
+
+    def evaluate_triangles(self, triangles: Iterable[Triangle], rates: np.ndarray, fee: float,
+                           threshold: float) -> List[Tuple[List[int], List[int], float]]:
+        """
+        Avalia apenas os dois ciclos direcionados de alguns triângulos.
+        :param triangles: Triângulos a reavaliar
+        :param rates: Taxa bruta de cada aresta direcionada (CurrencyGraph.conversion_rates)
+        :param fee: Taxa taker da exchange em fração (0.001 = 0,1%)
+        :param threshold: Lucro mínimo em percentual
+        :return: Ciclos lucrativos como (moedas, arestas direcionadas, lucro percentual)
+        """
+        edge = self.graph.directed_edge
+        cycles = []
+        for a, b, c in triangles:
+            for x, y, z in ((a, b, c), (a, c, b)):
+                edges = [edge(x, y), edge(y, z), edge(z, x)]
+                profit = (float(rates[edges[0]] * rates[edges[1]] * rates[edges[2]]) * (1 - fee) ** 3 - 1) * 100
+                if profit > threshold:
+                    cycles.append(([x, y, z], edges, profit))
+        return cycles
@@ -0,0 +1,203 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Moedas cotadas em dólar usadas para converter taxas de saque fixas em percentual
+USD_CODES = ("USD", "USDT", "USDC")
+
+class VenueGraph:
+    """
+    Grafo de conversão entre moedas de várias exchanges.
+
+    Cada nó é uma moeda em uma exchange ('BTC@binance'). As arestas são:
+      - de negociação: os dois sentidos de cada mercado spot da exchange
+        (vender a base pelo bid, comprar a base pagando o ask), com a taxa
+        taker da exchange;
+      - de transferência: a mesma moeda entre duas exchanges, para as moedas
+        configuradas em ``transfers``, custando a taxa de saque da exchange de
+        origem (convertida em fração de ``notional`` dólares) mais
+        ``latency_penalty`` por cento por minuto de transferência.
+
+    As arestas seguem o layout de CurrencyGraph.edge_arrays (posições 2k e
+    2k + 1 são os dois sentidos da mesma ligação), então o grafo pode ser
+    usado diretamente pelo NegativeCycleDetector.
+    """
+
+    def __init__(self, transfers: Optional[Dict[str, dict]] = None, latency_penalty: float = 0.0,
+                 notional: float = 1000.0):
+        """
+        Inicializa o grafo.
+        :param transfers: Moeda -> {"minutes": tempo de transferência, "withdrawal_fees": exchange -> taxa fixa
+                          na moeda ("default" vale para as demais)}
+        :param latency_penalty: Penalidade em percentual por minuto de transferência
+        :param notional: Valor em dólares de uma operação, usado para converter taxas fixas em fração
+        """
+        self.transfers = transfers or {}
+        self.latency_penalty = latency_penalty
+        self.notional = notional
+        self.currencies: List[str] = []  # Rótulo de cada nó ('BTC@binance')
+        self.nodes: List[Tuple[str, str]] = []  # (exchange, moeda) de cada nó
+        self.listed: Dict[str, frozenset] = {}
+        self.version = 0
+        self._node_ids: Dict[Tuple[str, str], int] = {}
+        self._sources = np.empty(0, dtype=np.intp)
+        self._targets = np.empty(0, dtype=np.intp)
+        # Mercados de cada exchange e posição da aresta de venda (a de compra vem logo depois)
+        self._markets: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        # Transferências (moeda, exchange de origem, exchange de destino), depois de todas as arestas de negociação
+        self._transfers: List[Tuple[str, str, str]] = []
+        self._edge_exchange = np.empty(0, dtype=np.intp)  # Índice da exchange de cada aresta (-1 nas transferências)
+        self._exchanges: List[str] = []
+
+    def node(self, exchange_id: str, code: str) -> int:
+        """ID do nó de uma moeda em uma exchange, criando-o se necessário."""
+        key = (exchange_id, code)
+        node = self._node_ids.get(key)
+        if node is None:
+            node = self._node_ids[key] = len(self.nodes)
+            self.nodes.append(key)
+            self.currencies.append(f"{code}@{exchange_id}")
+        return node
+
+    def sync(self, market_data: Dict) -> bool:
+        """
+        Reconstrói as arestas se a lista de mercados de alguma exchange mudou.
+        :param market_data: Dicionário exchange -> par -> dados de preço
+        :return: True se o grafo foi reconstruído
+        """
+        listed = {
+            exchange_id: frozenset(s for s in quotes if ":" not in s and s.count("/") == 1)
+            for exchange_id, quotes in market_data.items()
+        }
+        if listed == self.listed:
+            return False
+        self.listed = listed
+        self.version += 1
+
+        sources, targets, edge_exchange = [], [], []
+        present = set()
+        self._exchanges = sorted(listed)
+        self._markets = {}
+        for exchange_index, exchange_id in enumerate(self._exchanges):
+            symbols = sorted(listed[exchange_id])
+            positions = []
+            for symbol in symbols:
+                base_code, quote_code = symbol.split("/")
+                present.update(((exchange_id, base_code), (exchange_id, quote_code)))
+                base, quote = self.node(exchange_id, base_code), self.node(exchange_id, quote_code)
+                positions.append(len(sources))
+                sources += (base, quote)
+                targets += (quote, base)
+                edge_exchange += (exchange_index, exchange_index)
+            self._markets[exchange_id] = (symbols, np.array(positions, dtype=np.intp))
+
+        self._transfers = []
+        for code in sorted(self.transfers):
+            venues = [ex for ex in self._exchanges if (ex, code) in present]
+            for i, origin in enumerate(venues):
+                for destination in venues[i + 1:]:
+                    self._transfers += [(code, origin, destination), (code, destination, origin)]
+                    a, b = self._node_ids[(origin, code)], self._node_ids[(destination, code)]
+                    sources += (a, b)
+                    targets += (b, a)
+                    edge_exchange += (-1, -1)
+
+        self._sources = np.array(sources, dtype=np.intp)
+        self._targets = np.array(targets, dtype=np.intp)
+        self._edge_exchange = np.array(edge_exchange, dtype=np.intp)
+        return True
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Arestas direcionadas em arrays.
+        :return: (nós de origem, nós de destino, índice no vetor de taxas)
+        """
+        return self._sources, self._targets, np.arange(len(self._sources))
+
+    def usd_prices(self, market_data: Dict) -> Dict[str, float]:
+        """
+        Preço médio em dólares das moedas transferíveis, a partir de qualquer exchange que as cote.
+        :param market_data: Dicionário exchange -> par -> dados de preço
+        :return: Moeda -> preço em dólares (moedas sem cotação ficam de fora)
+        """
+        prices = {code: 1.0 for code in USD_CODES}
+        for code in self.transfers:
+            if code in prices:
+                continue
+            mids = []
+            for quotes in market_data.values():
+                for usd in USD_CODES:
+                    quote = quotes.get(f"{code}/{usd}")
+                    if quote and quote.get("bid") and quote.get("ask"):
+                        mids.append((quote["bid"] + quote["ask"]) / 2)
+            if mids:
+                prices[code] = sum(mids) / len(mids)
+        return prices
+
+    def transfer_cost(self, code: str, origin: str, usd_price: Optional[float]) -> float:
+        """
+        Custo de transferir uma moeda como fração do valor transferido.
+        :param code: Moeda
+        :param origin: Exchange de onde sai o saque
+        :param usd_price: Preço da moeda em dólares (None se desconhecido)
+        :return: Fração perdida (inf se a taxa de saque não pode ser estimada)
+        """
+        config = self.transfers[code]
+        fees = config.get("withdrawal_fees", {})
+        fee = fees.get(origin, fees.get("default"))
+        if fee is None or usd_price is None:
+            return np.inf
+        return fee * usd_price / self.notional + config.get("minutes", 0) * self.latency_penalty / 100
+
+    def rates(self, market_data: Dict, exchange_fees: Dict[str, dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Taxas brutas e custos de cada aresta direcionada.
+        :param market_data: Dicionário exchange -> par -> dados de preço
+        :param exchange_fees: Taxas por exchange em percentual ({"taker": 0.1, ...})
+        :return: (taxas: bid, 1 / ask ou 1 nas transferências; custos em fração)
+        """
+        self.sync(market_data)
+        rates = np.full(len(self._sources), np.nan)
+        fees = np.zeros(len(self._sources))
+        trading = np.array([exchange_fees[ex]["taker"] / 100 for ex in self._exchanges] + [0.0])
+        fees[:] = trading[self._edge_exchange]
+        for exchange_id, (symbols, positions) in self._markets.items():
+            quotes = market_data[exchange_id]
+            if hasattr(quotes, "vectors"):
+                # ExchangeView de um MarketSnapshot: lê as colunas sem montar dicionários
+                bids, asks = quotes.vectors(quotes.snapshot.registry.symbol_ids(symbols))
+                bids[bids == 0] = np.nan
+                asks[asks == 0] = np.nan
+            else:
+                bids = np.array([quotes[s].get("bid") or np.nan for s in symbols], dtype=float)
+                asks = np.array([quotes[s].get("ask") or np.nan for s in symbols], dtype=float)
+            rates[positions] = bids
+            rates[positions + 1] = 1.0 / asks
+        if self._transfers:
+            prices = self.usd_prices(market_data)
+            rates[len(rates) - len(self._transfers):] = 1.0
+            fees[len(fees) - len(self._transfers):] = [
+                self.transfer_cost(code, origin, prices.get(code)) for code, origin, _ in self._transfers
+            ]
+        return rates, fees
+
+    def is_transfer(self, edge: int) -> bool:
+        """Se a aresta direcionada é uma transferência entre exchanges."""
+        return self._edge_exchange[edge] < 0
+
+    def describe(self, edge: int, rates: np.ndarray, fees: np.ndarray) -> dict:
+        """
+        Passo legível de uma aresta direcionada.
+        :return: {"action": "trade", "exchange", "pair", "side", "rate", "fee"} ou
+                 {"action": "transfer", "asset", "from", "to", "fee", "minutes"}
+        """
+        if self.is_transfer(edge):
+            first = len(self._sources) - len(self._transfers)
+            code, origin, destination = self._transfers[edge - first]
+            return {"action": "transfer", "asset": code, "from": origin, "to": destination,
+                    "fee": float(fees[edge]), "minutes": self.transfers[code].get("minutes", 0)}
+        exchange_id = self._exchanges[self._edge_exchange[edge]]
+        symbols, positions = self._markets[exchange_id]
+        index = int(np.searchsorted(positions, edge - edge % 2))
+        return {"action": "trade", "exchange": exchange_id, "pair": symbols[index],
+                "side": "sell" if edge % 2 == 0 else "buy", "rate": float(rates[edge]), "fee": float(fees[edge])}
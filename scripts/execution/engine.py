@@ -1,31 +1,36 @@
 import logging
+import time
 from scripts.connectors.cex import CEXConnector
+from scripts.detection.opportunity import SimpleOpportunity
 import asyncio
 
 logger = logging.getLogger(__name__)
 
 class ExecutionEngine:
-    def __init__(self, connectors: dict):
+    def __init__(self, connectors: dict, default_amount: float = 0.01):
         """
         Inicializa o motor de execução de trades.
         :param connectors: Dicionário de exchange_id -> CEXConnector
+        :param default_amount: Quantidade da moeda base usada quando a oportunidade não traz maxSize
         """
         self.connectors = connectors
+        self.default_amount = default_amount
         self.logger = logging.getLogger(__name__)
 
-    async def execute_trade(self, opportunity: dict) -> bool:
+    async def execute_trade(self, opportunity: SimpleOpportunity) -> bool:
         """
         Executa uma ordem de arbitragem.
-        :param opportunity: Dados da oportunidade (buyExchange, sellExchange, pair, etc.)
+        :param opportunity: Oportunidade simples (buy_exchange, sell_exchange, pair, etc.)
         :return: True se executado com sucesso, False caso contrário
         """
         try:
-            buy_exchange = opportunity["buyExchange"]
-            sell_exchange = opportunity["sellExchange"]
-            pair = opportunity["pair"]
-            amount = 0.01  # Exemplo: 0.01 unidade da moeda base
+            buy_exchange = opportunity.buy_exchange
+            sell_exchange = opportunity.sell_exchange
+            pair = opportunity.pair
+            # Quantidade calculada sobre a profundidade dos livros, quando disponível
+            amount = opportunity.max_size or self.default_amount
             
-            self.logger.info(f"Executando trade: Comprar em {buy_exchange}, Vender em {sell_exchange}, Par: {pair}")
+            self.logger.info(f"Executando trade: Comprar {amount} em {buy_exchange}, Vender em {sell_exchange}, Par: {pair}")
             
             # Conectar às exchanges
             buy_connector = self.connectors.get(buy_exchange)
@@ -36,7 +41,7 @@ class ExecutionEngine:
                 return False
             
             # TODO: Implementar execução real de ordens via CCXT
-            # Exemplo: buy_order = await buy_connector.exchange.create_limit_buy_order(pair, amount, opportunity["buyPrice"])
+            # Exemplo: buy_order = await buy_connector.exchange.create_limit_buy_order(pair, amount, opportunity.buy_price)
             
             self.logger.info(f"Trade simulado executado com sucesso: {opportunity}")
             return True
@@ -50,14 +55,7 @@ async def main():
         "kraken": CEXConnector("kraken")
     }
     engine = ExecutionEngine(connectors)
-    opportunity = {
-        "buyExchange": "binance",
-        "sellExchange": "kraken",
-        "pair": "BTC/USDT",
-        "buyPrice": 50000,
-        "sellPrice": 50500,
-        "spreadPercentage": 1.0
-    }
+    opportunity = SimpleOpportunity("BTC/USDT", "binance", "kraken", 50000, 50500, 1.0, 500.0, time.time())
     success = await engine.execute_trade(opportunity)
     logger.info(f"Trade executado: {'OK' if success else 'Falhou'}")
 
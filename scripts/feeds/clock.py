@@ -0,0 +1,98 @@
+import time
+from typing import Dict, Optional
+
+class ClockTracker:
+    """
+    Estima, por exchange, o desvio do relógio e a latência de rede.
+
+    O desvio (relógio da exchange - relógio local) vem de idas e voltas a um
+    endpoint de hora do servidor, no estilo NTP: offset = hora_servidor -
+    (envio + recebimento) / 2, com latência de meia ida e volta. Cada cotação
+    com timestamp da exchange também atualiza o atraso aparente
+    (recebimento - timestamp), que combinado ao desvio dá a latência real.
+    Todas as estimativas são médias exponenciais em segundos.
+    """
+
+    def __init__(self, alpha: float = 0.1, sync_interval: float = 60.0):
+        """
+        Inicializa o rastreador.
+        :param alpha: Fator de suavização das médias exponenciais
+        :param sync_interval: Intervalo em segundos entre sincronizações com o servidor
+        """
+        self.alpha = alpha
+        self.sync_interval = sync_interval
+        self.offsets: Dict[str, float] = {}
+        self.round_trips: Dict[str, float] = {}
+        self.delays: Dict[str, float] = {}
+        self.last_sync: Dict[str, float] = {}
+
+    def observe_round_trip(self, exchange_id: str, sent: float, server_time: float, received: float) -> None:
+        """
+        Registra uma consulta de hora do servidor.
+        :param exchange_id: ID da exchange
+        :param sent: Hora local do envio (s)
+        :param server_time: Hora informada pela exchange (s)
+        :param received: Hora local do recebimento (s)
+        """
+        rtt = max(received - sent, 0.0)
+        offset = server_time - (sent + received) / 2
+        self.offsets[exchange_id] = self._smooth(self.offsets.get(exchange_id), offset)
+        self.round_trips[exchange_id] = self._smooth(self.round_trips.get(exchange_id), rtt)
+        self.last_sync[exchange_id] = received
+
+    def observe_quote(self, exchange_id: str, exchange_timestamp: Optional[float], received: float) -> None:
+        """
+        Registra o atraso aparente de uma cotação.
+        :param exchange_id: ID da exchange
+        :param exchange_timestamp: Timestamp da cotação na exchange (s), se houver
+        :param received: Hora local do recebimento (s)
+        """
+        if exchange_timestamp is None:
+            return
+        self.delays[exchange_id] = self._smooth(self.delays.get(exchange_id), received - exchange_timestamp)
+
+    def needs_sync(self, exchange_id: str, now: Optional[float] = None) -> bool:
+        """Indica se o desvio da exchange deve ser medido novamente."""
+        now = time.time() if now is None else now
+        return now - self.last_sync.get(exchange_id, 0.0) >= self.sync_interval
+
+    def to_local(self, exchange_id: str, exchange_timestamp: float) -> float:
+        """Converte um timestamp da exchange para o relógio local."""
+        return exchange_timestamp - self.offsets.get(exchange_id, 0.0)
+
+    def quote_time(self, exchange_id: str, quote: dict) -> Optional[float]:
+        """
+        Instante local em que a cotação foi gerada.
+        :param exchange_id: ID da exchange
+        :param quote: Dados de preço com "timestamp" (exchange) e/ou "received" (local)
+        :return: Hora local em segundos ou None se a cotação não tem horário
+        """
+        timestamp = quote.get("timestamp")
+        if timestamp is not None:
+            return self.to_local(exchange_id, timestamp)
+        return quote.get("received")
+
+    def latency(self, exchange_id: str) -> Optional[float]:
+        """Latência de ida estimada da exchange até aqui, em segundos."""
+        delay = self.delays.get(exchange_id)
+        if delay is not None:
+            return delay + self.offsets.get(exchange_id, 0.0)
+        rtt = self.round_trips.get(exchange_id)
+        return None if rtt is None else rtt / 2
+
+    def stats(self) -> Dict[str, dict]:
+        """Estimativas atuais por exchange."""
+        exchanges = set(self.offsets) | set(self.delays)
+        return {
+            exchange_id: {
+                "offset": self.offsets.get(exchange_id),
+                "round_trip": self.round_trips.get(exchange_id),
+                "latency": self.latency(exchange_id),
+            }
+            for exchange_id in exchanges
+        }
+
+    def _smooth(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return (1 - self.alpha) * previous + self.alpha * value
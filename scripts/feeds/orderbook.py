@@ -0,0 +1,315 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from scripts.feeds.stream import QuoteTable, WebSocketFeed
+
+logger = logging.getLogger(__name__)
+
+# Nível de preço como (preço, quantidade)
+Level = Tuple[float, float]
+
+# Busca um snapshot REST no formato ccxt: {"bids", "asks", "nonce"}
+SnapshotFetcher = Callable[[str, str], Awaitable[dict]]
+
+class SequenceGap(Exception):
+    """Atualização incremental fora de sequência; o livro precisa ser ressincronizado."""
+
+class BookSide:
+    """
+    Um lado do livro em listas ordenadas paralelas (chaves e quantidades).
+
+    As chaves ficam em ordem crescente com o melhor nível no fim da lista:
+    o preço nos bids e o preço negativo nos asks. A leitura do topo é O(1)
+    e a localização de um nível é O(log n) por bisect; alterar a quantidade
+    de um nível existente é O(1), mas inserir ou remover um nível é O(n),
+    pois desloca os níveis seguintes da lista. Como a maior parte das
+    atualizações fica perto do topo, no fim da lista, o deslocamento costuma
+    ser de poucos elementos.
+    """
+
+    def __init__(self, is_bid: bool):
+        self._sign = 1.0 if is_bid else -1.0
+        self._keys: List[float] = []
+        self._sizes: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._sizes.clear()
+
+    def load(self, levels: Iterable) -> None:
+        """Substitui o lado inteiro pelos níveis de um snapshot."""
+        sign = self._sign
+        book = sorted((sign * float(price), float(size)) for price, size, *_ in levels if float(size) > 0)
+        self._keys = [key for key, _ in book]
+        self._sizes = [size for _, size in book]
+
+    def update(self, price, size) -> None:
+        """Define a quantidade de um nível; quantidade zero remove o nível."""
+        key = self._sign * float(price)
+        size = float(size)
+        keys = self._keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if size > 0:
+                self._sizes[i] = size
+            else:
+                del keys[i]
+                del self._sizes[i]
+        elif size > 0:
+            keys.insert(i, key)
+            self._sizes.insert(i, size)
+
+    def best(self) -> Optional[Level]:
+        """Melhor nível (maior bid ou menor ask) ou None se vazio."""
+        if not self._keys:
+            return None
+        return self._sign * self._keys[-1], self._sizes[-1]
+
+    def top(self, depth: Optional[int] = None) -> List[Level]:
+        """Níveis do melhor para o pior, limitados a depth."""
+        n = len(self._keys)
+        stop = 0 if depth is None else max(n - depth, 0)
+        sign = self._sign
+        return [(sign * self._keys[i], self._sizes[i]) for i in range(n - 1, stop - 1, -1)]
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Preços e quantidades do melhor para o pior nível, em arrays."""
+        prices = np.array(self._keys[::-1], dtype=float) * self._sign
+        return prices, np.array(self._sizes[::-1], dtype=float)
+
+    def truncate(self, depth: int) -> None:
+        """Descarta os níveis além da profundidade indicada."""
+        excess = len(self._keys) - depth
+        if excess > 0:
+            del self._keys[:excess]
+            del self._sizes[:excess]
+
+class OrderBook:
+    """Livro de ofertas L2 de um par em uma exchange."""
+
+    def __init__(self, exchange_id: str, symbol: str, max_depth: Optional[int] = None):
+        """
+        Inicializa o livro vazio e não sincronizado.
+        :param exchange_id: ID da exchange
+        :param symbol: Par no formato ccxt
+        :param max_depth: Número máximo de níveis mantidos por lado (sem limite se None)
+        """
+        self.exchange_id = exchange_id
+        self.symbol = symbol
+        self.max_depth = max_depth
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.sequence: Optional[int] = None
+        self.synced = False
+        self.timestamp = 0.0
+
+    def apply_snapshot(self, bids: Iterable, asks: Iterable, sequence: int) -> None:
+        """
+        Carrega um snapshot completo do livro.
+        :param bids: Níveis de compra [(preço, quantidade), ...]
+        :param asks: Níveis de venda [(preço, quantidade), ...]
+        :param sequence: ID da última atualização contida no snapshot
+        """
+        self.bids.load(bids)
+        self.asks.load(asks)
+        self._trim()
+        self.sequence = sequence
+        self.synced = True
+        self.timestamp = time.time()
+
+    def apply_diff(self, bids: Iterable, asks: Iterable, first_sequence: int, last_sequence: int) -> bool:
+        """
+        Aplica uma atualização incremental.
+        :param bids: Níveis de compra alterados (quantidade zero remove)
+        :param asks: Níveis de venda alterados (quantidade zero remove)
+        :param first_sequence: Primeiro ID de atualização do evento
+        :param last_sequence: Último ID de atualização do evento
+        :return: True se aplicada, False se já contida no livro
+        :raises SequenceGap: Se houver lacuna desde a última atualização aplicada
+        """
+        if not self.synced:
+            raise SequenceGap(f"Livro {self.exchange_id} {self.symbol} não sincronizado")
+        if last_sequence <= self.sequence:
+            return False
+        if first_sequence > self.sequence + 1:
+            self.synced = False
+            raise SequenceGap(
+                f"Lacuna em {self.exchange_id} {self.symbol}: esperado {self.sequence + 1}, recebido {first_sequence}"
+            )
+        for price, size, *_ in bids:
+            self.bids.update(price, size)
+        for price, size, *_ in asks:
+            self.asks.update(price, size)
+        self._trim()
+        self.sequence = last_sequence
+        self.timestamp = time.time()
+        return True
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    def _trim(self) -> None:
+        if self.max_depth is not None:
+            self.bids.truncate(self.max_depth)
+            self.asks.truncate(self.max_depth)
+
+class OrderBookManager:
+    """
+    Livros L2 por (exchange, par) mantidos por snapshot + atualizações incrementais.
+
+    Atualizações recebidas enquanto um livro está fora de sincronia ficam em
+    buffer; quando há lacuna de sequência um novo snapshot é buscado e o
+    buffer é reaplicado sobre ele.
+    """
+
+    def __init__(self, snapshot_fetcher: Optional[SnapshotFetcher] = None, max_depth: Optional[int] = None,
+                 max_buffer: int = 1000, recorder=None):
+        """
+        Inicializa o gerenciador.
+        :param snapshot_fetcher: Corrotina (exchange_id, symbol) -> snapshot no formato ccxt
+        :param max_depth: Profundidade máxima por lado de cada livro
+        :param max_buffer: Máximo de atualizações em buffer por livro durante a ressincronização
+        :param recorder: MarketDataRecorder que recebe snapshots e atualizações (opcional)
+        """
+        self.snapshot_fetcher = snapshot_fetcher
+        self.max_depth = max_depth
+        self.max_buffer = max_buffer
+        self.recorder = recorder
+        self.books: Dict[Tuple[str, str], OrderBook] = {}
+        self._buffers: Dict[Tuple[str, str], Deque[tuple]] = {}
+        self._resyncs: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def get(self, exchange_id: str, symbol: str) -> Optional[OrderBook]:
+        """Retorna o livro sincronizado de um par ou None."""
+        book = self.books.get((exchange_id, symbol))
+        return book if book is not None and book.synced else None
+
+    def book(self, exchange_id: str, symbol: str) -> OrderBook:
+        """Retorna o livro de um par, criando-o se necessário."""
+        key = (exchange_id, symbol)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = OrderBook(exchange_id, symbol, self.max_depth)
+        return book
+
+    def apply_snapshot(self, exchange_id: str, symbol: str, bids: Iterable, asks: Iterable, sequence: int) -> OrderBook:
+        """Carrega um snapshot e reaplica as atualizações em buffer."""
+        if self.recorder is not None:
+            bids, asks = list(bids), list(asks)
+            self.recorder.record_snapshot(exchange_id, symbol, bids, asks, sequence)
+        book = self.book(exchange_id, symbol)
+        book.apply_snapshot(bids, asks, sequence)
+        pending = self._buffers.pop((exchange_id, symbol), ())
+        for diff in pending:
+            try:
+                book.apply_diff(*diff)
+            except SequenceGap as e:
+                logger.warning(f"{str(e)}; aguardando novo snapshot")
+                self._buffer((exchange_id, symbol), diff)
+                self._schedule_resync(exchange_id, symbol)
+                break
+        return book
+
+    def apply_diff(self, exchange_id: str, symbol: str, bids: Iterable, asks: Iterable,
+                   first_sequence: int, last_sequence: int) -> bool:
+        """
+        Aplica uma atualização incremental, iniciando a ressincronização se necessário.
+        :return: True se o livro foi atualizado
+        """
+        key = (exchange_id, symbol)
+        diff = (list(bids), list(asks), first_sequence, last_sequence)
+        if self.recorder is not None:
+            self.recorder.record_diff(exchange_id, symbol, *diff)
+        book = self.book(exchange_id, symbol)
+        if book.synced:
+            try:
+                return book.apply_diff(*diff)
+            except SequenceGap as e:
+                logger.warning(str(e))
+        self._buffer(key, diff)
+        self._schedule_resync(exchange_id, symbol)
+        return False
+
+    async def resync(self, exchange_id: str, symbol: str) -> Optional[OrderBook]:
+        """Busca um snapshot REST e reconstrói o livro."""
+        try:
+            snapshot = await self.snapshot_fetcher(exchange_id, symbol)
+        except Exception as e:
+            logger.error(f"Erro ao buscar snapshot de {exchange_id} {symbol}: {str(e)}")
+            return None
+        return self.apply_snapshot(exchange_id, symbol, snapshot["bids"], snapshot["asks"], snapshot["nonce"])
+
+    async def close(self) -> None:
+        """Cancela as ressincronizações pendentes."""
+        tasks, self._resyncs = self._resyncs, {}
+        for task in tasks.values():
+            task.cancel()
+
+    def _buffer(self, key: Tuple[str, str], diff: tuple) -> None:
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = deque(maxlen=self.max_buffer)
+        buffer.append(diff)
+
+    def _schedule_resync(self, exchange_id: str, symbol: str) -> None:
+        key = (exchange_id, symbol)
+        if self.snapshot_fetcher is None:
+            return
+        task = self._resyncs.get(key)
+        if task is not None and not task.done():
+            return
+        try:
+            self._resyncs[key] = asyncio.get_running_loop().create_task(self.resync(exchange_id, symbol))
+        except RuntimeError:
+            logger.warning(f"Sem event loop para ressincronizar {exchange_id} {symbol}")
+
+class BinanceDepthFeed(WebSocketFeed):
+    """
+    Stream <symbol>@depth@100ms da Binance alimentando o OrderBookManager.
+
+    O topo de cada livro também é publicado na QuoteTable.
+    """
+
+    exchange_id = "binance"
+    url = "wss://stream.binance.com:9443/ws"
+    records_quotes = False
+
+    def __init__(self, quote_table: QuoteTable, symbols: List[str], order_books: OrderBookManager, **kwargs):
+        super().__init__(quote_table, symbols, **kwargs)
+        self.order_books = order_books
+        self._symbols_by_id = {symbol.replace("/", "").upper(): symbol for symbol in self.symbols}
+
+    def subscribe_messages(self) -> List[dict]:
+        streams = [f"{symbol.replace('/', '').lower()}@depth@100ms" for symbol in self.symbols]
+        return [{"method": "SUBSCRIBE", "params": streams, "id": 1}]
+
+    def parse(self, message: dict):
+        if not isinstance(message, dict) or message.get("e") != "depthUpdate":
+            return []
+        symbol = self._symbols_by_id.get(message.get("s", ""))
+        if symbol is None:
+            return []
+        self.order_books.apply_diff(self.exchange_id, symbol, message["b"], message["a"], message["U"], message["u"])
+        book = self.order_books.get(self.exchange_id, symbol)
+        if book is None:
+            return []
+        bid, ask = book.best_bid(), book.best_ask()
+        if bid is None or ask is None:
+            return []
+        return [(symbol, bid[0], ask[0], None, message.get("E", 0) / 1000 or None)]
+
+DEPTH_FEEDS = {
+    "binance": BinanceDepthFeed,
+}
@@ -0,0 +1,341 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from scripts.feeds.orderbook import OrderBook, SequenceGap
+from scripts.feeds.stream import QuoteTable
+
+logger = logging.getLogger(__name__)
+
+# Tipos de registro do diário
+TICKER = "t"    # [tipo, hora local, par, bid, ask, volume, timestamp da exchange]
+SNAPSHOT = "s"  # [tipo, hora local, par, bids, asks, sequência]
+DIFF = "d"      # [tipo, hora local, par, bids, asks, primeira sequência, última sequência]
+
+JOURNAL_SUFFIX = ".journal"
+INDEX_SUFFIX = ".index"
+BLOCK_MAGIC = b"ARBJ"
+# Cabeçalho de bloco: marcador, primeira hora, última hora, registros, bytes comprimidos
+BLOCK_HEADER = struct.Struct("<4sddII")
+# Entrada do índice: primeira hora, última hora, posição no diário, bytes comprimidos, registros
+INDEX_ENTRY = struct.Struct("<ddQII")
+
+def journal_day(timestamp: float) -> str:
+    """Dia UTC (AAAA-MM-DD) do arquivo que recebe um registro."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+def encode_block(records: List[list], level: int = 6) -> bytes:
+    """
+    Serializa e comprime um bloco de registros.
+    :param records: Registros em ordem de chegada
+    :param level: Nível de compressão zlib
+    :return: Cabeçalho seguido do conteúdo comprimido
+    """
+    payload = zlib.compress("\n".join(json.dumps(r, separators=(",", ":")) for r in records).encode(), level)
+    return BLOCK_HEADER.pack(BLOCK_MAGIC, records[0][1], records[-1][1], len(records), len(payload)) + payload
+
+def decode_block(payload: bytes) -> List[list]:
+    """Descomprime o conteúdo de um bloco em registros."""
+    return [json.loads(line) for line in zlib.decompress(payload).split(b"\n")]
+
+class MarketDataRecorder:
+    """
+    Grava cotações e atualizações de livro em diários binários append-only.
+
+    Há um diário por dia UTC e por exchange, feito de blocos comprimidos com
+    zlib; um índice ao lado guarda o intervalo de horas e a posição de cada
+    bloco para que a leitura pule direto ao período pedido. As chamadas
+    record_* só acrescentam o registro a um buffer em memória: a compressão
+    e a escrita acontecem em lote numa thread dedicada, fora do event loop.
+    """
+
+    def __init__(self, directory: str = "data/journal", block_records: int = 1000, flush_interval: float = 1.0,
+                 compression_level: int = 6):
+        """
+        Inicializa o gravador.
+        :param directory: Diretório raiz dos diários (um subdiretório por dia)
+        :param block_records: Máximo de registros por bloco comprimido
+        :param flush_interval: Intervalo em segundos entre gravações em lote
+        :param compression_level: Nível de compressão zlib (1-9)
+        """
+        self.directory = directory
+        self.block_records = block_records
+        self.flush_interval = flush_interval
+        self.compression_level = compression_level
+        self.records_written = 0
+        self._buffers: Dict[str, List[list]] = {}
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._task: Optional[asyncio.Task] = None
+        self._flushes: List[asyncio.Future] = []
+
+    def record_ticker(self, exchange_id: str, symbol: str, quote: Dict) -> None:
+        """
+        Acrescenta uma cotação ao buffer.
+        :param exchange_id: ID da exchange
+        :param symbol: Par no formato ccxt
+        :param quote: Dados de preço (bid, ask, volume, timestamp, received)
+        """
+        received = quote.get("received") or time.time()
+        self._append(exchange_id, [TICKER, received, symbol, quote.get("bid"), quote.get("ask"),
+                                   quote.get("volume"), quote.get("timestamp")])
+
+    def record_tickers(self, exchange_id: str, quotes: Dict[str, Dict]) -> None:
+        """Acrescenta ao buffer todas as cotações de uma exchange (par -> dados de preço)."""
+        for symbol, quote in quotes.items():
+            self.record_ticker(exchange_id, symbol, quote)
+
+    def record_snapshot(self, exchange_id: str, symbol: str, bids: Iterable, asks: Iterable, sequence: int,
+                        received: Optional[float] = None) -> None:
+        """Acrescenta ao buffer um snapshot completo do livro."""
+        self._append(exchange_id, [SNAPSHOT, received or time.time(), symbol, _levels(bids), _levels(asks), sequence])
+
+    def record_diff(self, exchange_id: str, symbol: str, bids: Iterable, asks: Iterable, first_sequence: int,
+                    last_sequence: int, received: Optional[float] = None) -> None:
+        """Acrescenta ao buffer uma atualização incremental do livro."""
+        self._append(exchange_id, [DIFF, received or time.time(), symbol, _levels(bids), _levels(asks),
+                                   first_sequence, last_sequence])
+
+    def start(self) -> asyncio.Task:
+        """Inicia a gravação periódica em uma task de fundo."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def flush(self) -> None:
+        """Grava tudo o que está em buffer e aguarda as gravações pendentes."""
+        self._submit()
+        flushes, self._flushes = self._flushes, []
+        if flushes:
+            await asyncio.gather(*flushes)
+
+    async def close(self) -> None:
+        """Interrompe a gravação periódica, grava o restante e libera a thread de escrita."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Erro ao gravar diário de mercado: {str(e)}")
+
+    def _append(self, exchange_id: str, record: list) -> None:
+        self._buffers.setdefault(exchange_id, []).append(record)
+        self._pending += 1
+        if self._pending >= self.block_records:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._submit()
+
+    def _submit(self) -> None:
+        if not self._pending:
+            return
+        batches, self._buffers, self._pending = self._buffers, {}, 0
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._write, batches)
+        self._flushes = [f for f in self._flushes if not f.done()]
+        self._flushes.append(future)
+
+    def _write(self, batches: Dict[str, List[list]]) -> None:
+        for exchange_id, records in batches.items():
+            by_day: Dict[str, List[list]] = {}
+            for record in records:
+                by_day.setdefault(journal_day(record[1]), []).append(record)
+            for day, day_records in by_day.items():
+                self._append_blocks(day, exchange_id, day_records)
+            self.records_written += len(records)
+
+    def _append_blocks(self, day: str, exchange_id: str, records: List[list]) -> None:
+        day_dir = os.path.join(self.directory, day)
+        os.makedirs(day_dir, exist_ok=True)
+        base = os.path.join(day_dir, exchange_id)
+        with open(base + JOURNAL_SUFFIX, "ab") as journal, open(base + INDEX_SUFFIX, "ab") as index:
+            journal.seek(0, os.SEEK_END)
+            for i in range(0, len(records), self.block_records):
+                chunk = records[i:i + self.block_records]
+                block = encode_block(chunk, self.compression_level)
+                offset = journal.tell()
+                journal.write(block)
+                index.write(INDEX_ENTRY.pack(chunk[0][1], chunk[-1][1], offset,
+                                             len(block) - BLOCK_HEADER.size, len(chunk)))
+            journal.flush()
+
+class JournalReader:
+    """
+    Lê os diários gravados pelo MarketDataRecorder.
+
+    O índice de cada arquivo é usado para pular os blocos fora do período
+    pedido; blocos gravados depois da última entrada do índice (por exemplo
+    após uma queda do processo) são encontrados varrendo os cabeçalhos.
+    """
+
+    def __init__(self, directory: str = "data/journal"):
+        """
+        Inicializa o leitor.
+        :param directory: Diretório raiz dos diários
+        """
+        self.directory = directory
+
+    def days(self) -> List[str]:
+        """Dias (AAAA-MM-DD) com diário gravado, em ordem."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(day for day in os.listdir(self.directory) if os.path.isdir(os.path.join(self.directory, day)))
+
+    def exchanges(self) -> List[str]:
+        """Exchanges com diário gravado em algum dia."""
+        found = set()
+        for day in self.days():
+            for name in os.listdir(os.path.join(self.directory, day)):
+                if name.endswith(JOURNAL_SUFFIX):
+                    found.add(name[:-len(JOURNAL_SUFFIX)])
+        return sorted(found)
+
+    def blocks(self, path: str) -> List[Tuple[float, float, int, int, int]]:
+        """
+        Lista os blocos de um diário.
+        :param path: Caminho do arquivo .journal
+        :return: Lista de (primeira hora, última hora, posição do conteúdo, bytes comprimidos, registros)
+        """
+        entries = []
+        end = 0
+        index_path = path[:-len(JOURNAL_SUFFIX)] + INDEX_SUFFIX
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            for first, last, offset, length, count in INDEX_ENTRY.iter_unpack(data[:usable]):
+                entries.append((first, last, offset + BLOCK_HEADER.size, length, count))
+                end = offset + BLOCK_HEADER.size + length
+        size = os.path.getsize(path)
+        if end < size:
+            with open(path, "rb") as f:
+                f.seek(end)
+                while True:
+                    header = f.read(BLOCK_HEADER.size)
+                    if len(header) < BLOCK_HEADER.size:
+                        break
+                    magic, first, last, count, length = BLOCK_HEADER.unpack(header)
+                    if magic != BLOCK_MAGIC or f.tell() + length > size:
+                        logger.warning(f"Diário {path} truncado na posição {f.tell() - BLOCK_HEADER.size}")
+                        break
+                    entries.append((first, last, f.tell(), length, count))
+                    f.seek(length, os.SEEK_CUR)
+        return entries
+
+    def read(self, exchange_id: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[list]:
+        """
+        Percorre os registros de uma exchange em ordem de gravação.
+        :param exchange_id: ID da exchange
+        :param start: Hora inicial (epoch em segundos, inclusiva)
+        :param end: Hora final (epoch em segundos, inclusiva)
+        :return: Iterador de registros
+        """
+        first_day = journal_day(start) if start is not None else None
+        last_day = journal_day(end) if end is not None else None
+        for day in self.days():
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            path = os.path.join(self.directory, day, exchange_id + JOURNAL_SUFFIX)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                for first, last, offset, length, _ in self.blocks(path):
+                    if (start is not None and last < start) or (end is not None and first > end):
+                        continue
+                    f.seek(offset)
+                    for record in decode_block(f.read(length)):
+                        ts = record[1]
+                        if (start is None or ts >= start) and (end is None or ts <= end):
+                            yield record
+
+    def replay(self, exchanges: Optional[Iterable[str]] = None, start: Optional[float] = None,
+               end: Optional[float] = None) -> Iterator[Tuple[str, list]]:
+        """
+        Intercala os registros de várias exchanges pela hora local de recebimento.
+        :param exchanges: Exchanges a reproduzir (todas se None)
+        :param start: Hora inicial (epoch em segundos)
+        :param end: Hora final (epoch em segundos)
+        :return: Iterador de (exchange, registro)
+        """
+        exchanges = self.exchanges() if exchanges is None else list(exchanges)
+        streams = [self._tagged(exchange_id, start, end) for exchange_id in exchanges]
+        return heapq.merge(*streams, key=lambda item: item[1][1])
+
+    def _tagged(self, exchange_id: str, start: Optional[float], end: Optional[float]) -> Iterator[Tuple[str, list]]:
+        for record in self.read(exchange_id, start, end):
+            yield exchange_id, record
+
+    def snapshots(self, exchanges: Optional[Iterable[str]] = None, pairs: Optional[Iterable[str]] = None,
+                  start: Optional[float] = None, end: Optional[float] = None,
+                  interval: float = 1.0) -> Iterator[Tuple[float, Dict]]:
+        """
+        Reconstrói o estado do mercado ao longo do tempo a partir dos diários.
+
+        Cotações atualizam a tabela diretamente; snapshots e atualizações de
+        livro passam por um OrderBook local e publicam o topo do livro. Um
+        intervalo sem registros não gera snapshots repetidos: a emissão
+        seguinte fica na primeira fronteira de ``interval`` após a lacuna.
+        :param exchanges: Exchanges a reproduzir (todas se None)
+        :param pairs: Pares a incluir (todos se None)
+        :param start: Hora inicial (epoch em segundos)
+        :param end: Hora final (epoch em segundos)
+        :param interval: Intervalo em segundos entre snapshots emitidos
+        :return: Iterador de (hora, dados de mercado no formato de fetch_market_data)
+        """
+        wanted = None if pairs is None else set(pairs)
+        table = QuoteTable()
+        books: Dict[Tuple[str, str], OrderBook] = {}
+        next_emit = None
+        for exchange_id, record in self.replay(exchanges, start, end):
+            kind, ts, symbol = record[0], record[1], record[2]
+            if wanted is not None and symbol not in wanted:
+                continue
+            if next_emit is None:
+                next_emit = ts + interval
+            if ts >= next_emit:
+                yield next_emit, table.snapshot(pairs=wanted)
+                # Uma lacuna no diário gera um único snapshot, não cópias do mesmo estado
+                next_emit += ((ts - next_emit) // interval + 1) * interval
+            if kind == TICKER:
+                _, _, _, bid, ask, volume, timestamp = record
+                if bid and ask:
+                    table.update(exchange_id, symbol, bid, ask, volume, timestamp, ts)
+                continue
+            book = books.get((exchange_id, symbol))
+            if book is None:
+                book = books[(exchange_id, symbol)] = OrderBook(exchange_id, symbol)
+            try:
+                if kind == SNAPSHOT:
+                    book.apply_snapshot(record[3], record[4], record[5])
+                elif kind == DIFF and book.synced:
+                    book.apply_diff(record[3], record[4], record[5], record[6])
+            except SequenceGap:
+                continue
+            bid, ask = book.best_bid(), book.best_ask()
+            if book.synced and bid is not None and ask is not None:
+                table.update(exchange_id, symbol, bid[0], ask[0], None, None, ts)
+        if next_emit is not None:
+            yield next_emit, table.snapshot(pairs=wanted)
+
+def _levels(levels: Iterable) -> List[List[float]]:
+    return [[float(price), float(size)] for price, size, *_ in levels]
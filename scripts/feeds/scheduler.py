@@ -0,0 +1,189 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def best_net_spreads(market_data: Dict, exchange_fees: Dict[str, dict]) -> Dict[str, float]:
+    """
+    Calcula, por par, o melhor spread entre exchanges já descontadas as taxas taker.
+    :param market_data: Dicionário exchange -> par -> dados de preço
+    :param exchange_fees: Taxas por exchange em percentual ({"taker": 0.1, ...})
+    :return: Dicionário par -> spread líquido em percentual (pares em uma só exchange são omitidos)
+    """
+    best: Dict[str, list] = {}
+    for exchange_id, quotes in market_data.items():
+        fee = exchange_fees.get(exchange_id, {}).get("taker", 0) / 100
+        for pair, quote in quotes.items():
+            bid, ask = quote.get("bid"), quote.get("ask")
+            if not bid or not ask:
+                continue
+            entry = best.setdefault(pair, [0.0, float("inf"), 0])
+            entry[0] = max(entry[0], bid * (1 - fee))
+            entry[1] = min(entry[1], ask * (1 + fee))
+            entry[2] += 1
+    return {
+        pair: (sell / buy - 1) * 100
+        for pair, (sell, buy, count) in best.items() if count >= 2
+    }
+
+class PollingScheduler:
+    """
+    Distribui o orçamento de requisições de cada exchange entre os pares.
+
+    Cada par recebe um peso que cresce com a volatilidade recente do spread
+    entre exchanges e com a proximidade do limiar de lucro; pares sem
+    cotação ou sem volume em uma exchange ficam com uma fração do peso.
+    A taxa de atualização de cada (exchange, par) é proporcional ao peso,
+    limitada por min_interval e max_interval, e a soma das taxas de uma
+    exchange não passa do seu orçamento.
+    """
+
+    def __init__(self, budgets: Dict[str, float], threshold: float, default_budget: float = 1.0,
+                 min_interval: float = 1.0, max_interval: float = 60.0, alpha: float = 0.2,
+                 spread_scale: float = 0.1, illiquid_factor: float = 0.1):
+        """
+        Inicializa o agendador.
+        :param budgets: Requisições por segundo disponíveis para cotações em cada exchange
+        :param threshold: Lucro mínimo (%) usado pelo detector
+        :param default_budget: Orçamento das exchanges não configuradas
+        :param min_interval: Menor intervalo entre duas consultas do mesmo par, em segundos
+        :param max_interval: Maior intervalo entre duas consultas do mesmo par, em segundos
+        :param alpha: Fator de suavização das médias exponenciais
+        :param spread_scale: Escala (%) usada para normalizar spread e volatilidade
+        :param illiquid_factor: Fração do peso dada a pares sem cotação ou volume
+        """
+        self.budgets = budgets
+        self.threshold = threshold
+        self.default_budget = default_budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.alpha = alpha
+        self.spread_scale = spread_scale
+        self.illiquid_factor = illiquid_factor
+        self._spread: Dict[str, float] = {}
+        self._volatility: Dict[str, float] = {}
+        self._liquid: Dict[Tuple[str, str], bool] = {}
+        self._rates: Dict[Tuple[str, str], float] = {}
+        self._next_due: Dict[Tuple[str, str], float] = {}
+
+    def weight(self, pair: str) -> float:
+        """Peso de um par a partir do spread e da volatilidade recentes."""
+        spread = self._spread.get(pair)
+        if spread is None:
+            return 1.0
+        gap = max(self.threshold - spread, 0.0)
+        proximity = 1.0 / (1.0 + gap / self.spread_scale)
+        return self.illiquid_factor + proximity + self._volatility.get(pair, 0.0) / self.spread_scale
+
+    def observe(self, market_data: Dict, spreads: Dict[str, float]) -> None:
+        """
+        Atualiza as estatísticas com as cotações mais recentes e rebalanceia as taxas.
+        :param market_data: Dicionário exchange -> par -> dados de preço
+        :param spreads: Dicionário par -> melhor spread líquido (%)
+        """
+        a = self.alpha
+        for pair, spread in spreads.items():
+            previous = self._spread.get(pair)
+            if previous is None:
+                self._spread[pair] = spread
+                continue
+            self._volatility[pair] = (1 - a) * self._volatility.get(pair, 0.0) + a * abs(spread - previous)
+            self._spread[pair] = (1 - a) * previous + a * spread
+        for exchange_id, pair in list(self._next_due):
+            quote = market_data.get(exchange_id, {}).get(pair)
+            self._liquid[(exchange_id, pair)] = bool(quote and quote.get("bid") and quote.get("ask") and quote.get("volume") != 0)
+        self._rebalance()
+
+    def due(self, exchanges: Iterable[str], pairs: Iterable[str], now: Optional[float] = None) -> Dict[str, List[str]]:
+        """
+        Retorna os pares que devem ser consultados agora e agenda a próxima consulta.
+        :param exchanges: Exchanges consultadas por REST
+        :param pairs: Universo de pares
+        :param now: Instante atual (time.monotonic() se None)
+        :return: Dicionário exchange -> pares a consultar
+        """
+        now = time.monotonic() if now is None else now
+        pairs = list(pairs)
+        new_keys = False
+        due: Dict[str, List[str]] = {}
+        for exchange_id in exchanges:
+            for pair in pairs:
+                key = (exchange_id, pair)
+                next_due = self._next_due.get(key)
+                if next_due is None:
+                    new_keys = True
+                elif next_due > now:
+                    continue
+                due.setdefault(exchange_id, []).append(pair)
+                self._next_due[key] = now
+        if new_keys:
+            self._rebalance()
+        for exchange_id, exchange_pairs in due.items():
+            for pair in exchange_pairs:
+                key = (exchange_id, pair)
+                self._next_due[key] = now + 1.0 / self._rates[key]
+        return due
+
+    def time_until_next(self, now: Optional[float] = None) -> float:
+        """Segundos até a próxima consulta agendada."""
+        if not self._next_due:
+            return self.max_interval
+        now = time.monotonic() if now is None else now
+        return max(min(self._next_due.values()) - now, 0.0)
+
+    def refresh_rates(self) -> Dict[str, Dict[str, float]]:
+        """Taxa de atualização atual (consultas por segundo) de cada exchange e par."""
+        rates: Dict[str, Dict[str, float]] = {}
+        for (exchange_id, pair), rate in self._rates.items():
+            rates.setdefault(exchange_id, {})[pair] = rate
+        return rates
+
+    def _rebalance(self) -> None:
+        by_exchange: Dict[str, List[Tuple[str, float]]] = {}
+        for exchange_id, pair in self._next_due:
+            weight = self.weight(pair)
+            if not self._liquid.get((exchange_id, pair), True):
+                weight *= self.illiquid_factor
+            by_exchange.setdefault(exchange_id, []).append((pair, weight))
+        min_rate, max_rate = 1.0 / self.max_interval, 1.0 / self.min_interval
+        for exchange_id, weights in by_exchange.items():
+            budget = self.budgets.get(exchange_id, self.default_budget)
+            if len(weights) * min_rate > budget:
+                logger.warning(f"Orçamento de {exchange_id} ({budget:g} req/s) não cobre {len(weights)} pares "
+                               f"a cada {self.max_interval:g}s; usando o intervalo máximo para todos")
+                rates = {pair: min_rate for pair, _ in weights}
+            else:
+                rates = self._allocate(budget, dict(weights), min_rate, max_rate)
+            for pair, rate in rates.items():
+                self._rates[(exchange_id, pair)] = rate
+
+    @staticmethod
+    def _allocate(budget: float, weights: Dict[str, float], min_rate: float, max_rate: float) -> Dict[str, float]:
+        """
+        Divide o orçamento proporcionalmente aos pesos, respeitando os limites de taxa.
+
+        Pares que ficariam abaixo de min_rate ou acima de max_rate são fixados
+        no limite e o orçamento restante é redistribuído entre os demais, de
+        modo que a soma das taxas nunca passa do orçamento.
+        :param budget: Requisições por segundo da exchange (ao menos len(weights) * min_rate)
+        :param weights: Dicionário par -> peso
+        :param min_rate: Menor taxa de um par
+        :param max_rate: Maior taxa de um par
+        :return: Dicionário par -> taxa
+        """
+        rates: Dict[str, float] = {}
+        free = dict(weights)
+        while free:
+            left = budget - sum(rates.values())
+            total = sum(free.values())
+            share = {pair: left * weight / total if total else left / len(free) for pair, weight in free.items()}
+            low = [pair for pair, rate in share.items() if rate < min_rate]
+            high = [pair for pair, rate in share.items() if rate > max_rate]
+            if not low and not high:
+                rates.update(share)
+                break
+            for pair in low or high:
+                rates[pair] = min_rate if low else max_rate
+                del free[pair]
+        return rates
@@ -0,0 +1,265 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# (symbol, bid, ask, volume, timestamp da exchange em segundos) extraído de uma mensagem de stream
+Quote = Tuple[str, float, float, Optional[float], Optional[float]]
+
+class QuoteTable:
+    """
+    Tabela em memória com a última cotação de cada (exchange, par).
+
+    O formato de snapshot() é o mesmo de ArbitrageEngine.fetch_market_data,
+    então os detectores leem da tabela sem nenhuma adaptação.
+    """
+
+    def __init__(self):
+        self._quotes: Dict[str, Dict[str, dict]] = {}
+        self._updated: Optional[asyncio.Event] = None
+        self._changes: Set[Tuple[str, str]] = set()
+        self.version = 0
+
+    def update(self, exchange_id: str, symbol: str, bid: float, ask: float, volume: Optional[float] = None,
+               timestamp: Optional[float] = None, received: Optional[float] = None) -> None:
+        """
+        Registra a cotação mais recente de um par.
+        :param exchange_id: ID da exchange
+        :param symbol: Par no formato ccxt (ex: 'BTC/USDT')
+        :param bid: Melhor preço de compra
+        :param ask: Melhor preço de venda
+        :param volume: Volume base, se informado pelo canal
+        :param timestamp: Hora da cotação no relógio da exchange (s), se informada
+        :param received: Hora local do recebimento (s); agora se None
+        """
+        quotes = self._quotes.setdefault(exchange_id, {})
+        previous = quotes.get(symbol)
+        if volume is None and previous is not None:
+            volume = previous["volume"]
+        quotes[symbol] = {
+            "bid": bid, "ask": ask, "volume": volume,
+            "timestamp": timestamp, "received": time.time() if received is None else received,
+        }
+        self._changes.add((exchange_id, symbol))
+        self.version += 1
+        if self._updated is not None:
+            self._updated.set()
+
+    def drain_changes(self) -> Set[Tuple[str, str]]:
+        """Pares (exchange, par) atualizados desde a última chamada."""
+        changes, self._changes = self._changes, set()
+        return changes
+
+    def get(self, exchange_id: str, symbol: str) -> Optional[dict]:
+        """Retorna a última cotação de um par ou None."""
+        return self._quotes.get(exchange_id, {}).get(symbol)
+
+    def snapshot(self, exchanges: Optional[Iterable[str]] = None, pairs: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Copia as cotações atuais no formato exchange -> par -> dados de preço.
+        :param exchanges: Exchanges a incluir (todas se None)
+        :param pairs: Pares a incluir (todos se None)
+        :return: Dicionário de dados de mercado
+        """
+        exchanges = self._quotes.keys() if exchanges is None else exchanges
+        wanted = None if pairs is None else set(pairs)
+        market_data = {}
+        for exchange_id in exchanges:
+            quotes = self._quotes.get(exchange_id)
+            if not quotes:
+                continue
+            market_data[exchange_id] = {
+                symbol: dict(quote) for symbol, quote in quotes.items()
+                if wanted is None or symbol in wanted
+            }
+        return market_data
+
+    async def wait_for_update(self, timeout: float) -> bool:
+        """
+        Aguarda a próxima atualização da tabela.
+        :param timeout: Tempo máximo de espera em segundos
+        :return: True se houve atualização, False em caso de timeout
+        """
+        if self._updated is None:
+            self._updated = asyncio.Event()
+        self._updated.clear()
+        try:
+            await asyncio.wait_for(self._updated.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+class WebSocketFeed(ABC):
+    """
+    Stream de cotações de uma exchange via WebSocket.
+
+    Mantém a conexão aberta, reconecta com backoff exponencial e refaz as
+    assinaturas após cada reconexão. Subclasses definem a URL, as mensagens
+    de assinatura e o parser do canal.
+    """
+
+    exchange_id: str = ""
+    url: str = ""
+    # Se as cotações extraídas devem ir para o gravador (streams de livro gravam as atualizações)
+    records_quotes = True
+
+    def __init__(self, quote_table: QuoteTable, symbols: List[str], url: Optional[str] = None,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0, clock=None, recorder=None):
+        """
+        Inicializa o stream.
+        :param quote_table: Tabela que recebe as cotações
+        :param symbols: Pares no formato ccxt
+        :param url: URL do WebSocket (sobrescreve a padrão da exchange)
+        :param reconnect_delay: Espera inicial antes de reconectar, em segundos
+        :param max_reconnect_delay: Espera máxima entre reconexões, em segundos
+        :param clock: ClockTracker que recebe o atraso de cada cotação com timestamp
+        :param recorder: MarketDataRecorder que recebe cada cotação (opcional)
+        """
+        self.quote_table = quote_table
+        self.clock = clock
+        self.recorder = recorder
+        self.symbols = list(symbols)
+        self.url = url or self.url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connections = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    @abstractmethod
+    def subscribe_messages(self) -> List[dict]:
+        """Mensagens enviadas logo após cada conexão."""
+        pass
+
+    @abstractmethod
+    def parse(self, message: dict) -> Iterable[Quote]:
+        """Extrai as cotações de uma mensagem recebida."""
+        pass
+
+    def start(self) -> asyncio.Task:
+        """Inicia o stream em uma task de fundo."""
+        if self._task is None or self._task.done():
+            self._running = True
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Encerra o stream e aguarda a task terminar."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        """Laço de conexão, assinatura e leitura com reconexão automática."""
+        self._running = True
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    self.connections += 1
+                    for message in self.subscribe_messages():
+                        await ws.send(json.dumps(message))
+                    logger.info(f"Stream {self.exchange_id} conectado ({len(self.symbols)} pares)")
+                    delay = self.reconnect_delay
+                    async for raw in ws:
+                        self.handle(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Stream {self.exchange_id} desconectado: {str(e)}")
+            if not self._running:
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def handle(self, raw) -> None:
+        """Decodifica uma mensagem e atualiza a tabela de cotações."""
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Mensagem inválida do stream {self.exchange_id}")
+            return
+        received = time.time()
+        try:
+            for symbol, bid, ask, volume, timestamp in self.parse(message):
+                self.quote_table.update(self.exchange_id, symbol, bid, ask, volume, timestamp, received)
+                if self.clock is not None:
+                    self.clock.observe_quote(self.exchange_id, timestamp, received)
+                if self.recorder is not None and self.records_quotes:
+                    self.recorder.record_ticker(self.exchange_id, symbol, self.quote_table.get(self.exchange_id, symbol))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Mensagem malformada do stream {self.exchange_id}: {e!r}")
+
+class BinanceBookTickerFeed(WebSocketFeed):
+    """Canal <symbol>@bookTicker da Binance (melhor bid/ask em tempo real)."""
+
+    exchange_id = "binance"
+    url = "wss://stream.binance.com:9443/ws"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._symbols_by_id = {symbol.replace("/", "").upper(): symbol for symbol in self.symbols}
+
+    def subscribe_messages(self) -> List[dict]:
+        streams = [f"{symbol.replace('/', '').lower()}@bookTicker" for symbol in self.symbols]
+        return [{"method": "SUBSCRIBE", "params": streams, "id": 1}]
+
+    def parse(self, message: dict) -> Iterable[Quote]:
+        symbol = self._symbols_by_id.get(message.get("s", "")) if isinstance(message, dict) else None
+        if symbol is None:
+            return []
+        return [(symbol, float(message["b"]), float(message["a"]), None, None)]
+
+class KrakenTickerFeed(WebSocketFeed):
+    """Canal ticker da API WebSocket v2 da Kraken."""
+
+    exchange_id = "kraken"
+    url = "wss://ws.kraken.com/v2"
+
+    def subscribe_messages(self) -> List[dict]:
+        return [{"method": "subscribe", "params": {"channel": "ticker", "symbol": self.symbols}}]
+
+    def parse(self, message: dict) -> Iterable[Quote]:
+        if not isinstance(message, dict) or message.get("channel") != "ticker":
+            return []
+        return [
+            (item["symbol"], float(item["bid"]), float(item["ask"]), item.get("volume"), None)
+            for item in message.get("data", [])
+        ]
+
+FEEDS = {
+    "binance": BinanceBookTickerFeed,
+    "kraken": KrakenTickerFeed,
+}
+
+def create_feeds(quote_table: QuoteTable, exchanges: Iterable[str], pairs: List[str], clock=None,
+                 recorder=None, urls: Optional[Dict[str, str]] = None) -> List[WebSocketFeed]:
+    """
+    Cria os streams das exchanges suportadas.
+    :param quote_table: Tabela compartilhada de cotações
+    :param exchanges: IDs das exchanges desejadas
+    :param pairs: Pares no formato ccxt
+    :param clock: ClockTracker compartilhado (opcional)
+    :param recorder: MarketDataRecorder compartilhado (opcional)
+    :param urls: URL do WebSocket por exchange, sobrescrevendo as padrão
+    :return: Lista de streams (exchanges sem stream são ignoradas)
+    """
+    feeds = []
+    for exchange_id in exchanges:
+        feed_class = FEEDS.get(exchange_id)
+        if feed_class is None:
+            logger.warning(f"Stream não disponível para {exchange_id}, usando REST")
+            continue
+        feeds.append(feed_class(quote_table, pairs, url=(urls or {}).get(exchange_id), clock=clock, recorder=recorder))
+    return feeds
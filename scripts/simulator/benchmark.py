@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import logging
+
+from scripts.simulator.exchange import ExchangeSimulator
+
+logger = logging.getLogger(__name__)
+
+async def run_benchmark(duration: float = 10.0, streaming: bool = False, cycle_deadline: float = None,
+                        pairs=None, client_rate_limit: bool = False, **simulator_options) -> dict:
+    """
+    Mede a vazão de BotState.scan_opportunities contra o simulador local.
+    :param duration: Duração da medição em segundos
+    :param streaming: Usa os streams WebSocket em vez de polling REST
+    :param cycle_deadline: Prazo de cada varredura em segundos (sem prazo se None)
+    :param pairs: Pares varridos (os do simulador se None)
+    :param client_rate_limit: Mantém o throttling do ccxt (desligado para medir só o simulador e o scanner)
+    :param simulator_options: Argumentos repassados ao ExchangeSimulator
+    :return: Métricas da execução
+    """
+    from api.main import BotState
+
+    sim = ExchangeSimulator(port=simulator_options.pop("port", 0), **simulator_options)
+    await sim.start()
+    state = BotState()
+    state.mode = "simulation"
+    state.scan_interval = 0
+    state.pairs = list(pairs or sim.prices)
+    engine = state.engine
+    engine.cycle_deadline = cycle_deadline
+    engine.scheduler = None
+    engine.client_pool.markets_cache = None
+    engine.client_pool.options['enableRateLimit'] = client_rate_limit
+    exchanges = list(state.connectors)
+    for exchange_id in exchanges:
+        engine.client_pool.exchange_options[exchange_id] = sim.ccxt_options(exchange_id)
+        engine.feed_urls[exchange_id] = sim.ws_url(exchange_id)
+    try:
+        await engine.start(exchanges)
+        if streaming:
+            await engine.start_streaming(exchanges, state.pairs)
+        state.status = "running"
+        scan = asyncio.create_task(state.scan_opportunities())
+        await asyncio.sleep(duration)
+        state.status = "stopped"
+        await scan
+    finally:
+        await engine.close()
+        await sim.stop()
+
+    cycles = state.scan_cycles
+    return {
+        "cycles": cycles,
+        "cycles_per_second": cycles / duration,
+        "mean_cycle_ms": state.scan_time / cycles * 1000 if cycles else None,
+        "simulator": dict(sim.stats),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="Vazão do scanner contra o simulador local de exchanges")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--deadline", type=float, default=None, help="Prazo de cada varredura (s)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Atualizações de preço por segundo")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rps", type=float, default=None, help="Limite de requisições por segundo por exchange")
+    parser.add_argument("--client-rate-limit", action="store_true", help="Mantém o throttling do ccxt")
+    args = parser.parse_args()
+
+    result = await run_benchmark(
+        duration=args.duration, streaming=args.streaming, cycle_deadline=args.deadline, message_rate=args.rate,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        requests_per_second=args.rps, client_rate_limit=args.client_rate_limit,
+    )
+    logger.info(f"Resultado do benchmark: {result}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(main())
@@ -0,0 +1,543 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from aiohttp import WSMsgType, web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICES = {
+    "BTC/USDT": 50000.0,
+    "ETH/USDT": 3000.0,
+    "ETH/BTC": 0.06,
+}
+SUPPORTED_EXCHANGES = ("binance", "kraken")
+
+def market_id(symbol: str) -> str:
+    """ID do par nas APIs simuladas (ex: 'BTC/USDT' -> 'BTCUSDT')."""
+    return symbol.replace("/", "")
+
+def ccxt_options(exchange_id: str, base_url: str) -> dict:
+    """
+    Opções do construtor ccxt que apontam uma exchange para o simulador.
+    :param exchange_id: 'binance' ou 'kraken'
+    :param base_url: URL HTTP do simulador (ex: 'http://127.0.0.1:8900')
+    :return: Dicionário de opções ccxt
+    """
+    root = f"{base_url.rstrip('/')}/{exchange_id}"
+    if exchange_id == "binance":
+        return {
+            "urls": {"api": {"public": f"{root}/api/v3", "private": f"{root}/api/v3", "v1": f"{root}/api/v1",
+                             "sapi": f"{root}/sapi/v1"}},
+            "options": {"fetchMarkets": {"types": ["spot"]}},
+        }
+    if exchange_id == "kraken":
+        return {"urls": {"api": {"public": root, "private": root}}}
+    raise ValueError(f"Exchange não suportada pelo simulador: {exchange_id}")
+
+def ws_url(exchange_id: str, base_url: str) -> str:
+    """URL WebSocket do simulador para os streams de uma exchange."""
+    root = base_url.rstrip("/").replace("http://", "ws://", 1).replace("https://", "wss://", 1)
+    return f"{root}/{exchange_id}/ws" if exchange_id == "binance" else f"{root}/{exchange_id}/v2"
+
+class SyntheticBook:
+    """
+    Livro L2 sintético de um par em uma exchange.
+
+    A cada passo o livro é regenerado em torno do novo preço médio e a
+    diferença para o livro anterior (níveis alterados e removidos com
+    quantidade zero) é devolvida como atualização incremental.
+    """
+
+    def __init__(self, symbol: str, depth: int, spread: float, rng: random.Random):
+        """
+        Inicializa o livro vazio.
+        :param symbol: Par no formato ccxt
+        :param depth: Níveis por lado
+        :param spread: Spread relativo entre o melhor bid e o melhor ask
+        :param rng: Gerador aleatório compartilhado
+        """
+        self.symbol = symbol
+        self.depth = depth
+        self.spread = spread
+        self.rng = rng
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.update_id = 0
+        self.volume = 0.0
+        self.timestamp = time.time()
+
+    @property
+    def best_bid(self) -> Tuple[float, float]:
+        price = max(self.bids)
+        return price, self.bids[price]
+
+    @property
+    def best_ask(self) -> Tuple[float, float]:
+        price = min(self.asks)
+        return price, self.asks[price]
+
+    def top(self, side: Dict[float, float], reverse: bool, limit: Optional[int] = None) -> List[Tuple[float, float]]:
+        return sorted(side.items(), reverse=reverse)[:limit]
+
+    def step(self, mid: float) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
+        """
+        Regenera o livro em torno de um novo preço médio.
+        :param mid: Preço médio desta exchange
+        :return: (bids alterados, asks alterados) com quantidade zero para níveis removidos
+        """
+        tick = mid * 0.0001
+        half = mid * self.spread / 2
+        bids = {round(mid - half - i * tick, 8): round(self.rng.uniform(0.05, 5.0), 6) for i in range(self.depth)}
+        asks = {round(mid + half + i * tick, 8): round(self.rng.uniform(0.05, 5.0), 6) for i in range(self.depth)}
+        bid_diff = _diff(self.bids, bids)
+        ask_diff = _diff(self.asks, asks)
+        self.bids, self.asks = bids, asks
+        self.update_id += 1
+        self.volume += self.rng.uniform(0.0, 2.0)
+        self.timestamp = time.time()
+        return bid_diff, ask_diff
+
+class ExchangeSimulator:
+    """
+    Servidor local que imita as APIs REST e WebSocket da Binance e da Kraken.
+
+    Os preços seguem um passeio aleatório comum por par, com ruído e
+    deslocamento próprios de cada exchange para produzir spreads entre elas.
+    Latência, erros 5xx e respostas 429 podem ser injetados nas rotas REST
+    para exercitar o scanner sem acesso à rede.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8900, exchanges: Iterable[str] = SUPPORTED_EXCHANGES,
+                 prices: Optional[Dict[str, float]] = None, message_rate: float = 10.0, depth: int = 20,
+                 spread: float = 0.0005, volatility: float = 0.0005, dispersion: float = 0.001,
+                 price_offsets: Optional[Dict[str, float]] = None, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 requests_per_second: Optional[float] = None, seed: Optional[int] = None):
+        """
+        Inicializa o simulador.
+        :param host: Endereço de escuta
+        :param port: Porta de escuta (0 escolhe uma porta livre)
+        :param exchanges: Exchanges simuladas ('binance', 'kraken')
+        :param prices: Preço inicial de cada par no formato ccxt
+        :param message_rate: Atualizações de preço por segundo (e mensagens por assinatura)
+        :param depth: Níveis por lado em cada livro
+        :param spread: Spread relativo dentro de cada exchange
+        :param volatility: Desvio padrão relativo do preço médio por atualização
+        :param dispersion: Desvio padrão relativo do ruído de cada exchange em torno do preço médio
+        :param price_offsets: Deslocamento relativo fixo do preço de cada exchange
+        :param latency: Atraso fixo das respostas REST, em segundos
+        :param jitter: Atraso adicional aleatório (uniforme até este valor), em segundos
+        :param error_rate: Fração das requisições REST respondidas com 503
+        :param rate_limit_rate: Fração das requisições REST respondidas com 429
+        :param requests_per_second: Limite de requisições REST por exchange (429 acima dele; sem limite se None)
+        :param seed: Semente do gerador aleatório
+        """
+        self.host = host
+        self.port = port
+        self.exchanges = [ex for ex in exchanges if ex in SUPPORTED_EXCHANGES]
+        self.prices = dict(prices or DEFAULT_PRICES)
+        self.message_rate = message_rate
+        self.depth = depth
+        self.volatility = volatility
+        self.dispersion = dispersion
+        self.price_offsets = price_offsets or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_second = requests_per_second
+        self.rng = random.Random(seed)
+        self.books: Dict[Tuple[str, str], SyntheticBook] = {
+            (exchange_id, symbol): SyntheticBook(symbol, depth, spread, self.rng)
+            for exchange_id in self.exchanges for symbol in self.prices
+        }
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "messages": 0}
+        self._mids = dict(self.prices)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._binance_clients: Dict[web.WebSocketResponse, Set[str]] = {}
+        self._kraken_clients: Dict[web.WebSocketResponse, Set[str]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self.step()
+
+    @property
+    def url(self) -> str:
+        """URL HTTP base do simulador."""
+        return f"http://{self.host}:{self.port}"
+
+    def ccxt_options(self, exchange_id: str) -> dict:
+        return ccxt_options(exchange_id, self.url)
+
+    def ws_url(self, exchange_id: str) -> str:
+        return ws_url(exchange_id, self.url)
+
+    def app(self) -> web.Application:
+        """Cria a aplicação aiohttp com as rotas das exchanges simuladas."""
+        app = web.Application(middlewares=[self._faults])
+        routes = []
+        if "binance" in self.exchanges:
+            routes += [
+                web.get("/binance/api/v3/ping", self.binance_ping),
+                web.get("/binance/api/v3/time", self.binance_time),
+                web.get("/binance/api/v3/exchangeInfo", self.binance_exchange_info),
+                web.get("/binance/api/v3/ticker/24hr", self.binance_ticker_24hr),
+                web.get("/binance/api/v3/ticker/bookTicker", self.binance_book_ticker),
+                web.get("/binance/api/v3/depth", self.binance_depth),
+                web.get("/binance/ws", self.binance_ws),
+            ]
+        if "kraken" in self.exchanges:
+            routes += [
+                web.get("/kraken/0/public/Time", self.kraken_time),
+                web.get("/kraken/0/public/Assets", self.kraken_assets),
+                web.get("/kraken/0/public/AssetPairs", self.kraken_asset_pairs),
+                web.get("/kraken/0/public/Ticker", self.kraken_ticker),
+                web.get("/kraken/0/public/Depth", self.kraken_depth),
+                web.get("/kraken/v2", self.kraken_ws),
+            ]
+        app.add_routes(routes)
+        return app
+
+    async def start(self) -> None:
+        """Inicia o servidor HTTP/WebSocket e a geração de preços."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.create_task(self._run())
+        logger.info(f"Simulador de exchanges ouvindo em {self.url} ({', '.join(self.exchanges)})")
+
+    async def stop(self) -> None:
+        """Encerra a geração de preços, as conexões WebSocket e o servidor."""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+        for ws in list(self._binance_clients) + list(self._kraken_clients):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def step(self) -> Dict[Tuple[str, str], Tuple[list, list]]:
+        """
+        Avança os preços de todos os pares em todas as exchanges.
+        :return: Dicionário (exchange, par) -> (bids alterados, asks alterados)
+        """
+        for symbol, mid in self._mids.items():
+            self._mids[symbol] = mid * (1 + self.rng.gauss(0, self.volatility))
+        diffs = {}
+        for (exchange_id, symbol), book in self.books.items():
+            offset = self.price_offsets.get(exchange_id, 0.0) + self.rng.gauss(0, self.dispersion)
+            diffs[(exchange_id, symbol)] = book.step(self._mids[symbol] * (1 + offset))
+        return diffs
+
+    async def _run(self) -> None:
+        interval = 1.0 / self.message_rate
+        while True:
+            await asyncio.sleep(interval)
+            diffs = self.step()
+            await self._publish(diffs)
+
+    async def _publish(self, diffs: Dict[Tuple[str, str], Tuple[list, list]]) -> None:
+        sends = []
+        for ws, streams in list(self._binance_clients.items()):
+            for (exchange_id, symbol), (bids, asks) in diffs.items():
+                if exchange_id != "binance":
+                    continue
+                stream = market_id(symbol).lower()
+                book = self.books[(exchange_id, symbol)]
+                if f"{stream}@bookTicker" in streams:
+                    sends.append(self._send(ws, self.binance_book_ticker_message(book)))
+                if f"{stream}@depth@100ms" in streams or f"{stream}@depth" in streams:
+                    sends.append(self._send(ws, {
+                        "e": "depthUpdate", "E": int(book.timestamp * 1000), "s": market_id(symbol),
+                        "U": book.update_id, "u": book.update_id,
+                        "b": [[str(p), str(q)] for p, q in bids], "a": [[str(p), str(q)] for p, q in asks],
+                    }))
+        for ws, symbols in list(self._kraken_clients.items()):
+            data = [self.kraken_ws_ticker(self.books[("kraken", symbol)]) for symbol in symbols
+                    if ("kraken", symbol) in diffs]
+            if data:
+                sends.append(self._send(ws, {"channel": "ticker", "type": "update", "data": data}))
+        if sends:
+            await asyncio.gather(*sends)
+
+    async def _send(self, ws: web.WebSocketResponse, message: dict) -> None:
+        try:
+            await ws.send_str(json.dumps(message))
+            self.stats["messages"] += 1
+        except (ConnectionResetError, RuntimeError):
+            self._binance_clients.pop(ws, None)
+            self._kraken_clients.pop(ws, None)
+
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return await handler(request)
+        self.stats["requests"] += 1
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        exchange_id = request.path.split("/")[1]
+        if self._over_limit(exchange_id) or self.rng.random() < self.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            if exchange_id == "kraken":
+                return web.json_response({"error": ["EAPI:Rate limit exceeded"]}, status=429)
+            return web.json_response({"code": -1003, "msg": "Too many requests."}, status=429,
+                                     headers={"Retry-After": "1"})
+        if self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+        return await handler(request)
+
+    def _over_limit(self, exchange_id: str) -> bool:
+        if self.requests_per_second is None:
+            return False
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(exchange_id, (self.requests_per_second, now))
+        tokens = min(self.requests_per_second, tokens + (now - updated) * self.requests_per_second)
+        if tokens < 1:
+            self._buckets[exchange_id] = (tokens, now)
+            return True
+        self._buckets[exchange_id] = (tokens - 1, now)
+        return False
+
+    def _symbols(self, exchange_id: str, ids: Optional[Iterable[str]] = None) -> List[str]:
+        by_id = {market_id(symbol): symbol for symbol in self.prices}
+        if ids is None:
+            return list(self.prices)
+        return [by_id[i] for i in ids if i in by_id]
+
+    # Binance
+
+    async def binance_ping(self, request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def binance_time(self, request: web.Request) -> web.Response:
+        return web.json_response({"serverTime": int(time.time() * 1000)})
+
+    async def binance_exchange_info(self, request: web.Request) -> web.Response:
+        symbols = []
+        for symbol in self.prices:
+            base, quote = symbol.split("/")
+            symbols.append({
+                "symbol": market_id(symbol), "status": "TRADING", "baseAsset": base, "baseAssetPrecision": 8,
+                "quoteAsset": quote, "quotePrecision": 8, "quoteAssetPrecision": 8,
+                "orderTypes": ["LIMIT", "MARKET"], "isSpotTradingAllowed": True, "isMarginTradingAllowed": False,
+                "permissions": ["SPOT"], "permissionSets": [["SPOT"]],
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": "0.00000001", "maxPrice": "1000000.00000000",
+                     "tickSize": "0.00000001"},
+                    {"filterType": "LOT_SIZE", "minQty": "0.00001000", "maxQty": "9000.00000000",
+                     "stepSize": "0.00001000"},
+                ],
+            })
+        return web.json_response({"timezone": "UTC", "serverTime": int(time.time() * 1000), "rateLimits": [],
+                                  "exchangeFilters": [], "symbols": symbols})
+
+    async def binance_ticker_24hr(self, request: web.Request) -> web.Response:
+        if "symbol" in request.query:
+            symbols = self._symbols("binance", [request.query["symbol"]])
+            if not symbols:
+                return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+            return web.json_response(self.binance_ticker(self.books[("binance", symbols[0])]))
+        ids = json.loads(request.query["symbols"]) if "symbols" in request.query else None
+        return web.json_response([self.binance_ticker(self.books[("binance", s)]) for s in self._symbols("binance", ids)])
+
+    async def binance_book_ticker(self, request: web.Request) -> web.Response:
+        if "symbol" in request.query:
+            symbols = self._symbols("binance", [request.query["symbol"]])
+            if not symbols:
+                return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+            return web.json_response(self.binance_rest_book_ticker(self.books[("binance", symbols[0])]))
+        ids = json.loads(request.query["symbols"]) if "symbols" in request.query else None
+        return web.json_response([
+            self.binance_rest_book_ticker(self.books[("binance", s)]) for s in self._symbols("binance", ids)
+        ])
+
+    async def binance_depth(self, request: web.Request) -> web.Response:
+        symbols = self._symbols("binance", [request.query.get("symbol", "")])
+        if not symbols:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        book = self.books[("binance", symbols[0])]
+        limit = int(request.query.get("limit", 100))
+        return web.json_response({
+            "lastUpdateId": book.update_id,
+            "bids": [[str(p), str(q)] for p, q in book.top(book.bids, True, limit)],
+            "asks": [[str(p), str(q)] for p, q in book.top(book.asks, False, limit)],
+        })
+
+    async def binance_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        streams = self._binance_clients[ws] = set()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                if message.get("method") == "SUBSCRIBE":
+                    streams.update(message.get("params", []))
+                elif message.get("method") == "UNSUBSCRIBE":
+                    streams.difference_update(message.get("params", []))
+                await ws.send_str(json.dumps({"result": None, "id": message.get("id")}))
+        finally:
+            self._binance_clients.pop(ws, None)
+        return ws
+
+    def binance_ticker(self, book: SyntheticBook) -> dict:
+        (bid, bid_qty), (ask, ask_qty) = book.best_bid, book.best_ask
+        last = (bid + ask) / 2
+        now = int(book.timestamp * 1000)
+        return {
+            "symbol": market_id(book.symbol), "priceChange": "0", "priceChangePercent": "0",
+            "weightedAvgPrice": str(last), "prevClosePrice": str(last), "lastPrice": str(last), "lastQty": "0",
+            "bidPrice": str(bid), "bidQty": str(bid_qty), "askPrice": str(ask), "askQty": str(ask_qty),
+            "openPrice": str(last), "highPrice": str(last), "lowPrice": str(last), "volume": str(book.volume),
+            "quoteVolume": str(book.volume * last), "openTime": now - 86400000, "closeTime": now,
+            "firstId": 0, "lastId": book.update_id, "count": book.update_id,
+        }
+
+    def binance_rest_book_ticker(self, book: SyntheticBook) -> dict:
+        (bid, bid_qty), (ask, ask_qty) = book.best_bid, book.best_ask
+        return {"symbol": market_id(book.symbol), "bidPrice": str(bid), "bidQty": str(bid_qty),
+                "askPrice": str(ask), "askQty": str(ask_qty)}
+
+    def binance_book_ticker_message(self, book: SyntheticBook) -> dict:
+        (bid, bid_qty), (ask, ask_qty) = book.best_bid, book.best_ask
+        return {"u": book.update_id, "s": market_id(book.symbol), "b": str(bid), "B": str(bid_qty),
+                "a": str(ask), "A": str(ask_qty)}
+
+    # Kraken
+
+    async def kraken_time(self, request: web.Request) -> web.Response:
+        now = time.time()
+        return web.json_response({"error": [], "result": {"unixtime": int(now), "rfc1123": time.strftime(
+            "%a, %d %b %y %H:%M:%S +0000", time.gmtime(now))}})
+
+    async def kraken_assets(self, request: web.Request) -> web.Response:
+        assets = {}
+        for symbol in self.prices:
+            for code in symbol.split("/"):
+                assets[code] = {"aclass": "currency", "altname": code, "decimals": 10, "display_decimals": 5,
+                                "status": "enabled"}
+        return web.json_response({"error": [], "result": assets})
+
+    async def kraken_asset_pairs(self, request: web.Request) -> web.Response:
+        pairs = {}
+        for symbol in self.prices:
+            base, quote = symbol.split("/")
+            pairs[market_id(symbol)] = {
+                "altname": market_id(symbol), "wsname": symbol, "aclass_base": "currency", "base": base,
+                "aclass_quote": "currency", "quote": quote, "lot": "unit", "cost_decimals": 5, "pair_decimals": 8,
+                "lot_decimals": 8, "lot_multiplier": 1, "leverage_buy": [], "leverage_sell": [],
+                "fees": [[0, 0.26]], "fees_maker": [[0, 0.16]], "fee_volume_currency": "ZUSD", "margin_call": 80,
+                "margin_stop": 40, "ordermin": "0.0001", "costmin": "0.5", "tick_size": "0.00000001",
+                "status": "online",
+            }
+        return web.json_response({"error": [], "result": pairs})
+
+    async def kraken_ticker(self, request: web.Request) -> web.Response:
+        ids = request.query["pair"].split(",") if "pair" in request.query else None
+        symbols = self._symbols("kraken", ids)
+        if not symbols:
+            return web.json_response({"error": ["EQuery:Unknown asset pair"]})
+        return web.json_response({"error": [], "result": {
+            market_id(symbol): self.kraken_rest_ticker(self.books[("kraken", symbol)]) for symbol in symbols
+        }})
+
+    async def kraken_depth(self, request: web.Request) -> web.Response:
+        symbols = self._symbols("kraken", [request.query.get("pair", "")])
+        if not symbols:
+            return web.json_response({"error": ["EQuery:Unknown asset pair"]})
+        book = self.books[("kraken", symbols[0])]
+        limit = int(request.query.get("count", 100))
+        ts = int(book.timestamp)
+        return web.json_response({"error": [], "result": {market_id(symbols[0]): {
+            "bids": [[str(p), str(q), ts] for p, q in book.top(book.bids, True, limit)],
+            "asks": [[str(p), str(q), ts] for p, q in book.top(book.asks, False, limit)],
+        }}})
+
+    async def kraken_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        symbols = self._kraken_clients[ws] = set()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                params = message.get("params", {})
+                if params.get("channel") != "ticker":
+                    continue
+                requested = [s for s in params.get("symbol", []) if s in self.prices]
+                if message.get("method") == "subscribe":
+                    symbols.update(requested)
+                elif message.get("method") == "unsubscribe":
+                    symbols.difference_update(requested)
+                for symbol in requested:
+                    await ws.send_str(json.dumps({"method": message["method"], "success": True,
+                                                  "result": {"channel": "ticker", "symbol": symbol}}))
+        finally:
+            self._kraken_clients.pop(ws, None)
+        return ws
+
+    def kraken_rest_ticker(self, book: SyntheticBook) -> dict:
+        (bid, bid_qty), (ask, ask_qty) = book.best_bid, book.best_ask
+        last = str((bid + ask) / 2)
+        volume = str(book.volume)
+        return {
+            "a": [str(ask), "1", str(ask_qty)], "b": [str(bid), "1", str(bid_qty)], "c": [last, "0"],
+            "v": [volume, volume], "p": [last, last], "t": [book.update_id, book.update_id],
+            "l": [last, last], "h": [last, last], "o": last,
+        }
+
+    def kraken_ws_ticker(self, book: SyntheticBook) -> dict:
+        (bid, bid_qty), (ask, ask_qty) = book.best_bid, book.best_ask
+        last = (bid + ask) / 2
+        return {"symbol": book.symbol, "bid": bid, "bid_qty": bid_qty, "ask": ask, "ask_qty": ask_qty,
+                "last": last, "volume": book.volume, "vwap": last, "low": last, "high": last,
+                "change": 0.0, "change_pct": 0.0}
+
+def _diff(old: Dict[float, float], new: Dict[float, float]) -> List[Tuple[float, float]]:
+    changes = [(price, size) for price, size in new.items() if old.get(price) != size]
+    changes.extend((price, 0.0) for price in old if price not in new)
+    return changes
+
+async def main():
+    parser = argparse.ArgumentParser(description="Simulador local das APIs da Binance e da Kraken")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--rate", type=float, default=10.0, help="Atualizações de preço por segundo")
+    parser.add_argument("--depth", type=int, default=20, help="Níveis por lado do livro")
+    parser.add_argument("--latency", type=float, default=0.0, help="Atraso das respostas REST (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Atraso aleatório adicional (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--rps", type=float, default=None, help="Limite de requisições por segundo por exchange")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    simulator = ExchangeSimulator(
+        host=args.host, port=args.port, message_rate=args.rate, depth=args.depth, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        requests_per_second=args.rps, seed=args.seed,
+    )
+    await simulator.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(main())
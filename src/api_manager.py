@@ -3,10 +3,18 @@ Módulo de gerenciamento de APIs para exchanges.
 """
 from typing import Dict, List, Optional, Any
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+import asyncio
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+import logging
 import os
+import time
 from dataclasses import dataclass
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class PriceData:
     """Dados de preço de uma exchange."""
@@ -15,20 +23,30 @@ class PriceData:
     volume: float
     timestamp: int
     exchange: str
+    bid: Optional[float] = None
+    ask: Optional[float] = None
 
 class ExchangeAPI(ABC):
     """Classe abstrata para APIs de exchanges."""
     
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 timeout: float = 5.0, pool_size: int = 10):
         """
         Inicializa a API da exchange.
         
         Args:
             api_key: Chave da API (carregada de variável de ambiente se não fornecida)
             api_secret: Segredo da API (carregado de variável de ambiente se não fornecido)
+            timeout: Tempo máximo de cada requisição HTTP em segundos
+            pool_size: Número de conexões keep-alive mantidas pela sessão
         """
         self.api_key = api_key or os.getenv(f'{self.__class__.__name__.upper()}_API_KEY')
         self.api_secret = api_secret or os.getenv(f'{self.__class__.__name__.upper()}_API_SECRET')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
     @abstractmethod
     def get_price(self, symbol: str) -> Optional[PriceData]:
@@ -55,6 +73,19 @@ class ExchangeAPI(ABC):
             Dados do livro de ordens
         """
         pass
+    
+    def get_all_prices(self) -> Dict[str, PriceData]:
+        """
+        Obtém os preços de todos os símbolos em uma única requisição.
+        
+        Returns:
+            Dicionário símbolo -> dados de preço (vazio se a exchange não oferece consulta em lote)
+        """
+        return {}
+    
+    def close(self) -> None:
+        """Fecha as conexões mantidas pela sessão HTTP."""
+        self.session.close()
 
 class BinanceAPI(ExchangeAPI):
     """Implementação da API da Binance."""
@@ -64,37 +95,76 @@ class BinanceAPI(ExchangeAPI):
     def get_price(self, symbol: str) -> Optional[PriceData]:
         """Implementação específica para Binance."""
         try:
-            response = requests.get(f"{self.BASE_URL}/ticker/price", params={"symbol": symbol})
+            response = self.session.get(f"{self.BASE_URL}/ticker/price", params={"symbol": symbol}, timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
-            
-            return PriceData(
-                symbol=data['symbol'],
-                price=float(data['price']),
-                volume=0.0,  # Seria obtido de outra endpoint
-                timestamp=0,  # Seria obtido de outra endpoint
-                exchange='binance'
-            )
+            return self.parse_price(response.json())
         except Exception as e:
-            print(f"Erro ao obter preço da Binance: {e}")
+            logger.error(f"Erro ao obter preço da Binance: {e}")
             return None
     
     def get_orderbook(self, symbol: str) -> Dict[str, Any]:
         """Implementação específica para Binance."""
         try:
-            response = requests.get(f"{self.BASE_URL}/depth", params={"symbol": symbol})
+            response = self.session.get(f"{self.BASE_URL}/depth", params={"symbol": symbol}, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            print(f"Erro ao obter orderbook da Binance: {e}")
+            logger.error(f"Erro ao obter orderbook da Binance: {e}")
             return {}
+    
+    def get_all_prices(self) -> Dict[str, PriceData]:
+        """Melhor bid/ask de todos os símbolos via /ticker/bookTicker sem o parâmetro symbol."""
+        try:
+            response = self.session.get(f"{self.BASE_URL}/ticker/bookTicker", timeout=self.timeout)
+            response.raise_for_status()
+            return self.parse_book_tickers(response.json())
+        except Exception as e:
+            logger.error(f"Erro ao obter preços da Binance: {e}")
+            return {}
+    
+    @staticmethod
+    def parse_price(data: Dict[str, Any]) -> PriceData:
+        """Converte a resposta de /ticker/price em PriceData."""
+        return PriceData(
+            symbol=data['symbol'],
+            price=float(data['price']),
+            volume=0.0,  # Seria obtido de outra endpoint
+            timestamp=int(time.time() * 1000),  # Hora local de recebimento (ms); a API não informa
+            exchange='binance'
+        )
+    
+    @staticmethod
+    def parse_book_tickers(items: List[Dict[str, Any]]) -> Dict[str, PriceData]:
+        """Converte a resposta de /ticker/bookTicker (todos os símbolos) em PriceData por símbolo."""
+        prices = {}
+        for item in items:
+            bid, ask = float(item['bidPrice']), float(item['askPrice'])
+            prices[item['symbol']] = PriceData(
+                symbol=item['symbol'],
+                price=(bid + ask) / 2,
+                volume=0.0,  # Seria obtido de outra endpoint
+                timestamp=int(time.time() * 1000),  # Hora local de recebimento (ms); a API não informa
+                exchange='binance',
+                bid=bid,
+                ask=ask
+            )
+        return prices
 
 class APIManager:
     """Gerenciador de múltiplas APIs de exchanges."""
     
-    def __init__(self):
-        """Inicializa o gerenciador de APIs."""
+    def __init__(self, max_workers: int = 8, timeout: float = 5.0):
+        """
+        Inicializa o gerenciador de APIs.
+        
+        Args:
+            max_workers: Número de threads usadas para consultar as exchanges em paralelo
+            timeout: Tempo máximo de espera por todas as exchanges em segundos
+        """
         self.exchanges: Dict[str, ExchangeAPI] = {}
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-manager")
     
     def add_exchange(self, name: str, api: ExchangeAPI) -> None:
         """
@@ -106,18 +176,314 @@ class APIManager:
         """
         self.exchanges[name] = api
     
-    def get_prices(self, symbol: str) -> Dict[str, Optional[PriceData]]:
+    def get_prices(self, symbol: str, timeout: Optional[float] = None) -> Dict[str, Optional[PriceData]]:
         """
-        Obtém preços de todas as exchanges configuradas.
+        Obtém preços de todas as exchanges configuradas em paralelo.
+        
+        Exchanges que falham ou não respondem dentro do prazo ficam com None,
+        sem atrasar as demais.
         
         Args:
             symbol: Símbolo da criptomoeda
+            timeout: Prazo em segundos (usa o padrão do gerenciador se None)
             
         Returns:
             Dicionário com preços de cada exchange
         """
+        return self._gather(lambda api: api.get_price(symbol), None, timeout)
+    
+    def get_all_prices(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, PriceData]]:
+        """
+        Obtém a tabela completa de preços de cada exchange com uma requisição por exchange.
+        
+        Args:
+            timeout: Prazo em segundos (usa o padrão do gerenciador se None)
+            
+        Returns:
+            Dicionário exchange -> símbolo -> dados de preço
+        """
+        return self._gather(lambda api: api.get_all_prices(), {}, timeout)
+    
+    def close(self) -> None:
+        """Encerra o pool de threads e as sessões HTTP das exchanges."""
+        self._executor.shutdown(wait=False)
+        for api in self.exchanges.values():
+            api.close()
+    
+    def _gather(self, call, default, timeout: Optional[float]) -> Dict[str, Any]:
+        """Executa a chamada em todas as exchanges e coleta o que ficou pronto no prazo."""
+        futures = {name: self._executor.submit(call, api) for name, api in self.exchanges.items()}
+        wait(futures.values(), timeout=self.timeout if timeout is None else timeout)
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                self.logger.warning(f"Exchange {name} não respondeu dentro do prazo")
+                results[name] = default
+            elif future.exception() is not None:
+                self.logger.error(f"Erro ao consultar {name}: {future.exception()}")
+                results[name] = default
+            else:
+                results[name] = future.result()
+        return results
+
+class AsyncHTTPClient:
+    """
+    Cliente HTTP assíncrono compartilhado, com pool de conexões keep-alive.
+    
+    O aiohttp não faz pipelining HTTP/1.1; o paralelismo por host é limitado
+    pelo número de conexões simultâneas (limit_per_host), que é o que conta
+    para os limites de conexão das exchanges.
+    """
+    
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, keepalive_timeout: float = 30.0,
+                 timeout: float = 5.0):
+        """
+        Inicializa o cliente (a sessão é criada na primeira requisição).
+        
+        Args:
+            limit: Número máximo de conexões abertas no total
+            limit_per_host: Número máximo de conexões simultâneas por host
+            keepalive_timeout: Tempo em segundos que uma conexão ociosa fica aberta
+            timeout: Tempo máximo padrão de cada requisição em segundos
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def session(self) -> aiohttp.ClientSession:
+        """Retorna a sessão compartilhada, criando-a se necessário."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+    
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """
+        Faz um GET e decodifica a resposta JSON.
+        
+        Args:
+            url: URL completa
+            params: Parâmetros de query string
+            timeout: Tempo máximo em segundos (usa o padrão do cliente se None)
+            
+        Returns:
+            Corpo da resposta decodificado
+        """
+        request_timeout = None if timeout is None else aiohttp.ClientTimeout(total=timeout)
+        async with self.session().get(url, params=params, timeout=request_timeout) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    async def close(self) -> None:
+        """Fecha a sessão e todas as conexões do pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+class AsyncExchangeAPI(ABC):
+    """Classe abstrata para APIs assíncronas de exchanges."""
+    
+    def __init__(self, http_client: Optional[AsyncHTTPClient] = None):
+        """
+        Inicializa a API da exchange.
+        
+        Args:
+            http_client: Cliente HTTP compartilhado (um cliente próprio é criado se omitido)
+        """
+        self._owns_client = http_client is None
+        self.http_client = http_client or AsyncHTTPClient()
+    
+    @abstractmethod
+    async def get_price(self, symbol: str) -> Optional[PriceData]:
+        """
+        Obtém o preço atual de um símbolo.
+        
+        Args:
+            symbol: Símbolo da criptomoeda
+            
+        Returns:
+            Dados de preço ou None se não encontrado
+        """
+        pass
+    
+    @abstractmethod
+    async def get_orderbook(self, symbol: str) -> Dict[str, Any]:
+        """
+        Obtém o livro de ordens de um símbolo.
+        
+        Args:
+            symbol: Símbolo da criptomoeda
+            
+        Returns:
+            Dados do livro de ordens
+        """
+        pass
+    
+    async def get_all_prices(self) -> Dict[str, PriceData]:
+        """
+        Obtém os preços de todos os símbolos em uma única requisição.
+        
+        Returns:
+            Dicionário símbolo -> dados de preço (vazio se a exchange não oferece consulta em lote)
+        """
+        return {}
+    
+    async def close(self) -> None:
+        """Fecha o cliente HTTP se ele pertencer a esta instância."""
+        if self._owns_client:
+            await self.http_client.close()
+
+class AsyncBinanceAPI(AsyncExchangeAPI):
+    """Implementação assíncrona da API da Binance."""
+    
+    BASE_URL = BinanceAPI.BASE_URL
+    
+    def __init__(self, http_client: Optional[AsyncHTTPClient] = None, base_url: Optional[str] = None):
+        """
+        Inicializa a API da Binance.
+        
+        Args:
+            http_client: Cliente HTTP compartilhado
+            base_url: URL base da API (sobrescreve a padrão)
+        """
+        super().__init__(http_client)
+        self.base_url = base_url or self.BASE_URL
+    
+    async def get_price(self, symbol: str) -> Optional[PriceData]:
+        """Implementação específica para Binance."""
+        try:
+            data = await self.http_client.get_json(f"{self.base_url}/ticker/price", params={"symbol": symbol})
+            return BinanceAPI.parse_price(data)
+        except Exception as e:
+            logger.error(f"Erro ao obter preço da Binance: {e}")
+            return None
+    
+    async def get_orderbook(self, symbol: str) -> Dict[str, Any]:
+        """Implementação específica para Binance."""
+        try:
+            return await self.http_client.get_json(f"{self.base_url}/depth", params={"symbol": symbol})
+        except Exception as e:
+            logger.error(f"Erro ao obter orderbook da Binance: {e}")
+            return {}
+    
+    async def get_all_prices(self) -> Dict[str, PriceData]:
+        """Melhor bid/ask de todos os símbolos via /ticker/bookTicker sem o parâmetro symbol."""
+        try:
+            return BinanceAPI.parse_book_tickers(await self.http_client.get_json(f"{self.base_url}/ticker/bookTicker"))
+        except Exception as e:
+            logger.error(f"Erro ao obter preços da Binance: {e}")
+            return {}
+
+class SyncExchangeAdapter(AsyncExchangeAPI):
+    """Expõe um ExchangeAPI síncrono como AsyncExchangeAPI, rodando as chamadas fora do event loop."""
+    
+    def __init__(self, api: ExchangeAPI, executor: Optional[Executor] = None):
+        """
+        Inicializa o adaptador.
+        
+        Args:
+            api: Implementação síncrona a adaptar
+            executor: Executor das chamadas bloqueantes (o executor padrão do loop se None)
+        """
+        self.api = api
+        self.executor = executor
+        self._owns_client = False
+    
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+    
+    async def get_price(self, symbol: str) -> Optional[PriceData]:
+        return await self._run(self.api.get_price, symbol)
+    
+    async def get_orderbook(self, symbol: str) -> Dict[str, Any]:
+        return await self._run(self.api.get_orderbook, symbol)
+    
+    async def get_all_prices(self) -> Dict[str, PriceData]:
+        return await self._run(self.api.get_all_prices)
+    
+    async def close(self) -> None:
+        await self._run(self.api.close)
+
+class AsyncAPIManager:
+    """Gerenciador assíncrono de múltiplas APIs de exchanges."""
+    
+    def __init__(self, timeout: float = 5.0):
+        """
+        Inicializa o gerenciador.
+        
+        Args:
+            timeout: Tempo máximo de espera por cada exchange em segundos
+        """
+        self.exchanges: Dict[str, AsyncExchangeAPI] = {}
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+    
+    def add_exchange(self, name: str, api) -> None:
+        """
+        Adiciona uma exchange ao gerenciador.
+        
+        Args:
+            name: Nome da exchange
+            api: AsyncExchangeAPI ou ExchangeAPI síncrono (adaptado automaticamente)
+        """
+        if isinstance(api, ExchangeAPI):
+            api = SyncExchangeAdapter(api)
+        self.exchanges[name] = api
+    
+    async def get_prices(self, symbol: str, timeout: Optional[float] = None) -> Dict[str, Optional[PriceData]]:
+        """
+        Obtém preços de todas as exchanges concorrentemente.
+        
+        Args:
+            symbol: Símbolo da criptomoeda
+            timeout: Prazo em segundos por exchange (usa o padrão do gerenciador se None)
+            
+        Returns:
+            Dicionário com preços de cada exchange (None para falhas e atrasos)
+        """
+        return await self._gather(lambda api: api.get_price(symbol), None, timeout)
+    
+    async def get_all_prices(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, PriceData]]:
+        """
+        Obtém a tabela completa de preços de cada exchange.
+        
+        Args:
+            timeout: Prazo em segundos por exchange (usa o padrão do gerenciador se None)
+            
+        Returns:
+            Dicionário exchange -> símbolo -> dados de preço
+        """
+        return await self._gather(lambda api: api.get_all_prices(), {}, timeout)
+    
+    async def close(self) -> None:
+        """Fecha todas as APIs registradas."""
+        for api in self.exchanges.values():
+            await api.close()
+    
+    async def _gather(self, call, default, timeout: Optional[float]) -> Dict[str, Any]:
+        timeout = self.timeout if timeout is None else timeout
+        names = list(self.exchanges)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(call(self.exchanges[name]), timeout) for name in names),
+            return_exceptions=True
+        )
         prices = {}
-        for name, api in self.exchanges.items():
-            prices[name] = api.get_price(symbol)
+        for name, result in zip(names, results):
+            if isinstance(result, asyncio.TimeoutError):
+                self.logger.warning(f"Exchange {name} não respondeu dentro do prazo")
+                result = default
+            elif isinstance(result, Exception):
+                self.logger.error(f"Erro ao consultar {name}: {result}")
+                result = default
+            prices[name] = result
         return prices
-
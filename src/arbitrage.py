@@ -5,6 +5,7 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from decimal import Decimal
 import logging
+from core.fixedpoint import MarketPrecision, decimal_places, fee_ppm, from_units, net_profit, to_units
 
 @dataclass
 class ArbitrageOpportunity:
@@ -57,8 +58,42 @@ class ArbitrageEngine:
         Returns:
             Percentual de lucro
         """
-        if buy_price <= 0:
+        decimals = max(decimal_places(buy_price), decimal_places(sell_price))
+        buy_units = to_units(buy_price, decimals)
+        sell_units = to_units(sell_price, decimals)
+        if buy_units <= 0:
             return Decimal('0')
         
-        return ((sell_price - buy_price) / buy_price) * 100
+        # Diferença em inteiros escalados; só a divisão final é feita em Decimal
+        return Decimal((sell_units - buy_units) * 100) / buy_units
+    
+    def calculate_net_profit(self, buy_price: Decimal, sell_price: Decimal, volume: Decimal,
+                             buy_fee: Decimal = Decimal('0'), sell_fee: Decimal = Decimal('0'),
+                             precision: Optional[MarketPrecision] = None) -> Decimal:
+        """
+        Calcula o lucro líquido exato de comprar e vender um volume.
+        
+        Os valores são convertidos para inteiros na precisão do mercado e as
+        taxas são arredondadas para cima na menor unidade, como cobradas pela
+        exchange.
+        
+        Args:
+            buy_price: Preço de compra
+            sell_price: Preço de venda
+            volume: Quantidade negociada
+            buy_fee: Taxa percentual da compra
+            sell_fee: Taxa percentual da venda
+            precision: Casas decimais de preço e quantidade do mercado (as dos próprios valores se None)
+            
+        Returns:
+            Lucro líquido na moeda de cotação
+        """
+        if precision is None:
+            precision = MarketPrecision(max(decimal_places(buy_price), decimal_places(sell_price)),
+                                        decimal_places(volume))
+        units = net_profit(
+            to_units(buy_price, precision.price), to_units(sell_price, precision.price),
+            to_units(volume, precision.amount), fee_ppm(buy_fee), fee_ppm(sell_fee),
+        )
+        return from_units(units, precision.notional)
 
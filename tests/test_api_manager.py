@@ -1,9 +1,15 @@
 """
 Testes unitários para o módulo de gerenciamento de APIs.
 """
+import asyncio
+import threading
+import time
 import unittest
-from unittest.mock import Mock, patch
-from src.api_manager import APIManager, BinanceAPI, PriceData
+from unittest.mock import AsyncMock, Mock, patch
+from aiohttp import web
+from src.api_manager import (
+    APIManager, BinanceAPI, PriceData, AsyncAPIManager, AsyncBinanceAPI, AsyncHTTPClient, SyncExchangeAdapter
+)
 
 class TestAPIManager(unittest.TestCase):
     """Testes para a classe APIManager."""
@@ -51,7 +57,7 @@ class TestBinanceAPI(unittest.TestCase):
         """Configuração inicial para os testes."""
         self.api = BinanceAPI()
     
-    @patch('src.api_manager.requests.get')
+    @patch('src.api_manager.requests.Session.get')
     def test_get_price_success(self, mock_get):
         """Testa obtenção de preço com sucesso."""
         # Configurar mock da resposta
@@ -71,7 +77,7 @@ class TestBinanceAPI(unittest.TestCase):
         self.assertEqual(price_data.price, 50000.0)
         self.assertEqual(price_data.exchange, 'binance')
     
-    @patch('src.api_manager.requests.get')
+    @patch('src.api_manager.requests.Session.get')
     def test_get_price_failure(self, mock_get):
         """Testa falha na obtenção de preço."""
         # Configurar mock para lançar exceção
@@ -82,6 +88,152 @@ class TestBinanceAPI(unittest.TestCase):
         
         self.assertIsNone(price_data)
 
+class TestAPIManagerConcurrency(unittest.TestCase):
+    """Testes para a consulta paralela de preços."""
+    
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.api_manager = APIManager(timeout=0.2)
+        self.release = threading.Event()
+    
+    def tearDown(self):
+        """Libera as threads bloqueadas e encerra o gerenciador."""
+        self.release.set()
+        self.api_manager.close()
+    
+    def test_slow_exchange_returns_partial_results(self):
+        """Testa que uma exchange lenta não bloqueia as demais."""
+        fast_api = Mock()
+        fast_api.get_price.return_value = PriceData('BTC/USDT', 50000.0, 1.0, 0, 'fast')
+        slow_api = Mock()
+        slow_api.get_price.side_effect = lambda symbol: self.release.wait(5)
+        
+        self.api_manager.add_exchange('fast', fast_api)
+        self.api_manager.add_exchange('slow', slow_api)
+        
+        start = time.monotonic()
+        prices = self.api_manager.get_prices('BTC/USDT')
+        
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(prices['fast'].price, 50000.0)
+        self.assertIsNone(prices['slow'])
+    
+    def test_failing_exchange_returns_none(self):
+        """Testa que uma exceção em uma exchange vira None."""
+        failing_api = Mock()
+        failing_api.get_price.side_effect = Exception("API Error")
+        self.api_manager.add_exchange('failing', failing_api)
+        
+        prices = self.api_manager.get_prices('BTC/USDT')
+        
+        self.assertIsNone(prices['failing'])
+
+class TestBinanceAPIBulk(unittest.TestCase):
+    """Testes para a consulta em lote da Binance."""
+    
+    @patch('src.api_manager.requests.Session.get')
+    def test_get_all_prices(self, mock_get):
+        """Testa que o bookTicker sem símbolo preenche toda a tabela de preços."""
+        mock_response = Mock()
+        mock_response.json.return_value = [
+            {'symbol': 'BTCUSDT', 'bidPrice': '49999.00', 'bidQty': '1', 'askPrice': '50001.00', 'askQty': '1'},
+            {'symbol': 'ETHUSDT', 'bidPrice': '2999.00', 'bidQty': '1', 'askPrice': '3001.00', 'askQty': '1'},
+        ]
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        prices = BinanceAPI().get_all_prices()
+        
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertNotIn('symbol', mock_get.call_args.kwargs.get('params') or {})
+        self.assertEqual(prices['BTCUSDT'].price, 50000.0)
+        self.assertEqual(prices['ETHUSDT'].ask, 3001.0)
+
+class TestAsyncBinanceAPI(unittest.IsolatedAsyncioTestCase):
+    """Testes da API assíncrona contra um servidor HTTP local."""
+    
+    async def asyncSetUp(self):
+        """Sobe um servidor local que imita a API da Binance."""
+        self.peers = set()
+        
+        async def price(request):
+            self.peers.add(request.transport.get_extra_info('peername'))
+            return web.json_response({'symbol': request.query['symbol'], 'price': '50000.00'})
+        
+        async def book_ticker(request):
+            return web.json_response([
+                {'symbol': 'BTCUSDT', 'bidPrice': '49999.00', 'bidQty': '1', 'askPrice': '50001.00', 'askQty': '1'}
+            ])
+        
+        app = web.Application()
+        app.router.add_get('/api/v3/ticker/price', price)
+        app.router.add_get('/api/v3/ticker/bookTicker', book_ticker)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.client = AsyncHTTPClient()
+        self.api = AsyncBinanceAPI(self.client, base_url=f"http://127.0.0.1:{port}/api/v3")
+    
+    async def asyncTearDown(self):
+        """Fecha o cliente e o servidor."""
+        await self.client.close()
+        await self.runner.cleanup()
+    
+    async def test_get_price_reuses_connection(self):
+        """Testa que consultas seguidas usam a mesma conexão keep-alive."""
+        first = await self.api.get_price('BTCUSDT')
+        second = await self.api.get_price('ETHUSDT')
+        
+        self.assertEqual(first.price, 50000.0)
+        self.assertEqual(second.symbol, 'ETHUSDT')
+        self.assertEqual(len(self.peers), 1)
+    
+    async def test_get_all_prices(self):
+        """Testa a consulta em lote assíncrona."""
+        prices = await self.api.get_all_prices()
+        
+        self.assertEqual(prices['BTCUSDT'].bid, 49999.0)
+
+class TestAsyncAPIManager(unittest.IsolatedAsyncioTestCase):
+    """Testes para a classe AsyncAPIManager."""
+    
+    async def test_sync_api_runs_off_loop(self):
+        """Testa que implementações síncronas rodam fora do event loop."""
+        loop_thread = threading.get_ident()
+        calls = []
+        sync_api = Mock(spec=BinanceAPI)
+        sync_api.get_price.side_effect = lambda symbol: calls.append(threading.get_ident()) or \
+            PriceData(symbol, 1.0, 0.0, 0, 'sync')
+        manager = AsyncAPIManager()
+        manager.add_exchange('sync', sync_api)
+        
+        prices = await manager.get_prices('BTCUSDT')
+        
+        self.assertIsInstance(manager.exchanges['sync'], SyncExchangeAdapter)
+        self.assertEqual(prices['sync'].price, 1.0)
+        self.assertNotEqual(calls[0], loop_thread)
+    
+    async def test_timeout_returns_partial_results(self):
+        """Testa que uma exchange lenta vira None sem atrasar as demais."""
+        fast_api = Mock()
+        fast_api.get_price = AsyncMock(return_value=PriceData('BTCUSDT', 2.0, 0.0, 0, 'fast'))
+        slow_api = Mock()
+        
+        async def slow_price(symbol):
+            await asyncio.sleep(5)
+        
+        slow_api.get_price = slow_price
+        manager = AsyncAPIManager(timeout=0.05)
+        manager.add_exchange('fast', fast_api)
+        manager.add_exchange('slow', slow_api)
+        
+        prices = await manager.get_prices('BTCUSDT')
+        
+        self.assertEqual(prices['fast'].price, 2.0)
+        self.assertIsNone(prices['slow'])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -42,6 +42,15 @@ class TestArbitrageEngine(unittest.TestCase):
         
         self.assertEqual(profit, Decimal('0.0'))
     
+    def test_calculate_net_profit(self):
+        """Testa o lucro líquido exato com taxas arredondadas para cima na precisão do mercado."""
+        profit = self.engine.calculate_net_profit(
+            Decimal('50000.01'), Decimal('50500.10'), Decimal('0.123'), Decimal('0.1'), Decimal('0.26')
+        )
+        # Em 10**-5: custo 6150.00123 + taxa 6.15000123 -> 6.15001; receita 6211.51230 - taxa 16.1499320 -> 16.14994
+        self.assertEqual(profit, Decimal('6211.51230') - Decimal('16.14994') - Decimal('6150.00123')
+                         - Decimal('6.15001'))
+    
     def test_find_opportunities_empty_list(self):
         """Testa busca de oportunidades retornando lista vazia."""
         opportunities = self.engine.find_opportunities('BTC/USDT')
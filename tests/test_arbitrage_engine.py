@@ -0,0 +1,142 @@
+"""
+Testes unitários para o motor de arbitragem dos scripts.
+"""
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from scripts.arbitrage_engine import ArbitrageEngine, FETCH_BULK_TICKERS, FETCH_BULK_BIDS_ASKS, FETCH_PER_PAIR
+
+def make_exchange(has=None, markets=None):
+    """Cria uma exchange ccxt simulada."""
+    exchange = MagicMock()
+    exchange.has = has or {}
+    exchange.markets = markets or {}
+    exchange.fetch_ticker = AsyncMock(side_effect=lambda pair: {"bid": 1.0, "ask": 2.0, "baseVolume": 3.0})
+    exchange.fetch_tickers = AsyncMock(side_effect=lambda symbols: {
+        s: {"bid": 1.0, "ask": 2.0, "baseVolume": 3.0} for s in symbols
+    })
+    exchange.fetch_bids_asks = AsyncMock(side_effect=lambda symbols: {
+        s: {"bid": 1.0, "ask": 2.0} for s in symbols
+    })
+    return exchange
+
+class TestFetchExchangeTickers(unittest.IsolatedAsyncioTestCase):
+    """Testes para as estratégias de busca de tickers."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine()
+        self.pairs = ['BTC/USDT', 'ETH/USDT']
+
+    async def test_bulk_tickers_used_when_supported(self):
+        """Testa que fetch_tickers é usado em uma única chamada."""
+        exchange = make_exchange(has={'fetchTickers': True})
+
+        data, strategy = await self.engine.fetch_exchange_tickers(exchange, 'binance', self.pairs)
+
+        self.assertEqual(strategy, FETCH_BULK_TICKERS)
+        self.assertEqual(set(data), set(self.pairs))
+        exchange.fetch_tickers.assert_awaited_once()
+        exchange.fetch_ticker.assert_not_awaited()
+
+    async def test_bids_asks_used_when_tickers_fail(self):
+        """Testa o uso do book ticker em lote quando fetch_tickers falha."""
+        exchange = make_exchange(has={'fetchTickers': True, 'fetchBidsAsks': True})
+        exchange.fetch_tickers.side_effect = Exception("not supported")
+
+        data, strategy = await self.engine.fetch_exchange_tickers(exchange, 'binance', self.pairs)
+
+        self.assertEqual(strategy, FETCH_BULK_BIDS_ASKS)
+        self.assertIsNone(data['BTC/USDT']['volume'])
+
+    async def test_per_pair_fallback(self):
+        """Testa a busca concorrente par a par sem endpoints em lote."""
+        exchange = make_exchange()
+
+        data, strategy = await self.engine.fetch_exchange_tickers(exchange, 'kraken', self.pairs)
+
+        self.assertEqual(strategy, FETCH_PER_PAIR)
+        self.assertEqual(exchange.fetch_ticker.await_count, 2)
+        self.assertEqual(data['ETH/USDT']['bid'], 1.0)
+        self.assertEqual(data['ETH/USDT']['volume'], 3.0)
+        self.assertIsNotNone(data['ETH/USDT']['received'])
+
+    async def test_unlisted_pairs_are_skipped(self):
+        """Testa que pares não listados não são requisitados."""
+        exchange = make_exchange(has={'fetchTickers': True}, markets={'BTC/USDT': {}})
+
+        data, _ = await self.engine.fetch_exchange_tickers(exchange, 'binance', self.pairs)
+
+        exchange.fetch_tickers.assert_awaited_once_with(['BTC/USDT'])
+        self.assertNotIn('ETH/USDT', data)
+
+class TestCycleDeadline(unittest.IsolatedAsyncioTestCase):
+    """Testes para os ciclos de varredura com prazo."""
+
+    async def asyncSetUp(self):
+        """Configura uma exchange rápida e outra lenta."""
+        self.release = asyncio.Event()
+        fast, slow = make_exchange(has={'fetchTickers': True}), make_exchange(has={'fetchTickers': True})
+
+        async def slow_tickers(symbols):
+            await self.release.wait()
+            return {s: {"bid": 5.0, "ask": 6.0, "baseVolume": 1.0} for s in symbols}
+
+        slow.fetch_tickers = AsyncMock(side_effect=slow_tickers)
+        clients = {'binance': fast, 'kraken': slow}
+        self.engine = ArbitrageEngine(cycle_deadline=0.05)
+        self.engine.client_pool.get = AsyncMock(side_effect=lambda exchange_id: clients[exchange_id])
+
+    async def asyncTearDown(self):
+        """Cancela as requisições pendentes."""
+        await self.engine.close()
+
+    async def test_deadline_returns_partial_snapshot(self):
+        """Testa que a exchange lenta fica de fora e é registrada como ausente."""
+        market_data = await self.engine.fetch_market_data(['binance', 'kraken'], ['BTC/USDT'])
+
+        self.assertIn('binance', market_data)
+        self.assertNotIn('kraken', market_data)
+        self.assertEqual(market_data.missing, ['kraken'])
+
+    async def test_late_response_folds_into_next_cycle(self):
+        """Testa que a resposta atrasada entra no ciclo seguinte marcada como antiga."""
+        await self.engine.fetch_market_data(['binance', 'kraken'], ['BTC/USDT'])
+        self.release.set()
+        await asyncio.sleep(0.01)
+
+        market_data = await self.engine.fetch_market_data(['binance', 'kraken'], ['BTC/USDT'])
+
+        self.assertEqual(market_data['kraken']['BTC/USDT']['bid'], 5.0)
+        self.assertIn('kraken', market_data.stale)
+        self.assertNotIn('binance', market_data.stale)
+        self.assertEqual(market_data.missing, [])
+
+    async def test_concurrent_calls_for_different_pairs(self):
+        """Testa que chamadas simultâneas com pares diferentes não compartilham a mesma requisição."""
+        self.release.set()
+        first, second = await asyncio.gather(
+            self.engine.fetch_market_data(['binance', 'kraken'], ['BTC/USDT']),
+            self.engine.fetch_market_data(['binance', 'kraken'], ['ETH/USDT']),
+        )
+
+        for market_data, pair in ((first, 'BTC/USDT'), (second, 'ETH/USDT')):
+            self.assertEqual(market_data.missing, [])
+            self.assertEqual(list(market_data['binance']), [pair])
+            self.assertEqual(list(market_data['kraken']), [pair])
+        self.assertEqual(self.engine._inflight, {})
+
+    async def test_pending_fetch_covering_the_request_is_reused(self):
+        """Testa que uma requisição pendente com mais pares atende um pedido contido nela."""
+        await self.engine.fetch_market_data(['kraken'], ['BTC/USDT', 'ETH/USDT'])
+        self.release.set()
+        await asyncio.sleep(0.01)
+
+        market_data = await self.engine.fetch_market_data(['kraken'], ['ETH/USDT'])
+
+        self.assertEqual(list(market_data['kraken']), ['ETH/USDT'])
+        self.assertIn('kraken', market_data.stale)
+        self.engine.client_pool.get.assert_awaited_once_with('kraken')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Testes unitários para o rastreamento de relógio e a rejeição de cotações antigas.
+"""
+import time
+import unittest
+from scripts.feeds.clock import ClockTracker
+from scripts.arbitrage_engine import ArbitrageEngine
+
+class TestClockTracker(unittest.TestCase):
+    """Testes para a classe ClockTracker."""
+
+    def test_round_trip_offset(self):
+        """Testa a estimativa de desvio e latência a partir de uma ida e volta."""
+        clock = ClockTracker()
+
+        clock.observe_round_trip("binance", sent=100.0, server_time=102.1, received=100.2)
+
+        self.assertAlmostEqual(clock.offsets["binance"], 2.0)
+        self.assertAlmostEqual(clock.latency("binance"), 0.1)
+        self.assertAlmostEqual(clock.to_local("binance", 105.0), 103.0)
+
+    def test_quote_delay_gives_latency(self):
+        """Testa que o atraso aparente das cotações corrige a latência pelo desvio."""
+        clock = ClockTracker()
+        clock.observe_round_trip("kraken", sent=0.0, server_time=-0.5, received=0.0)
+
+        clock.observe_quote("kraken", exchange_timestamp=10.0, received=10.8)
+
+        self.assertAlmostEqual(clock.latency("kraken"), 0.3)
+
+    def test_needs_sync(self):
+        """Testa o intervalo entre sincronizações."""
+        clock = ClockTracker(sync_interval=60)
+        self.assertTrue(clock.needs_sync("binance", now=1000.0))
+
+        clock.observe_round_trip("binance", 999.0, 999.0, 999.0)
+
+        self.assertFalse(clock.needs_sync("binance", now=1000.0))
+
+class TestStaleQuoteRejection(unittest.TestCase):
+    """Testes para o descarte de cotações antigas ou distantes no tempo."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.1, max_quote_age=5, max_quote_skew=1)
+        self.now = time.time()
+
+    def market_data(self, buy_time, sell_time):
+        return {
+            "binance": {"BTC/USDT": {"bid": 99.0, "ask": 100.0, "volume": 1.0, "timestamp": buy_time}},
+            "kraken": {"BTC/USDT": {"bid": 105.0, "ask": 106.0, "volume": 1.0, "timestamp": sell_time}},
+        }
+
+    def test_fresh_quotes_are_compared(self):
+        """Testa que cotações recentes e simultâneas geram oportunidade."""
+        opportunities = self.engine.detect_simple_arbitrage(self.market_data(self.now, self.now))
+
+        self.assertEqual(len(opportunities), 1)
+
+    def test_old_quote_is_skipped(self):
+        """Testa que uma cotação mais antiga que max_quote_age é descartada."""
+        opportunities = self.engine.detect_simple_arbitrage(self.market_data(self.now - 30, self.now))
+
+        self.assertEqual(opportunities, [])
+
+    def test_skewed_quotes_are_skipped(self):
+        """Testa que cotações tiradas em instantes distantes não são comparadas."""
+        opportunities = self.engine.detect_simple_arbitrage(self.market_data(self.now - 3, self.now))
+
+        self.assertEqual(opportunities, [])
+
+    def test_quotes_without_time_are_kept(self):
+        """Testa que cotações sem horário continuam sendo comparadas."""
+        opportunities = self.engine.detect_simple_arbitrage(self.market_data(None, None))
+
+        self.assertEqual(len(opportunities), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Testes unitários para o detector de ciclos negativos (arbitragem multi-perna).
+"""
+import itertools
+import random
+import unittest
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.graph import CurrencyGraph
+from scripts.detection.cycles import NegativeCycleDetector
+
+FEE = 0.001
+
+def ring(codes, mispricing=1.0):
+    """Mercados em anel (A/B, B/C, ..., Z/A) em que cada moeda vale o dobro da seguinte, exceto no fechamento."""
+    data = {}
+    for base, quote in zip(codes, codes[1:]):
+        data[f"{base}/{quote}"] = {"bid": 2.0 * 0.9999, "ask": 2.0 * 1.0001}
+    closing = 2.0 ** -(len(codes) - 1) * mispricing
+    data[f"{codes[-1]}/{codes[0]}"] = {"bid": closing * 0.9999, "ask": closing * 1.0001}
+    return data
+
+def canonical(codes):
+    """Rotação de um ciclo que começa pela menor moeda em ordem alfabética."""
+    start = codes.index(min(codes))
+    return codes[start:] + codes[:start]
+
+def cycle_profit(data, codes):
+    """Lucro percentual de percorrer as moedas na ordem dada."""
+    value = 1.0
+    for a, b in zip(codes, codes[1:] + codes[:1]):
+        value *= data[f"{a}/{b}"]["bid"] if f"{a}/{b}" in data else 1 / data[f"{b}/{a}"]["ask"]
+    return (value * (1 - FEE) ** len(codes) - 1) * 100
+
+class TestNegativeCycleDetector(unittest.TestCase):
+    """Testes para a classe NegativeCycleDetector."""
+
+    def detect(self, data, **kwargs):
+        """Roda o detector sobre as cotações de uma exchange."""
+        graph = CurrencyGraph()
+        graph.sync(data)
+        detector = NegativeCycleDetector(graph, **kwargs)
+        cycles = detector.find(graph.conversion_rates(data), FEE, 0.0)
+        return graph, detector, [([graph.currencies[c] for c in cycle], profit) for cycle, _, profit in cycles]
+
+    def test_finds_four_leg_cycle(self):
+        """Testa um ciclo de 4 pernas que não contém nenhum triângulo."""
+        codes = ["A", "B", "C", "D"]
+        data = ring(codes, mispricing=1.02)
+
+        _, _, cycles = self.detect(data)
+
+        self.assertEqual(len(cycles), 1)
+        currencies, profit = cycles[0]
+        self.assertEqual(canonical(currencies), codes)
+        self.assertAlmostEqual(profit, cycle_profit(data, codes))
+
+    def test_respects_max_length(self):
+        """Testa que ciclos com mais pernas que max_length não são reportados."""
+        data = ring(["A", "B", "C", "D", "E", "F"], mispricing=1.05)
+
+        self.assertEqual(self.detect(data, max_length=5)[2], [])
+        self.assertEqual(len(self.detect(data, max_length=6)[2]), 1)
+
+    def test_prunes_dangling_currencies(self):
+        """Testa que moedas com um único vizinho são descartadas antes da busca."""
+        data = ring(["A", "B", "C"], mispricing=1.02)
+        data["X/A"] = {"bid": 1.0, "ask": 1.001}
+        data["Y/X"] = {"bid": 1.0, "ask": 1.001}
+        graph = CurrencyGraph()
+        graph.sync(data)
+        detector = NegativeCycleDetector(graph)
+        sources, _, directed = graph.edge_arrays()
+
+        alive = detector.prune(graph.conversion_rates(data)[directed] > 0)
+
+        self.assertEqual({graph.currencies[c] for c in alive.nonzero()[0]}, {"A", "B", "C"})
+
+    def test_reported_cycles_match_brute_force(self):
+        """Testa que os ciclos reportados são lucrativos e incluem o melhor ciclo do universo."""
+        rng = random.Random(3)
+        codes = [f"C{i}" for i in range(8)]
+        price = {code: rng.uniform(0.5, 50) for code in codes}
+        data = {}
+        for base, quote in itertools.combinations(codes, 2):
+            if rng.random() < 0.6:
+                p = price[base] / price[quote] * rng.uniform(0.99, 1.01)
+                data[f"{base}/{quote}"] = {"bid": p * 0.9995, "ask": p * 1.0005}
+        listed = {tuple(sorted(symbol.split("/"))) for symbol in data}
+        best = max(
+            (cycle_profit(data, list(path)), list(path))
+            for length in range(3, 6)
+            for path in itertools.permutations(codes, length)
+            if all(tuple(sorted(leg)) in listed for leg in zip(path, path[1:] + path[:1]))
+        )
+
+        _, _, cycles = self.detect(data, max_cycles=50)
+
+        self.assertGreater(best[0], 0)
+        for currencies, profit in cycles:
+            self.assertAlmostEqual(profit, cycle_profit(data, currencies))
+        self.assertAlmostEqual(cycles[0][1], best[0])
+
+    def test_caps_cycles_and_time(self):
+        """Testa o limite de ciclos reportados e o limite de tempo."""
+        data = {}
+        for i in range(6):
+            data.update(ring([f"A{i}", f"B{i}", f"C{i}"], mispricing=1.02 + i / 100))
+
+        _, _, cycles = self.detect(data, max_cycles=2)
+        _, detector, timed = self.detect(data, time_budget=0.0)
+
+        self.assertEqual(len(cycles), 2)
+        self.assertEqual(canonical(cycles[0][0]), ["A5", "B5", "C5"])
+        self.assertEqual(canonical(cycles[1][0]), ["A4", "B4", "C4"])
+        self.assertTrue(detector.timed_out)
+        self.assertEqual(timed, [])
+
+class TestMultiLegDetection(unittest.TestCase):
+    """Testes para detect_multi_leg_arbitrage."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.0)
+
+    def test_shares_graph_with_triangular_detector(self):
+        """Testa que os dois detectores usam o mesmo grafo e concordam sobre o triângulo."""
+        market_data = {"binance": {
+            "BTC/USDT": {"bid": 50000.0, "ask": 50010.0},
+            "ETH/USDT": {"bid": 3000.0, "ask": 3001.0},
+            "ETH/BTC": {"bid": 0.0605, "ask": 0.06051},
+        }}
+
+        triangular = self.engine.detect_triangular_arbitrage(market_data, "binance")
+        multi_leg = self.engine.detect_multi_leg_arbitrage(market_data, "binance")
+
+        self.assertIs(self.engine.triangle_indexes["binance"].graph, self.engine.cycle_detectors["binance"].graph)
+        self.assertEqual(len(multi_leg), 1)
+        self.assertEqual(multi_leg[0]["type"], "multi_leg")
+        self.assertEqual(canonical(multi_leg[0]["pair"].split("/")), ["BTC", "USDT", "ETH"])
+        self.assertAlmostEqual(multi_leg[0]["profitPercentage"], triangular[0]["profitPercentage"])
+        self.assertEqual(self.engine.detect_multi_leg_arbitrage(market_data, "binance", min_length=4), [])
+
+    def test_opportunity_steps(self):
+        """Testa as pernas de uma oportunidade de 4 pernas."""
+        data = ring(["A", "B", "C", "D"], mispricing=1.02)
+
+        opportunities = self.engine.detect_multi_leg_arbitrage({"binance": data}, "binance")
+
+        self.assertEqual(len(opportunities), 1)
+        currencies = opportunities[0]["pair"].split("/")
+        steps = opportunities[0]["steps"]
+        self.assertEqual(canonical(currencies), ["A", "B", "C", "D"])
+        # Cada perna vende a moeda atual pela seguinte no anel
+        for currency, step in zip(currencies, steps):
+            self.assertEqual(step["pair"].split("/")[0], currency)
+            self.assertEqual(step["rate"], data[step["pair"]]["bid"])
+
+if __name__ == '__main__':
+    unittest.main()
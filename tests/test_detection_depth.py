@@ -0,0 +1,126 @@
+"""
+Testes unitários para o dimensionamento de oportunidades pela profundidade dos livros.
+"""
+import asyncio
+import random
+import unittest
+import numpy as np
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.depth import DepthCurve, optimal_size
+from scripts.execution.engine import ExecutionEngine
+
+ASKS = [(100.0, 1.0), (100.5, 2.0), (101.0, 5.0)]
+BIDS = [(101.5, 0.5), (101.0, 1.5), (100.2, 4.0)]
+
+def curve(levels):
+    """DepthCurve a partir de níveis (preço, quantidade)."""
+    return DepthCurve([price for price, _ in levels], [size for _, size in levels])
+
+def walk(levels, size):
+    """Valor de executar size nível a nível, sem arrays."""
+    total = 0.0
+    for price, available in levels:
+        take = min(size, available)
+        total += take * price
+        size -= take
+    return total
+
+class TestDepthCurve(unittest.TestCase):
+    """Testes para a classe DepthCurve."""
+
+    def test_notional_matches_level_walk(self):
+        """Testa o valor executado para tamanhos dentro e nas quebras de nível."""
+        asks = curve(ASKS)
+        sizes = np.array([0.0, 0.4, 1.0, 2.5, 3.0, 8.0])
+
+        self.assertEqual(asks.depth, 8.0)
+        np.testing.assert_allclose(asks.notional(sizes), [walk(ASKS, s) for s in sizes])
+
+class TestOptimalSize(unittest.TestCase):
+    """Testes para a função optimal_size."""
+
+    def test_maximizes_absolute_profit(self):
+        """Testa que o tamanho escolhido supera qualquer outro tamanho em uma grade fina."""
+        rng = random.Random(5)
+        for _ in range(20):
+            asks = sorted((100 + rng.uniform(0, 2), rng.uniform(0.1, 3)) for _ in range(8))
+            bids = sorted(((100.5 + rng.uniform(0, 2), rng.uniform(0.1, 3)) for _ in range(8)), reverse=True)
+
+            sizing = optimal_size(curve(asks), curve(bids), 0.001, 0.002)
+
+            limit = min(sum(s for _, s in asks), sum(s for _, s in bids))
+            grid = np.linspace(0, limit, 2001)
+            profits = [walk(bids, q) * 0.998 - walk(asks, q) * 1.001 for q in grid]
+            if max(profits) <= 0:
+                self.assertIsNone(sizing)
+                continue
+            self.assertGreaterEqual(sizing["estimated_profit"] + 1e-9, max(profits))
+            self.assertAlmostEqual(
+                sizing["estimated_profit"],
+                walk(bids, sizing["max_size"]) * 0.998 - walk(asks, sizing["max_size"]) * 1.001,
+            )
+
+    def test_vwap_and_slippage(self):
+        """Testa os preços médios, o deslizamento e o limite de tamanho."""
+        sizing = optimal_size(curve(ASKS), curve(BIDS), 0.0, 0.0)
+        capped = optimal_size(curve(ASKS), curve(BIDS), 0.0, 0.0, max_size=0.5)
+
+        # Até 2 unidades o bid marginal (101.0) ainda supera o ask marginal (100.5)
+        self.assertAlmostEqual(sizing["max_size"], 2.0)
+        self.assertAlmostEqual(sizing["buy_vwap"], walk(ASKS, 2.0) / 2.0)
+        self.assertAlmostEqual(sizing["sell_vwap"], walk(BIDS, 2.0) / 2.0)
+        self.assertAlmostEqual(
+            sizing["slippage_percentage"], ((sizing["buy_vwap"] / 100.0 - 1) + (1 - sizing["sell_vwap"] / 101.5)) * 100
+        )
+        self.assertAlmostEqual(capped["max_size"], 0.5)
+        self.assertAlmostEqual(capped["slippage_percentage"], 0.0)
+
+    def test_unprofitable_books(self):
+        """Testa que livros sem cruzamento após as taxas não geram tamanho."""
+        self.assertIsNone(optimal_size(curve(ASKS), curve(BIDS), 0.01, 0.01))
+        self.assertIsNone(optimal_size(curve(ASKS), curve([]), 0.0, 0.0))
+
+class TestDepthAwareDetection(unittest.TestCase):
+    """Testes para o dimensionamento em detect_simple_arbitrage."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.1)
+        self.engine.order_books.apply_snapshot("binance", "BTC/USDT", [(99.5, 1.0)], ASKS, 1)
+        self.engine.order_books.apply_snapshot("kraken", "BTC/USDT", BIDS, [(102.0, 1.0)], 1)
+        self.market_data = {
+            "binance": {"BTC/USDT": {"bid": 99.5, "ask": 100.0}},
+            "kraken": {"BTC/USDT": {"bid": 101.5, "ask": 102.0}},
+        }
+
+    def test_opportunity_is_sized(self):
+        """Testa os campos de profundidade anexados à oportunidade."""
+        opportunity = self.engine.detect_simple_arbitrage(self.market_data)[0]
+
+        sizing = optimal_size(curve(ASKS), curve(BIDS), 0.001, 0.0026)
+        for attribute, value in sizing.items():
+            self.assertAlmostEqual(getattr(opportunity, attribute), value)
+
+    def test_curves_follow_book_updates(self):
+        """Testa que a curva em cache é refeita quando o livro muda."""
+        first = self.engine.depth_curve("binance", "BTC/USDT", "asks")
+        self.assertIs(self.engine.depth_curve("binance", "BTC/USDT", "asks"), first)
+
+        book = self.engine.order_books.get("binance", "BTC/USDT")
+        book.apply_diff([], [(100.0, 0)], 2, 2)
+
+        self.assertEqual(self.engine.depth_curve("binance", "BTC/USDT", "asks").best, 100.5)
+        self.assertIsNone(self.engine.depth_curve("okx", "BTC/USDT", "asks"))
+
+    def test_execution_uses_max_size(self):
+        """Testa que o motor de execução usa a quantidade dimensionada."""
+        opportunity = self.engine.detect_simple_arbitrage(self.market_data)[0]
+        execution = ExecutionEngine({"binance": object(), "kraken": object()})
+
+        with self.assertLogs("scripts.execution.engine", level="INFO") as logs:
+            self.assertTrue(asyncio.run(execution.execute_trade(opportunity)))
+
+        self.assertIn(f"Comprar {opportunity.max_size} em binance", logs.output[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Testes unitários para a reavaliação incremental de oportunidades.
+"""
+import random
+import time
+import unittest
+from unittest.mock import patch
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.incremental import LiveOpportunities
+from scripts.detection.opportunity import SimpleOpportunity
+from scripts.feeds.stream import QuoteTable
+
+PRICES = {"BTC/USDT": 50000.0, "ETH/USDT": 3000.0, "ETH/BTC": 0.06, "SOL/USDT": 150.0, "SOL/BTC": 0.003}
+
+def quote(price, spread=0.0002, received=None):
+    """Cotação com bid/ask em torno de um preço."""
+    return {"bid": price * (1 - spread), "ask": price * (1 + spread), "volume": 1.0,
+            "timestamp": None, "received": time.time() if received is None else received}
+
+def full_detection(engine, market_data):
+    """Oportunidades de uma varredura completa, indexadas como no conjunto vivo."""
+    found = {}
+    for opp in engine.detect_simple_arbitrage(market_data):
+        found[(opp["pair"], opp["buyExchange"], opp["sellExchange"])] = opp["spreadPercentage"]
+    for exchange in market_data:
+        for opp in engine.detect_triangular_arbitrage(market_data, exchange):
+            found[(exchange, opp["pair"])] = opp["profitPercentage"]
+    return found
+
+def live_view(engine):
+    """Conjunto vivo no mesmo formato de full_detection."""
+    return {
+        key: opp["spreadPercentage"] if opp["type"] == "simple" else opp["profitPercentage"]
+        for key, opp in engine.live_opportunities.opportunities.items()
+    }
+
+class TestLiveOpportunities(unittest.TestCase):
+    """Testes para a classe LiveOpportunities."""
+
+    def test_events_keep_id(self):
+        """Testa os eventos de abertura, atualização e fechamento de um grupo."""
+        live = LiveOpportunities()
+        first, second = (SimpleOpportunity("BTC/USDT", "binance", "kraken", 1.0, 1.1, spread, 0.1, time.time())
+                         for spread in (1.0, 2.0))
+
+        added = live.replace("g", {"a": first})
+        updated = live.replace("g", {"a": second})
+        removed = live.replace("g", {})
+
+        self.assertEqual([kind for kind, _ in added + updated + removed], ["add", "update", "remove"])
+        self.assertEqual(updated[0][1].id, first.id)
+        self.assertEqual(len(live), 0)
+
+class TestIncrementalDetection(unittest.TestCase):
+    """Testes para ArbitrageEngine.update_opportunities."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.1)
+
+    def test_matches_full_detection(self):
+        """Testa que, após cada lote de mudanças, o conjunto vivo coincide com uma varredura completa."""
+        rng = random.Random(11)
+        exchanges = ["binance", "kraken", "okx"]
+        market_data = {ex: {pair: quote(price) for pair, price in PRICES.items()} for ex in exchanges}
+        self.engine.update_opportunities(market_data)
+
+        for _ in range(60):
+            for _ in range(rng.randint(1, 3)):
+                ex, pair = rng.choice(exchanges), rng.choice(list(PRICES))
+                if rng.random() < 0.1:
+                    market_data[ex].pop(pair, None)
+                else:
+                    market_data[ex][pair] = quote(PRICES[pair] * rng.uniform(0.99, 1.01))
+            self.engine.update_opportunities(market_data)
+            self.assertEqual(set(live_view(self.engine)), set(full_detection(self.engine, market_data)))
+            for key, profit in full_detection(self.engine, market_data).items():
+                self.assertAlmostEqual(live_view(self.engine)[key], profit)
+
+    def test_reevaluates_only_changed_pairs(self):
+        """Testa que só o par alterado é reavaliado entre exchanges."""
+        market_data = {ex: {pair: quote(price) for pair, price in PRICES.items()} for ex in ("binance", "kraken")}
+        self.engine.update_opportunities(market_data)
+
+        market_data["kraken"]["BTC/USDT"] = quote(50500.0)
+        with patch.object(self.engine, "detect_simple_arbitrage", wraps=self.engine.detect_simple_arbitrage) as spy:
+            events = self.engine.update_opportunities(market_data)
+
+        evaluated = spy.call_args[0][0]
+        self.assertEqual({pair for quotes in evaluated.values() for pair in quotes}, {"BTC/USDT"})
+        simple = [(kind, opp["pair"]) for kind, opp in events if opp["type"] == "simple"]
+        self.assertEqual(simple, [("add", "BTC/USDT")])
+        # A perna BTC/USDT da Kraken também desequilibra os triângulos da Kraken que a usam
+        self.assertEqual({opp["exchange"] for _, opp in events if opp["type"] == "triangular"}, {"kraken"})
+
+    def test_triangle_events(self):
+        """Testa que um triângulo abre e fecha conforme a cotação da sua perna muda."""
+        market_data = {"binance": {pair: quote(price) for pair, price in PRICES.items()}}
+        self.engine.update_opportunities(market_data)
+        self.assertEqual(len(self.engine.live_opportunities), 0)
+
+        market_data["binance"]["ETH/BTC"] = quote(0.0606)
+        opened = self.engine.update_opportunities(market_data)
+        market_data["binance"]["ETH/BTC"] = quote(0.06)
+        closed = self.engine.update_opportunities(market_data)
+
+        self.assertEqual({kind for kind, _ in opened}, {"add"})
+        self.assertEqual({opp["type"] for _, opp in opened}, {"triangular"})
+        self.assertEqual(len(opened), 3)
+        self.assertEqual(sorted(opp["id"] for _, opp in closed), sorted(opp["id"] for _, opp in opened))
+        self.assertEqual({kind for kind, _ in closed}, {"remove"})
+
+    def test_missing_exchange_closes_its_opportunities(self):
+        """Testa que uma exchange ausente do ciclo fecha seus cruzamentos e triângulos."""
+        market_data = {
+            "binance": {pair: quote(price) for pair, price in PRICES.items()},
+            "kraken": {pair: quote(price) for pair, price in PRICES.items()},
+        }
+        market_data["binance"]["ETH/BTC"] = quote(0.0606)
+        self.engine.update_opportunities(market_data)
+        self.assertTrue(any(opp["exchange"] == "binance" for opp in self.engine.live_opportunities.sorted()
+                            if opp["type"] == "triangular"))
+
+        del market_data["binance"]
+        self.engine.update_opportunities(market_data)
+
+        self.assertEqual(self.engine.live_opportunities.sorted(), [])
+
+    def test_stale_quotes_expire(self):
+        """Testa que cruzamentos com cotações velhas são fechados mesmo sem cotação nova."""
+        self.engine.max_quote_age = 5
+        now = time.time()
+        market_data = {
+            "binance": {"BTC/USDT": quote(50000.0, received=now - 4)},
+            "kraken": {"BTC/USDT": quote(50500.0, received=now)},
+        }
+        self.assertEqual(len(self.engine.update_opportunities(market_data)), 1)
+
+        with patch("scripts.arbitrage_engine.time.time", return_value=now + 2):
+            events = self.engine.update_opportunities(market_data)
+
+        self.assertEqual([kind for kind, _ in events], ["remove"])
+
+    def test_top_k_applies_to_the_whole_live_set(self):
+        """Testa que um par lucrativo inalterado continua aberto quando o lote o deixa fora do top-K."""
+        self.engine.top_k = 1
+        market_data = {
+            "binance": {"BTC/USDT": quote(50000.0), "ETH/USDT": quote(3000.0)},
+            "kraken": {"BTC/USDT": quote(52500.0), "ETH/USDT": quote(3060.0)},
+        }
+        self.engine.update_opportunities(market_data)
+        self.assertEqual(len(self.engine.live_opportunities), 2)
+
+        market_data["kraken"]["BTC/USDT"] = quote(53000.0)
+        events = self.engine.update_opportunities(market_data, {("kraken", "BTC/USDT"), ("kraken", "ETH/USDT")})
+
+        self.assertEqual({kind for kind, _ in events}, {"update"})
+        self.assertEqual(len(self.engine.live_opportunities), 2)
+        self.assertEqual([opp["pair"] for opp in self.engine.top_live_opportunities()], ["BTC/USDT"])
+
+    def test_streamed_changes_come_from_quote_table(self):
+        """Testa que exchanges com stream usam o registro de mudanças da tabela de cotações."""
+        table = QuoteTable()
+        table.update("binance", "BTC/USDT", 1.0, 2.0)
+        table.update("binance", "ETH/USDT", 1.0, 2.0)
+        self.assertEqual(table.drain_changes(), {("binance", "BTC/USDT"), ("binance", "ETH/USDT")})
+        self.assertEqual(table.drain_changes(), set())
+
+        self.engine.feeds["binance"] = object()
+        self.engine.quote_table.update("binance", "BTC/USDT", 49990.0, 50010.0)
+        market_data = self.engine.quote_table.snapshot()
+        market_data["kraken"] = {"BTC/USDT": quote(50000.0)}
+
+        self.assertEqual(self.engine.changed_quotes(market_data), {("binance", "BTC/USDT"), ("kraken", "BTC/USDT")})
+        self.assertEqual(self.engine.changed_quotes(market_data), set())
+
+if __name__ == '__main__':
+    unittest.main()
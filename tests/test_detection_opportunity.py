@@ -0,0 +1,55 @@
+"""
+Testes unitários para a representação compacta das oportunidades.
+"""
+import time
+import unittest
+from api.models import ArbitrageOpportunity, TriangularArbitrageOpportunity
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.opportunity import RouteOpportunity, SimpleOpportunity
+
+class TestOpportunity(unittest.TestCase):
+    """Testes para SimpleOpportunity e RouteOpportunity."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.0)
+
+    def test_slotted_with_monotonic_ids(self):
+        """Testa que as oportunidades não têm __dict__ e recebem IDs inteiros crescentes."""
+        created = time.time()
+        first = SimpleOpportunity("BTC/USDT", "binance", "kraken", 100.0, 101.0, 0.5, 0.6, created)
+        second = RouteOpportunity("triangular", "A/B/C", "binance", [("A/B", 2.0, 0.001)], 0.3, created)
+
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertFalse(hasattr(second, "__dict__"))
+        self.assertIsInstance(first.id, int)
+        self.assertGreater(second.id, first.id)
+
+    def test_api_shape(self):
+        """Testa que to_dict gera os modelos da API e que a leitura por chave segue o mesmo formato."""
+        market_data = {
+            "binance": {
+                "BTC/USDT": {"bid": 50000.0, "ask": 50010.0, "volume": 1.0},
+                "ETH/USDT": {"bid": 3000.0, "ask": 3001.0},
+                "ETH/BTC": {"bid": 0.0605, "ask": 0.06051},
+            },
+            "kraken": {"BTC/USDT": {"bid": 50500.0, "ask": 50510.0, "volume": 2.0}},
+        }
+
+        simple = self.engine.detect_simple_arbitrage(market_data)[0]
+        triangular = self.engine.detect_triangular_arbitrage(market_data, "binance")[0]
+
+        simple_dict = ArbitrageOpportunity(**simple.to_dict()).model_dump()
+        triangular_dict = TriangularArbitrageOpportunity(**triangular.to_dict()).model_dump()
+        self.assertEqual(simple_dict, simple.to_dict())
+        self.assertEqual(triangular_dict, triangular.to_dict())
+        for key, value in simple_dict.items():
+            self.assertEqual(simple[key], value)
+        for key, value in triangular_dict.items():
+            self.assertEqual(triangular[key], value)
+        self.assertEqual(simple["timestamp"], time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(simple.created)))
+        self.assertIsNone(simple.get("maxSize"))
+        self.assertRaises(KeyError, simple.__getitem__, "exchange")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Testes unitários para a detecção dividida entre processos.
+"""
+import random
+import unittest
+import numpy as np
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.sharding import (ShardedDetector, SharedArrays, attach, partition_cycles,
+                                        partition_pairs)
+
+EXCHANGES = ["binance", "kraken", "coinbase", "kucoin"]
+CURRENCIES = {"BTC": 50000.0, "ETH": 3000.0, "SOL": 100.0, "ADA": 0.5, "DOT": 7.0, "USDT": 1.0}
+
+def random_market(seed):
+    """Mercado aleatório com todos os pares entre as moedas e cotações faltando."""
+    rng = random.Random(seed)
+    codes = list(CURRENCIES)
+    market_data = {}
+    for exchange_id in EXCHANGES:
+        quotes = {}
+        for i, base in enumerate(codes):
+            for quote in codes[i + 1:]:
+                if rng.random() < 0.1:
+                    continue
+                mid = CURRENCIES[base] / CURRENCIES[quote] * (1 + rng.uniform(-0.01, 0.01))
+                quotes[f"{base}/{quote}"] = {"bid": mid * 0.9998, "ask": mid * 1.0002}
+        market_data[exchange_id] = quotes
+    return market_data
+
+class TestPartition(unittest.TestCase):
+    """Testes para a partição dos pares e dos ciclos."""
+
+    def test_pairs_cover_universe(self):
+        """Testa que cada estratégia atribui cada par a exatamente um shard."""
+        symbols = [f"P{i}/USDT" for i in range(50)]
+        for strategy in ("hash", "contiguous", "round_robin"):
+            parts = partition_pairs(symbols, 4, strategy)
+            self.assertEqual(len(parts), 4)
+            self.assertEqual(sorted(np.concatenate(parts).tolist()), list(range(50)))
+
+    def test_hash_is_stable(self):
+        """Testa que com hash um par fica no mesmo shard mesmo com outro universo."""
+        first = partition_pairs(["A/USDT", "B/USDT", "C/USDT"], 4)
+        second = partition_pairs(["C/USDT", "X/USDT"], 4)
+        shard_of_c = next(i for i, part in enumerate(first) if 2 in part)
+
+        self.assertIn(0, second[shard_of_c])
+
+    def test_cycles_cover_index(self):
+        """Testa que as fatias dos ciclos cobrem o índice sem repetição."""
+        for strategy in ("hash", "contiguous"):
+            covered = [i for part in partition_cycles(10, 3, strategy) for i in range(10)[part]]
+            self.assertEqual(sorted(covered), list(range(10)))
+
+class TestSharedArrays(unittest.TestCase):
+    """Testes para a classe SharedArrays."""
+
+    def test_round_trip_and_reuse(self):
+        """Testa a leitura dos arrays publicados e o reaproveitamento do bloco."""
+        shared = SharedArrays()
+        try:
+            layout = shared.publish({"a": np.arange(6, dtype=float).reshape(2, 3), "b": np.array([1, 2, 3])})
+            arrays = attach(layout)
+            np.testing.assert_array_equal(arrays["a"], [[0, 1, 2], [3, 4, 5]])
+            np.testing.assert_array_equal(arrays["b"], [1, 2, 3])
+            del arrays
+
+            self.assertEqual(shared.publish({"a": np.ones(3)})[0], layout[0])
+        finally:
+            shared.close()
+
+class TestShardedDetector(unittest.IsolatedAsyncioTestCase):
+    """Testes para ShardedDetector e ArbitrageEngine.detect_sharded."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Pool compartilhado pelos testes (criar processos é caro)."""
+        cls.sharding = ShardedDetector(shards=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sharding.close()
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.0)
+        self.engine.sharding = self.sharding
+
+    def test_invalid_strategy(self):
+        """Testa a rejeição de estratégia desconhecida."""
+        self.assertRaises(ValueError, ShardedDetector, 2, "random", executor=object())
+
+    async def test_matches_single_process(self):
+        """Testa que o resultado dividido é igual ao dos detectores em um único processo."""
+        def key(opp):
+            return (opp.type, opp.pair, getattr(opp, "buy_exchange", None) or opp.exchange,
+                    getattr(opp, "sell_exchange", None), round(opp.profit_percentage, 9))
+
+        for seed, strategy in enumerate(("hash", "contiguous", "round_robin")):
+            self.sharding.strategy = strategy
+            market_data = random_market(seed)
+            expected = self.engine.detect_simple_arbitrage(market_data)
+            for exchange_id in EXCHANGES:
+                expected.extend(self.engine.detect_triangular_arbitrage(market_data, exchange_id))
+
+            found = await self.engine.detect_sharded(market_data, EXCHANGES)
+
+            self.assertTrue(any(opp.type == "triangular" for opp in found))
+            self.assertEqual(sorted(map(key, found)), sorted(map(key, expected)))
+            profits = [opp.profit_percentage for opp in found]
+            self.assertEqual(profits, sorted(profits, reverse=True))
+
+if __name__ == '__main__':
+    unittest.main()
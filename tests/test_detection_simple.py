@@ -0,0 +1,128 @@
+"""
+Testes unitários para o detector vetorizado de arbitragem simples.
+"""
+import random
+import time
+import unittest
+import numpy as np
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.simple import build_quote_matrix, find_crosses, taker_multipliers
+
+EXCHANGES = ["binance", "kraken", "coinbase", "kucoin", "bybit", "okx"]
+
+def random_market(exchanges, pairs, seed, spread=0.02):
+    """Gera dados de mercado com preços dispersos entre as exchanges."""
+    rng = random.Random(seed)
+    market_data = {ex: {} for ex in exchanges}
+    for i in range(pairs):
+        mid = rng.uniform(1, 1000)
+        for ex in exchanges:
+            if rng.random() < 0.2:
+                continue
+            price = mid * (1 + rng.uniform(-spread, spread))
+            market_data[ex][f"P{i}/USDT"] = {"bid": price * 0.999, "ask": price * 1.001, "volume": rng.uniform(1, 10)}
+    return market_data
+
+def reference_crosses(engine, market_data):
+    """Implementação escalar (laço por par de exchanges) usada como referência."""
+    found = {}
+    pairs = set()
+    for quotes in market_data.values():
+        pairs.update(quotes)
+    for pair in pairs:
+        quotes = [(ex, data[pair]) for ex, data in market_data.items() if pair in data]
+        for buy_ex, buy in quotes:
+            for sell_ex, sell in quotes:
+                if buy_ex == sell_ex:
+                    continue
+                buy_fee = engine.exchange_fees[buy_ex]["taker"] / 100
+                sell_fee = engine.exchange_fees[sell_ex]["taker"] / 100
+                profit = ((sell["bid"] * (1 - sell_fee)) / (buy["ask"] * (1 + buy_fee)) - 1) * 100
+                if profit > engine.min_profit_threshold:
+                    found[(buy_ex, sell_ex, pair)] = profit
+    return found
+
+class TestVectorizedSimpleDetector(unittest.TestCase):
+    """Testes para find_crosses e detect_simple_arbitrage."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.5)
+
+    def test_matches_scalar_reference(self):
+        """Testa que o detector vetorizado encontra exatamente as mesmas oportunidades do laço escalar."""
+        market_data = random_market(EXCHANGES, 300, seed=3)
+
+        opportunities = self.engine.detect_simple_arbitrage(market_data)
+        found = {(o["buyExchange"], o["sellExchange"], o["pair"]): o["spreadPercentage"] for o in opportunities}
+
+        expected = reference_crosses(self.engine, market_data)
+        self.assertTrue(expected)
+        self.assertEqual(set(found), set(expected))
+        for key, profit in expected.items():
+            self.assertAlmostEqual(found[key], profit, places=9)
+
+    def test_output_format(self):
+        """Testa que o formato do dicionário de oportunidade da API é preservado."""
+        market_data = {
+            "binance": {"BTC/USDT": {"bid": 99.0, "ask": 100.0, "volume": 2.0}},
+            "kraken": {"BTC/USDT": {"bid": 105.0, "ask": 106.0, "volume": 3.0}},
+        }
+
+        opportunities = self.engine.detect_simple_arbitrage(market_data)
+
+        self.assertEqual(len(opportunities), 1)
+        opp = opportunities[0]
+        self.assertEqual(set(opp.to_dict()), {"id", "pair", "type", "buyExchange", "sellExchange", "buyPrice", "sellPrice",
+                                    "spreadPercentage", "estimatedProfit", "timestamp", "buyVolume", "sellVolume"})
+        self.assertEqual((opp["buyExchange"], opp["sellExchange"]), ("binance", "kraken"))
+        self.assertEqual((opp["buyPrice"], opp["sellPrice"]), (100.0, 105.0))
+        self.assertAlmostEqual(opp["estimatedProfit"], 105.0 - 100.0 - 0.1 - 105.0 * 0.0026)
+        self.assertEqual((opp["buyVolume"], opp["sellVolume"]), (2.0, 3.0))
+        self.assertIsInstance(opp["spreadPercentage"], float)
+
+    def test_sorted_by_spread(self):
+        """Testa que as oportunidades saem ordenadas pelo lucro percentual."""
+        opportunities = self.engine.detect_simple_arbitrage(random_market(EXCHANGES, 100, seed=5))
+
+        spreads = [o["spreadPercentage"] for o in opportunities]
+        self.assertEqual(spreads, sorted(spreads, reverse=True))
+
+    def test_missing_and_empty_quotes(self):
+        """Testa que cotações ausentes ou incompletas são ignoradas."""
+        market_data = {
+            "binance": {"BTC/USDT": {"bid": 99.0, "ask": None}},
+            "kraken": {"BTC/USDT": {"bid": 105.0, "ask": 106.0}},
+            "okx": {},
+        }
+
+        self.assertEqual(self.engine.detect_simple_arbitrage(market_data), [])
+        self.assertEqual(self.engine.detect_simple_arbitrage({}), [])
+
+    def test_quote_matrix_uses_clock_offsets(self):
+        """Testa que o timestamp da exchange é convertido para o relógio local."""
+        market_data = {
+            "binance": {"BTC/USDT": {"bid": 1.0, "ask": 2.0, "timestamp": 1002.0, "received": 1010.0}},
+            "kraken": {"BTC/USDT": {"bid": 1.0, "ask": 2.0, "timestamp": None, "received": 1005.0}},
+        }
+
+        matrix = build_quote_matrix(market_data, {"binance": 2.0})
+
+        np.testing.assert_array_equal(matrix.times[:, 0], [1000.0, 1005.0])
+
+    def test_large_universe_is_fast(self):
+        """Testa que 8 exchanges × 1000 pares são avaliados em poucos milissegundos."""
+        exchanges = EXCHANGES + ["uniswap", "pancakeswap"]
+        market_data = random_market(exchanges, 1000, seed=11)
+        matrix = build_quote_matrix(market_data)
+        buy, sell = taker_multipliers(matrix.exchanges, self.engine.exchange_fees)
+
+        started = time.perf_counter()
+        for _ in range(10):
+            find_crosses(matrix, buy, sell, 0.5)
+        elapsed = (time.perf_counter() - started) / 10
+
+        self.assertLess(elapsed, 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Testes unitários para o snapshot colunar de mercado.
+"""
+import random
+import unittest
+import numpy as np
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.snapshot import MarketSnapshot, SymbolRegistry
+
+def random_market(seed, exchanges=("binance", "kraken", "coinbase", "kucoin")):
+    """Mercado aleatório com moedas cruzadas e cotações faltando."""
+    rng = random.Random(seed)
+    prices = {"BTC": 50000.0, "ETH": 3000.0, "SOL": 100.0, "ADA": 0.5, "USDT": 1.0}
+    pairs = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "ADA/USDT", "ETH/BTC", "SOL/BTC", "SOL/ETH", "ADA/BTC"]
+    market_data = {}
+    for exchange_id in exchanges:
+        quotes = {}
+        for pair in pairs:
+            if rng.random() < 0.15:
+                continue
+            base, quote = pair.split("/")
+            mid = prices[base] / prices[quote] * (1 + rng.uniform(-0.01, 0.01))
+            quotes[pair] = {"bid": mid * 0.9995, "ask": mid * 1.0005, "volume": rng.uniform(0, 10)}
+        market_data[exchange_id] = quotes
+    return market_data
+
+class TestMarketSnapshot(unittest.TestCase):
+    """Testes para MarketSnapshot e ExchangeView."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.market_data = {
+            "binance": {
+                "BTC/USDT": {"bid": 50000.0, "ask": 50010.0, "volume": 1.5, "timestamp": 10.0},
+                "ETH/BTC": {"bid": 0.06, "ask": 0.0601},
+            },
+            "kraken": {"BTC/USDT": {"bid": 50500.0, "ask": 50510.0, "received": 11.0}},
+        }
+
+    def test_mapping_adapter(self):
+        """Testa que o snapshot se comporta como o dicionário original, com None nos campos ausentes."""
+        snapshot = MarketSnapshot.from_market_data(self.market_data)
+
+        self.assertEqual(list(snapshot), ["binance", "kraken"])
+        self.assertEqual(set(snapshot["binance"]), {"BTC/USDT", "ETH/BTC"})
+        self.assertNotIn("ETH/BTC", snapshot["kraken"])
+        self.assertNotIn("okx", snapshot)
+        self.assertEqual(snapshot["binance"]["BTC/USDT"], {
+            "bid": 50000.0, "ask": 50010.0, "volume": 1.5, "timestamp": 10.0, "received": None})
+        self.assertEqual(snapshot["kraken"]["BTC/USDT"]["received"], 11.0)
+        self.assertRaises(KeyError, snapshot["kraken"].__getitem__, "ETH/BTC")
+
+    def test_views_do_not_copy(self):
+        """Testa que linhas de exchange e colunas de par são views das matrizes."""
+        snapshot = MarketSnapshot.from_market_data(self.market_data)
+        row = snapshot["kraken"]
+        column = snapshot.symbol_view("BTC/USDT")
+
+        self.assertTrue(np.shares_memory(row.bids, snapshot.bids))
+        self.assertTrue(np.shares_memory(column["ask"], snapshot.asks))
+        np.testing.assert_array_equal(column["bid"], [50000.0, 50500.0])
+        self.assertIsNone(snapshot.symbol_view("SOL/USDT"))
+
+    def test_registry_ids_are_stable(self):
+        """Testa que os IDs do registro valem entre snapshots e que as moedas são separadas uma vez."""
+        registry = SymbolRegistry()
+        first = MarketSnapshot.from_market_data(self.market_data, registry)
+        second = MarketSnapshot.from_market_data({"okx": {"ETH/BTC": {"bid": 0.06, "ask": 0.0601},
+                                                          "BTC/USDT:USDT": {"bid": 1.0, "ask": 1.0}}}, registry)
+        bases, quotes = registry.currencies_of(second.symbol_ids)
+
+        self.assertEqual(second.symbol_ids[0], first.symbol_ids[first.column("ETH/BTC")])
+        self.assertEqual(registry.currencies[bases[0]], "ETH")
+        self.assertEqual(registry.currencies[quotes[0]], "BTC")
+        self.assertEqual((bases[1], quotes[1]), (-1, -1))
+        self.assertGreater(second.version, first.version)
+
+    def test_vectors(self):
+        """Testa a leitura vetorial de bids e asks, inclusive de pares ausentes ou desconhecidos."""
+        registry = SymbolRegistry()
+        snapshot = MarketSnapshot.from_market_data(self.market_data, registry)
+        ids = registry.symbol_ids(["ETH/BTC", "BTC/USDT", "SOL/USDT"])
+
+        bids, asks = snapshot["kraken"].vectors(ids)
+
+        self.assertTrue(np.isnan(bids[0]) and np.isnan(asks[2]))
+        self.assertEqual(bids[1], 50500.0)
+        self.assertEqual(asks[1], 50510.0)
+
+    def test_preserves_cycle_metadata(self):
+        """Testa que missing e stale do ciclo são preservados e que um snapshot não é reconvertido."""
+        class CycleData(dict):
+            missing = ["okx"]
+            stale = {"kraken": 12.0}
+
+        snapshot = MarketSnapshot.from_market_data(CycleData(self.market_data))
+
+        self.assertEqual(snapshot.missing, ["okx"])
+        self.assertEqual(snapshot.stale, {"kraken": 12.0})
+        self.assertIs(MarketSnapshot.from_market_data(snapshot), snapshot)
+
+    def test_detectors_match_dict_input(self):
+        """Testa que os detectores encontram as mesmas oportunidades no snapshot e no dicionário."""
+        engine = ArbitrageEngine(min_profit_threshold=0.0)
+
+        def simple_key(opp):
+            return (opp.pair, opp.buy_exchange, opp.sell_exchange, round(opp.spread_percentage, 9))
+
+        def route_key(opp):
+            return (opp.pair, round(opp.profit_percentage, 9))
+
+        for seed in range(5):
+            market_data = random_market(seed)
+            snapshot = engine.market_snapshot(market_data)
+
+            self.assertEqual(sorted(map(simple_key, engine.detect_simple_arbitrage(market_data))),
+                             sorted(map(simple_key, engine.detect_simple_arbitrage(snapshot))))
+            for exchange_id in market_data:
+                self.assertEqual(
+                    sorted(map(route_key, engine.detect_triangular_arbitrage(market_data, exchange_id))),
+                    sorted(map(route_key, engine.detect_triangular_arbitrage(snapshot, exchange_id))))
+
+if __name__ == '__main__':
+    unittest.main()
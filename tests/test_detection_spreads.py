@@ -0,0 +1,112 @@
+"""
+Testes unitários para o rastreador contínuo de spreads (arbitragem estatística).
+"""
+import math
+import random
+import unittest
+import numpy as np
+from api.models import ArbitrageOpportunity
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.snapshot import MarketSnapshot, SymbolRegistry
+from scripts.detection.spreads import SpreadTracker
+
+def snapshot(registry, mids, pair="BTC/USDT"):
+    """Snapshot de um par com o mid de cada exchange (spread bid/ask de 0,01%)."""
+    return MarketSnapshot.from_market_data(
+        {ex: {pair: {"bid": mid * 0.99995, "ask": mid * 1.00005}} for ex, mid in mids.items()}, registry
+    )
+
+class TestSpreadTracker(unittest.TestCase):
+    """Testes para a classe SpreadTracker."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.registry = SymbolRegistry()
+        self.tracker = SpreadTracker(window=20, capacity=2)
+
+    def test_matches_scalar_ewma(self):
+        """Testa média e variância exponenciais contra uma implementação escalar."""
+        rng = random.Random(3)
+        alpha = 2 / 21
+        mean = var = None
+        for t in range(200):
+            kraken = 100 * (1 + rng.gauss(0, 0.001))
+            slots, *_ = self.tracker.update(snapshot(self.registry, {"binance": 100.0, "kraken": kraken}), now=t)
+            spread = math.log(kraken / 100.0)
+            if mean is None:
+                mean, var = spread, 0.0
+            else:
+                diff = spread - mean
+                mean += alpha * diff
+                var = (1 - alpha) * (var + alpha * diff * diff)
+
+        self.assertEqual(len(self.tracker), 1)
+        self.assertAlmostEqual(self.tracker.mean[slots[0]], mean, places=12)
+        self.assertAlmostEqual(self.tracker.var[slots[0]], var, places=12)
+        self.assertEqual(self.tracker.count[slots[0]], 200)
+        self.assertAlmostEqual(self.tracker.interval[slots[0]], 1.0)
+
+    def test_series_do_not_depend_on_row_order(self):
+        """Testa que a série e o sinal do spread não mudam com a ordem das exchanges no ciclo."""
+        first = self.tracker.update(snapshot(self.registry, {"binance": 100.0, "kraken": 101.0}), now=0)
+        second = self.tracker.update(snapshot(self.registry, {"kraken": 101.0, "binance": 100.0}), now=1)
+
+        self.assertEqual(first[0].tolist(), second[0].tolist())
+        self.assertAlmostEqual(self.tracker.last[first[0][0]], math.log(101.0 / 100.0))
+        self.assertEqual(self.tracker.var[first[0][0]], 0.0)
+
+    def test_half_life_of_ar1(self):
+        """Testa a meia-vida estimada de um spread AR(1) com phi = 0.9."""
+        tracker = SpreadTracker(window=2000, capacity=1)
+        rng = random.Random(11)
+        spread = 0.0
+        for t in range(4000):
+            spread = 0.9 * spread + rng.gauss(0, 0.001)
+            slots, *_ = tracker.update(snapshot(self.registry, {"binance": 100.0, "kraken": 100 * math.exp(spread)}),
+                                       now=t * 0.5)
+
+        expected = -math.log(2) / math.log(0.9) * 0.5
+        self.assertAlmostEqual(tracker.half_life(slots)[0], expected, delta=expected * 0.25)
+
+    def test_many_series_in_arrays(self):
+        """Testa milhares de séries atualizadas de uma vez, com os arrays crescendo sob demanda."""
+        exchanges = ["binance", "kraken", "coinbase", "kucoin", "bybit", "okx"]
+        market_data = {ex: {f"P{i}/USDT": {"bid": 10.0 + i, "ask": 10.01 + i} for i in range(300)} for ex in exchanges}
+        market_data["okx"].pop("P0/USDT")
+
+        slots, first, second, columns, z = self.tracker.update(
+            MarketSnapshot.from_market_data(market_data, self.registry), now=0)
+
+        self.assertEqual(len(self.tracker), 300 * 15 - 5)
+        self.assertEqual(len(np.unique(slots)), len(slots))
+        self.assertGreaterEqual(len(self.tracker.mean), len(self.tracker))
+        self.assertTrue(np.all(z == 0))
+
+class TestStatArbSignals(unittest.TestCase):
+    """Testes para ArbitrageEngine.detect_stat_arb."""
+
+    def test_signal_on_spread_shock(self):
+        """Testa o sinal de reversão após um desvio do spread, no formato das oportunidades simples."""
+        engine = ArbitrageEngine(min_profit_threshold=0.5)
+        engine.spread_tracker = SpreadTracker(window=50, entry_z=3.0, min_samples=30)
+        rng = random.Random(5)
+        for t in range(60):
+            kraken = 50000 * (1 + rng.gauss(0, 0.0002))
+            signals = engine.detect_stat_arb(snapshot(engine.symbol_registry, {"binance": 50000.0, "kraken": kraken}),
+                                             now=t)
+            self.assertEqual(signals, [])
+
+        signals = engine.detect_stat_arb(snapshot(engine.symbol_registry, {"binance": 50000.0, "kraken": 50600.0}),
+                                         now=60)
+
+        self.assertEqual(len(signals), 1)
+        signal = signals[0]
+        self.assertEqual((signal.buy_exchange, signal.sell_exchange), ("binance", "kraken"))
+        self.assertGreater(signal.z_score, 3.0)
+        self.assertGreater(signal.estimated_profit, 0)
+        data = signal.to_dict()
+        self.assertEqual(data["type"], "stat_arb")
+        self.assertEqual(set(ArbitrageOpportunity(**data).model_dump()), set(data) - {"zScore", "halfLife"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Testes unitários para a seleção das melhores oportunidades com heaps limitados.
+"""
+import random
+import time
+import unittest
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.opportunity import SimpleOpportunity
+from scripts.detection.topk import TopK, select_top
+
+EXCHANGES = ["binance", "kraken", "coinbase", "kucoin", "bybit", "okx"]
+
+def opportunity(pair, profit):
+    """Oportunidade simples com o lucro percentual dado."""
+    return SimpleOpportunity(pair, "binance", "kraken", 100.0, 101.0, profit, 1.0, time.time())
+
+class TestTopK(unittest.TestCase):
+    """Testes para a classe TopK."""
+
+    def test_keeps_best_k(self):
+        """Testa que só as K melhores são mantidas, com memória limitada, e saem em ordem decrescente."""
+        rng = random.Random(1)
+        profits = [rng.uniform(0, 5) for _ in range(1000)]
+        best = TopK(k=10)
+        for i, profit in enumerate(profits):
+            best.push(opportunity(f"P{i % 7}/USDT", profit))
+            self.assertLessEqual(len(best), 10)
+
+        self.assertEqual([o.spread_percentage for o in best.items()], sorted(profits, reverse=True)[:10])
+        self.assertEqual(best.seen, 1000)
+
+    def test_per_pair(self):
+        """Testa o limite por par combinado com o limite total."""
+        opportunities = [opportunity("A/USDT", p) for p in (5, 4, 3)] + [opportunity("B/USDT", p) for p in (2, 1)]
+
+        selected = select_top(opportunities, k=3, per_pair=2)
+
+        self.assertEqual([(o.pair, o.spread_percentage) for o in selected], [("A/USDT", 5), ("A/USDT", 4), ("B/USDT", 2)])
+
+    def test_zero_limit_keeps_nothing(self):
+        """Testa que limites zero não aceitam nenhuma oportunidade."""
+        for best in (TopK(k=0), TopK(per_pair=0)):
+            self.assertFalse(best.accepts(5.0, "A/USDT"))
+            self.assertFalse(best.push(opportunity("A/USDT", 5.0)))
+            self.assertEqual(best.items(), [])
+
+    def test_ties_keep_arrival_order(self):
+        """Testa que empates seguem a ordem de chegada, como uma ordenação estável."""
+        opportunities = [opportunity("A/USDT", 1.0) for _ in range(5)]
+
+        self.assertEqual(select_top(opportunities, k=3), opportunities[:3])
+        self.assertEqual(select_top(opportunities), opportunities)
+
+    def test_accepts(self):
+        """Testa a verificação antecipada de um candidato."""
+        best = TopK(k=2)
+        best.extend([opportunity("A/USDT", 1.0), opportunity("A/USDT", 2.0)])
+
+        self.assertFalse(best.accepts(1.0))
+        self.assertTrue(best.accepts(1.5))
+        self.assertTrue(TopK(per_pair=1).accepts(0.0, "A/USDT"))
+
+class TestEngineTopK(unittest.TestCase):
+    """Testes para o modo top-K dos detectores."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        rng = random.Random(7)
+        self.market_data = {ex: {} for ex in EXCHANGES}
+        for i in range(200):
+            mid = rng.uniform(1, 1000)
+            for ex in EXCHANGES:
+                price = mid * (1 + rng.uniform(-0.02, 0.02))
+                self.market_data[ex][f"P{i}/USDT"] = {"bid": price * 0.999, "ask": price * 1.001}
+        self.engine = ArbitrageEngine(min_profit_threshold=0.1)
+
+    def test_simple_detector(self):
+        """Testa que o detector simples devolve as mesmas melhores oportunidades que a ordenação completa."""
+        everything = self.engine.detect_simple_arbitrage(self.market_data)
+        self.engine.top_k = 20
+        top = self.engine.detect_simple_arbitrage(self.market_data)
+        self.engine.top_k, self.engine.top_k_per_pair = None, 1
+        per_pair = self.engine.detect_simple_arbitrage(self.market_data)
+
+        def key(o):
+            return (o.pair, o.buy_exchange, o.sell_exchange)
+
+        self.assertGreater(len(everything), 20)
+        self.assertEqual(list(map(key, top)), list(map(key, everything[:20])))
+        self.assertEqual(len(per_pair), len({o.pair for o in everything}))
+        self.assertEqual(sorted(map(key, per_pair)),
+                         sorted(key(next(o for o in everything if o.pair == pair)) for pair in {o.pair for o in everything}))
+
+    def test_selection_opt_out(self):
+        """Testa que select=False devolve todas as oportunidades mesmo com top_k definido."""
+        everything = self.engine.detect_simple_arbitrage(self.market_data)
+        self.engine.top_k, self.engine.top_k_per_pair = 5, 1
+
+        unselected = self.engine.detect_simple_arbitrage(self.market_data, select=False)
+
+        self.assertEqual([o.spread_percentage for o in unselected], [o.spread_percentage for o in everything])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Testes unitários para o grafo de moedas e o índice de triângulos.
+"""
+import itertools
+import random
+import unittest
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.graph import CurrencyGraph
+from scripts.detection.triangular import TriangleIndex
+
+def brute_force_triangles(graph):
+    """Enumera os triângulos testando todas as triplas de moedas."""
+    found = set()
+    for a, b, c in itertools.combinations(range(len(graph.currencies)), 3):
+        if all(edge in graph.edges for edge in ((a, b), (b, c), (a, c))):
+            found.add((a, b, c))
+    return found
+
+def random_exchange(seed, currencies=12, density=0.5):
+    """Gera cotações aleatórias para um universo pequeno de moedas."""
+    rng = random.Random(seed)
+    codes = [f"C{i}" for i in range(currencies)]
+    price = {code: rng.uniform(0.5, 50) for code in codes}
+    data = {}
+    for base, quote in itertools.combinations(codes, 2):
+        if rng.random() < density:
+            p = price[base] / price[quote] * rng.uniform(0.98, 1.02)
+            data[f"{base}/{quote}"] = {"bid": p * 0.999, "ask": p * 1.001}
+    return data
+
+class TestCurrencyGraph(unittest.TestCase):
+    """Testes para a classe CurrencyGraph."""
+
+    def test_ignores_contracts_and_reuses_slots(self):
+        """Testa que contratos são ignorados e slots de mercados removidos são reaproveitados."""
+        graph = CurrencyGraph()
+        graph.sync(["BTC/USDT", "ETH/USDT", "BTC/USDT:USDT"])
+        slot = graph.market_slots["ETH/USDT"]
+
+        graph.sync(["BTC/USDT", "SOL/USDT"])
+
+        self.assertNotIn("BTC/USDT:USDT", graph.market_slots)
+        self.assertEqual(graph.market_slots["SOL/USDT"], slot)
+        self.assertEqual(graph.currencies[:3], ["BTC", "USDT", "ETH"])
+
+    def test_conversion_rates_follow_trade_direction(self):
+        """Testa que vender a base usa o bid e comprá-la usa 1 / ask."""
+        graph = CurrencyGraph()
+        graph.sync(["BTC/USDT"])
+        btc, usdt = graph.currency_ids["BTC"], graph.currency_ids["USDT"]
+
+        rates = graph.conversion_rates({"BTC/USDT": {"bid": 100.0, "ask": 125.0}})
+
+        self.assertEqual(rates[graph.directed_edge(btc, usdt)], 100.0)
+        self.assertEqual(rates[graph.directed_edge(usdt, btc)], 1 / 125.0)
+
+class TestTriangleIndex(unittest.TestCase):
+    """Testes para a classe TriangleIndex."""
+
+    def test_matches_brute_force_after_listing_changes(self):
+        """Testa que o índice incremental coincide com a enumeração completa após inclusões e remoções."""
+        graph = CurrencyGraph()
+        index = TriangleIndex(graph)
+        data = random_exchange(seed=1)
+        symbols = list(data)
+        rng = random.Random(2)
+
+        graph.sync(symbols)
+        self.assertEqual(index.triangles, brute_force_triangles(graph))
+        for _ in range(5):
+            rng.shuffle(symbols)
+            graph.sync(symbols[:len(symbols) * 2 // 3])
+            self.assertEqual(index.triangles, brute_force_triangles(graph))
+
+    def test_alternate_market_keeps_triangle(self):
+        """Testa que o triângulo continua válido quando resta um mercado alternativo para a mesma aresta."""
+        graph = CurrencyGraph()
+        index = TriangleIndex(graph)
+        graph.sync(["ETH/BTC", "BTC/ETH", "BTC/USDT", "ETH/USDT"])
+
+        graph.sync(["BTC/ETH", "BTC/USDT", "ETH/USDT"])
+        _, edges = index.cycles()
+
+        self.assertEqual(len(index), 1)
+        self.assertTrue(all(graph.edge_symbol(e) in graph.market_slots for e in edges.ravel().tolist()))
+
+class TestTriangularDetection(unittest.TestCase):
+    """Testes para detect_triangular_arbitrage com o índice de triângulos."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.0)
+
+    def test_known_cycle(self):
+        """Testa o lucro de um ciclo ETH -> BTC -> USDT -> ETH calculado à mão."""
+        market_data = {"binance": {
+            "BTC/USDT": {"bid": 50000.0, "ask": 50010.0},
+            "ETH/USDT": {"bid": 3000.0, "ask": 3001.0},
+            "ETH/BTC": {"bid": 0.0605, "ask": 0.06051},
+        }}
+
+        opportunities = self.engine.detect_triangular_arbitrage(market_data, "binance")
+
+        expected = (0.0605 * 50000.0 / 3001.0 * 0.999 ** 3 - 1) * 100
+        self.assertEqual(len(opportunities), 3)
+        self.assertEqual({o["pair"] for o in opportunities}, {"ETH/BTC/USDT", "BTC/USDT/ETH", "USDT/ETH/BTC"})
+        for opp in opportunities:
+            self.assertAlmostEqual(opp["profitPercentage"], expected)
+            self.assertEqual(len(opp["steps"]), 3)
+        eth_start = next(o for o in opportunities if o["pair"] == "ETH/BTC/USDT")
+        self.assertEqual([s["pair"] for s in eth_start["steps"]], ["ETH/BTC", "BTC/USDT", "ETH/USDT"])
+
+    def test_matches_scalar_evaluation(self):
+        """Testa que a avaliação vetorizada coincide com o produto escalar de cada ciclo."""
+        data = random_exchange(seed=4, currencies=10, density=0.7)
+        fee = self.engine.exchange_fees["binance"]["taker"] / 100
+
+        def rate(a, b):
+            if f"{a}/{b}" in data:
+                return data[f"{a}/{b}"]["bid"]
+            return 1 / data[f"{b}/{a}"]["ask"]
+
+        expected = {}
+        codes = {code for symbol in data for code in symbol.split("/")}
+        for a, b, c in itertools.permutations(sorted(codes), 3):
+            legs = [(a, b), (b, c), (c, a)]
+            if all(f"{x}/{y}" in data or f"{y}/{x}" in data for x, y in legs):
+                profit = (rate(a, b) * rate(b, c) * rate(c, a) * (1 - fee) ** 3 - 1) * 100
+                if profit > 0:
+                    expected[f"{a}/{b}/{c}"] = profit
+
+        opportunities = self.engine.detect_triangular_arbitrage({"binance": data}, "binance")
+        found = {o["pair"]: o["profitPercentage"] for o in opportunities}
+
+        self.assertTrue(expected)
+        self.assertEqual(set(found), set(expected))
+        for key, profit in expected.items():
+            self.assertAlmostEqual(found[key], profit, places=9)
+
+    def test_index_reused_between_cycles(self):
+        """Testa que o índice só é reconstruído quando a lista de mercados muda."""
+        data = random_exchange(seed=5)
+        self.engine.detect_triangular_arbitrage({"binance": data}, "binance")
+        graph = self.engine.currency_graphs["binance"]
+        version = graph.version
+
+        self.engine.detect_triangular_arbitrage({"binance": dict(data)}, "binance")
+        self.assertEqual(graph.version, version)
+
+        data.pop(next(iter(data)))
+        self.engine.detect_triangular_arbitrage({"binance": data}, "binance")
+        self.assertGreater(graph.version, version)
+
+if __name__ == '__main__':
+    unittest.main()
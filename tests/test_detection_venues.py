@@ -0,0 +1,112 @@
+"""
+Testes unitários para a arbitragem entre exchanges com arestas de transferência.
+"""
+import unittest
+import numpy as np
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.detection.venues import VenueGraph
+
+TRANSFERS = {
+    "BTC": {"minutes": 30, "withdrawal_fees": {"binance": 0.0002, "default": 0.0005}},
+    "USDT": {"minutes": 5, "withdrawal_fees": {"binance": 1.0, "kraken": 2.5}},
+}
+
+def market_data(kraken_bid=51000.0):
+    """BTC mais barato na Binance que na Kraken."""
+    return {
+        "binance": {"BTC/USDT": {"bid": 49990.0, "ask": 50000.0}},
+        "kraken": {"BTC/USDT": {"bid": kraken_bid, "ask": kraken_bid + 10}},
+    }
+
+def route_profit(data, fees, graph):
+    """Lucro esperado de comprar BTC na Binance, vendê-lo na Kraken e devolver os USDT."""
+    prices = graph.usd_prices(data)
+    value = 1 / data["binance"]["BTC/USDT"]["ask"] * (1 - fees["binance"]["taker"] / 100)
+    value *= 1 - graph.transfer_cost("BTC", "binance", prices["BTC"])
+    value *= data["kraken"]["BTC/USDT"]["bid"] * (1 - fees["kraken"]["taker"] / 100)
+    value *= 1 - graph.transfer_cost("USDT", "kraken", prices["USDT"])
+    return (value - 1) * 100
+
+class TestVenueGraph(unittest.TestCase):
+    """Testes para a classe VenueGraph."""
+
+    def test_edges_and_transfer_costs(self):
+        """Testa as arestas de negociação e transferência e seus custos."""
+        graph = VenueGraph(transfers=TRANSFERS, latency_penalty=0.02, notional=10000.0)
+        fees = {"binance": {"taker": 0.1}, "kraken": {"taker": 0.26}}
+
+        rates, costs = graph.rates(market_data(), fees)
+
+        # 2 arestas de negociação por exchange e 2 transferências por moeda
+        self.assertEqual(len(rates), 8)
+        self.assertEqual(sum(graph.is_transfer(edge) for edge in range(8)), 4)
+        self.assertEqual(sorted(graph.currencies), ["BTC@binance", "BTC@kraken", "USDT@binance", "USDT@kraken"])
+        btc_price = graph.usd_prices(market_data())["BTC"]
+        self.assertAlmostEqual(graph.transfer_cost("BTC", "binance", btc_price), 0.0002 * btc_price / 10000 + 0.006)
+        self.assertAlmostEqual(graph.transfer_cost("BTC", "kraken", btc_price), 0.0005 * btc_price / 10000 + 0.006)
+        self.assertFalse(graph.sync(market_data()))
+
+    def test_unknown_withdrawal_fee_blocks_transfer(self):
+        """Testa que uma transferência sem taxa de saque conhecida não é usada."""
+        graph = VenueGraph(transfers={"USDT": {"withdrawal_fees": {"binance": 1.0}}})
+        data = market_data()
+
+        rates, costs = graph.rates(data, {"binance": {"taker": 0.1}, "kraken": {"taker": 0.1}})
+
+        steps = [graph.describe(edge, rates, costs) for edge in range(len(rates)) if graph.is_transfer(edge)]
+        self.assertEqual([(s["from"], s["to"]) for s in steps], [("binance", "kraken"), ("kraken", "binance")])
+        self.assertEqual([np.isinf(s["fee"]) for s in steps], [False, True])
+
+class TestCrossExchangeDetection(unittest.TestCase):
+    """Testes para detect_cross_exchange_arbitrage."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.engine = ArbitrageEngine(min_profit_threshold=0.1)
+        self.engine.venue_graph = VenueGraph(transfers=TRANSFERS, latency_penalty=0.02, notional=10000.0)
+
+    def test_finds_route_with_transfers(self):
+        """Testa uma rota que compra BTC na Binance, transfere, vende na Kraken e devolve os USDT."""
+        data = market_data()
+
+        opportunities = self.engine.detect_cross_exchange_arbitrage(data)
+
+        self.assertEqual(len(opportunities), 1)
+        opportunity = opportunities[0]
+        self.assertEqual(opportunity["type"], "cross_exchange")
+        self.assertEqual(opportunity["exchanges"], ["binance", "kraken"])
+        steps = opportunity["steps"]
+        start = [i for i, step in enumerate(steps) if step["action"] == "trade" and step["exchange"] == "binance"][0]
+        steps = steps[start:] + steps[:start]
+        self.assertEqual(
+            [(s["action"], s.get("exchange") or s["asset"], s.get("side")) for s in steps],
+            [("trade", "binance", "buy"), ("transfer", "BTC", None), ("trade", "kraken", "sell"),
+             ("transfer", "USDT", None)],
+        )
+        self.assertEqual((steps[1]["from"], steps[1]["to"]), ("binance", "kraken"))
+        self.assertEqual(steps[1]["minutes"], 30)
+        self.assertAlmostEqual(
+            opportunity["profitPercentage"],
+            route_profit(data, self.engine.exchange_fees, self.engine.venue_graph),
+        )
+
+    def test_transfer_cost_blocks_route(self):
+        """Testa que o custo de transferência elimina uma diferença de preço pequena."""
+        # Diferença de 0,8%: cobre taxas de negociação e saques, mas não a penalidade de latência
+        self.assertEqual(self.engine.detect_cross_exchange_arbitrage(market_data(kraken_bid=50400.0)), [])
+        self.engine.venue_graph = VenueGraph(transfers=TRANSFERS, notional=10000.0)
+        self.assertEqual(len(self.engine.detect_cross_exchange_arbitrage(market_data(kraken_bid=50400.0))), 1)
+
+    def test_ignores_single_exchange_cycles(self):
+        """Testa que ciclos dentro de uma única exchange ficam para os outros detectores."""
+        data = {"binance": {
+            "BTC/USDT": {"bid": 50000.0, "ask": 50010.0},
+            "ETH/USDT": {"bid": 3000.0, "ask": 3001.0},
+            "ETH/BTC": {"bid": 0.0605, "ask": 0.06051},
+        }, "kraken": {"BTC/USDT": {"bid": 50000.0, "ask": 50010.0}}}
+
+        self.assertEqual(len(self.engine.detect_triangular_arbitrage(data, "binance")), 3)
+        self.assertEqual(self.engine.detect_cross_exchange_arbitrage(data), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Testes unitários para o registro de clientes de exchanges.
+"""
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from scripts.connectors.pool import ExchangeClientPool
+from scripts.arbitrage_engine import ArbitrageEngine
+
+def make_client():
+    """Cria um cliente ccxt simulado."""
+    client = MagicMock()
+    client.markets = {}
+    client.has = {}
+    client.load_markets = AsyncMock(return_value={})
+    client.close = AsyncMock()
+    client.fetch_ticker = AsyncMock(return_value={"bid": 100.0, "ask": 101.0, "baseVolume": 5.0})
+    return client
+
+class TestExchangeClientPool(unittest.IsolatedAsyncioTestCase):
+    """Testes para a classe ExchangeClientPool."""
+
+    @patch('scripts.connectors.pool.ccxt')
+    async def test_client_is_reused(self, mock_ccxt):
+        """Testa que o mesmo cliente é reutilizado entre chamadas."""
+        client = make_client()
+        mock_ccxt.binance.return_value = client
+        pool = ExchangeClientPool()
+
+        first = await pool.get('binance')
+        second = await pool.get('binance')
+
+        self.assertIs(first, second)
+        mock_ccxt.binance.assert_called_once()
+        client.load_markets.assert_awaited_once()
+
+    @patch('scripts.connectors.pool.ccxt')
+    async def test_close_closes_all_clients(self, mock_ccxt):
+        """Testa que close fecha todas as sessões abertas."""
+        binance, kraken = make_client(), make_client()
+        mock_ccxt.binance.return_value = binance
+        mock_ccxt.kraken.return_value = kraken
+        pool = ExchangeClientPool()
+
+        await pool.start(['binance', 'kraken'])
+        await pool.close()
+
+        binance.close.assert_awaited_once()
+        kraken.close.assert_awaited_once()
+        self.assertNotIn('binance', pool)
+
+    @patch('scripts.connectors.pool.ccxt')
+    async def test_client_from_other_loop_is_closed(self, mock_ccxt):
+        """Testa que o cliente criado em outro event loop é fechado ao ser substituído."""
+        stale, fresh = make_client(), make_client()
+        stale.close = AsyncMock(side_effect=RuntimeError("Event loop is closed"))
+        mock_ccxt.binance.side_effect = [stale, fresh]
+        pool = ExchangeClientPool()
+        await pool.get('binance')
+        dead_loop = asyncio.new_event_loop()
+        dead_loop.close()
+        pool._loops['binance'] = dead_loop
+
+        with self.assertLogs('scripts.connectors.pool', level='WARNING'):
+            client = await pool.get('binance')
+
+        self.assertIs(client, fresh)
+        stale.close.assert_awaited_once()
+        fresh.close.assert_not_awaited()
+
+    @patch('scripts.connectors.pool.ccxt')
+    async def test_engine_does_not_close_pooled_clients(self, mock_ccxt):
+        """Testa que o motor mantém o cliente aberto entre varreduras."""
+        client = make_client()
+        mock_ccxt.binance.return_value = client
+        engine = ArbitrageEngine()
+
+        await engine.fetch_market_data(['binance'], ['BTC/USDT'])
+        market_data = await engine.fetch_market_data(['binance'], ['BTC/USDT'])
+
+        self.assertEqual(market_data['binance']['BTC/USDT']['bid'], 100.0)
+        mock_ccxt.binance.assert_called_once()
+        client.close.assert_not_awaited()
+
+if __name__ == '__main__':
+    unittest.main()
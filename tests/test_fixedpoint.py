@@ -0,0 +1,67 @@
+"""
+Testes unitários para a aritmética de preços em inteiros escalados (core.fixedpoint).
+"""
+import unittest
+from decimal import Decimal
+import numpy as np
+from core.fixedpoint import (MarketPrecision, fee_ppm, fee_units, from_units, net_profit, precision_decimals,
+                             to_units)
+from scripts.arbitrage_engine import ArbitrageEngine
+
+class TestFixedPoint(unittest.TestCase):
+    """Testes para as funções de core.fixedpoint."""
+
+    def test_precision_modes(self):
+        """Testa a leitura da precisão como tamanho do tick e como casas decimais."""
+        self.assertEqual(precision_decimals(0.01), 2)
+        self.assertEqual(precision_decimals(0.5), 1)
+        self.assertEqual(precision_decimals(1e-08), 8)
+        self.assertEqual(precision_decimals(3), 3)
+        self.assertEqual(precision_decimals(None), 8)
+        self.assertEqual(MarketPrecision.from_market({"precision": {"price": 0.01, "amount": 0.00001}}),
+                         MarketPrecision(2, 5))
+
+    def test_conversion(self):
+        """Testa a conversão exata de e para inteiros escalados."""
+        self.assertEqual(to_units(Decimal("50000.01"), 2), 5000001)
+        self.assertEqual(to_units(0.1 + 0.2, 8), 30000000)
+        self.assertEqual(from_units(5000001, 2), Decimal("50000.01"))
+        np.testing.assert_array_equal(to_units(np.array([0.07, 1.005]), 3), [70, 1005])
+        self.assertEqual(fee_ppm(0.26), 2600)
+
+    def test_fees_round_up_without_overflow(self):
+        """Testa que a taxa é arredondada para cima e que arrays int64 grandes não estouram."""
+        self.assertEqual(fee_units(1001, 1000), 2)
+        notional = np.array([9 * 10 ** 17, 1001], dtype=np.int64)
+        np.testing.assert_array_equal(fee_units(notional, 2600), [9 * 10 ** 17 // 1_000_000 * 2600, 3])
+
+    def test_vectorized_profit_matches_scalar(self):
+        """Testa que o lucro líquido vetorizado é igual ao escalar."""
+        buy = np.array([5000000, 5000100, 300012], dtype=np.int64)
+        sell = np.array([5050000, 5000200, 301000], dtype=np.int64)
+        amount = np.array([10 ** 5, 12345, 7], dtype=np.int64)
+
+        vector = net_profit(buy, sell, amount, 1000, 2600)
+
+        self.assertEqual(vector.tolist(), [net_profit(int(b), int(s), int(a), 1000, 2600)
+                                           for b, s, a in zip(buy, sell, amount)])
+
+    def test_engine_profit_uses_market_precision(self):
+        """Testa que o lucro estimado do detector simples usa a precisão do mercado e taxas exatas."""
+        engine = ArbitrageEngine(min_profit_threshold=0.0)
+        engine.load_market_precisions("binance", {"BTC/USDT": {"precision": {"price": 0.01, "amount": 0.00001}}})
+        engine.load_market_precisions("kraken", {"BTC/USDT": {"precision": {"price": 0.1, "amount": 0.0001}}})
+        market_data = {
+            "binance": {"BTC/USDT": {"bid": 50000.0, "ask": 50000.01}},
+            "kraken": {"BTC/USDT": {"bid": 50500.1, "ask": 50510.0}},
+        }
+
+        opportunity = engine.detect_simple_arbitrage(market_data)[0]
+
+        # Venda de 50500.1 com 0,26% e compra de 50000.01 com 0,1%, em 10**-7
+        expected = Decimal("50500.1") * Decimal("0.9974") - Decimal("50000.01") * Decimal("1.001")
+        self.assertEqual(engine.market_precision("binance", "BTC/USDT"), MarketPrecision(2, 5))
+        self.assertEqual(opportunity.estimated_profit, float(expected))
+
+if __name__ == '__main__':
+    unittest.main()
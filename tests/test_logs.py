@@ -0,0 +1,98 @@
+"""
+Testes unitários para o pipeline de logs em fila (core.logs).
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from core.logs import CallSiteRateLimiter, configure_logging, get_logger, shutdown_logging
+
+def record(level=logging.INFO, lineno=10):
+    """LogRecord de um ponto de chamada fixo."""
+    return logging.LogRecord("teste", level, "arquivo.py", lineno, "mensagem %s", (1,), None)
+
+class TestCallSiteRateLimiter(unittest.TestCase):
+    """Testes para a classe CallSiteRateLimiter."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.now = 0.0
+        self.limiter = CallSiteRateLimiter(rate=1.0, burst=3, clock=lambda: self.now)
+
+    def test_limits_each_call_site(self):
+        """Testa o limite por ponto de chamada e a contagem de descartados."""
+        passed = [self.limiter.filter(record()) for _ in range(10)]
+        other_site = self.limiter.filter(record(lineno=11))
+        self.now = 2.0
+        after = [record(), record(), record()]
+        allowed = [self.limiter.filter(r) for r in after]
+
+        self.assertEqual(passed, [True] * 3 + [False] * 7)
+        self.assertTrue(other_site)
+        self.assertEqual(allowed, [True, True, False])
+        self.assertEqual(after[0].suppressed, 7)
+        self.assertFalse(hasattr(after[1], "suppressed"))
+
+    def test_warnings_are_not_limited(self):
+        """Testa que avisos e erros sempre passam."""
+        self.assertTrue(all(self.limiter.filter(record(logging.WARNING)) for _ in range(10)))
+
+    def test_sampling(self):
+        """Testa que amostras dos registros excedentes são mantidas e marcadas."""
+        limiter = CallSiteRateLimiter(rate=0.0, burst=0, sample_rate=1.0, clock=lambda: self.now)
+        sample = record()
+
+        self.assertTrue(limiter.filter(sample))
+        self.assertTrue(sample.sampled)
+
+class TestQueuePipeline(unittest.TestCase):
+    """Testes para configure_logging."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.directory.name, "arbitron.log")
+        self.root_handlers = logging.getLogger().handlers[:]
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        shutdown_logging()
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in self.root_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.root_level)
+        self.directory.cleanup()
+
+    def read(self):
+        with open(self.log_file) as f:
+            return [json.loads(line) for line in f]
+
+    def test_formats_on_listener_thread(self):
+        """Testa que os argumentos são formatados na thread do listener e gravados em JSON."""
+        configure_logging(log_file=self.log_file, console=False, burst=2, rate=0.0)
+        threads = []
+
+        class Probe:
+            def __str__(self):
+                threads.append(threading.current_thread())
+                return "sonda"
+
+        for _ in range(5):
+            logging.getLogger("scripts.teste").info("Oportunidade: %s", Probe())
+        get_logger("scripts.teste").info("evento", par="BTC/USDT")
+        shutdown_logging()
+
+        lines = self.read()
+        self.assertEqual([line["event"] for line in lines], ["Oportunidade: sonda"] * 2 + ["evento"])
+        self.assertEqual(lines[0]["level"], "info")
+        self.assertEqual(lines[0]["logger"], "scripts.teste")
+        self.assertEqual(lines[2]["par"], "BTC/USDT")
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+if __name__ == '__main__':
+    unittest.main()
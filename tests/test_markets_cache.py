@@ -0,0 +1,93 @@
+"""
+Testes unitários para o cache em disco de mercados.
+"""
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from scripts.connectors.markets_cache import MarketMetadataCache
+
+MARKETS = {"BTC/USDT": {"id": "BTCUSDT", "symbol": "BTC/USDT", "base": "BTC", "quote": "USDT",
+                        "precision": {"price": 0.01, "amount": 0.00001}}}
+CURRENCIES = {"BTC": {"id": "BTC", "code": "BTC"}, "USDT": {"id": "USDT", "code": "USDT"}}
+
+def make_exchange():
+    """Cria uma instância ccxt simulada."""
+    exchange = MagicMock()
+    exchange.id = "binance"
+    exchange.markets = None
+    exchange.currencies = None
+
+    async def load_markets(reload=False):
+        exchange.markets, exchange.currencies = MARKETS, CURRENCIES
+        return MARKETS
+
+    def set_markets(markets, currencies=None):
+        exchange.markets, exchange.currencies = markets, currencies
+
+    exchange.load_markets = AsyncMock(side_effect=load_markets)
+    exchange.set_markets = MagicMock(side_effect=set_markets)
+    return exchange
+
+class TestMarketMetadataCache(unittest.IsolatedAsyncioTestCase):
+    """Testes para a classe MarketMetadataCache."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = MarketMetadataCache(directory=self.tmp.name, ttl=60)
+
+    def tearDown(self):
+        """Remove o diretório temporário."""
+        self.tmp.cleanup()
+
+    async def test_cold_start_loads_and_writes(self):
+        """Testa que sem cache os mercados vêm da exchange e são gravados."""
+        exchange = make_exchange()
+
+        await self.cache.load_markets(exchange)
+
+        exchange.load_markets.assert_awaited_once()
+        self.assertEqual(self.cache.read("binance")["markets"], MARKETS)
+
+    async def test_warm_start_skips_network(self):
+        """Testa que um cache válido é aplicado sem consultar a exchange."""
+        self.cache.write("binance", MARKETS, CURRENCIES)
+        exchange = make_exchange()
+
+        markets = await self.cache.load_markets(exchange)
+
+        self.assertEqual(markets, MARKETS)
+        exchange.load_markets.assert_not_awaited()
+        exchange.set_markets.assert_called_once_with(MARKETS, CURRENCIES)
+
+    async def test_stale_cache_refreshes_in_background(self):
+        """Testa que um cache vencido é usado e recarregado em segundo plano."""
+        self.cache.write("binance", MARKETS, CURRENCIES)
+        path = self.cache.path("binance")
+        with open(path) as f:
+            entry = json.load(f)
+        entry["saved_at"] = time.time() - 3600
+        with open(path, "w") as f:
+            json.dump(entry, f)
+        exchange = make_exchange()
+
+        await self.cache.load_markets(exchange)
+        exchange.set_markets.assert_called_once()
+        await self.cache._refreshes["binance"]
+
+        exchange.load_markets.assert_awaited_once_with(reload=True)
+        self.assertTrue(self.cache.is_fresh(self.cache.read("binance")))
+
+    def test_version_mismatch_is_ignored(self):
+        """Testa que arquivos de outra versão do formato são descartados."""
+        os.makedirs(self.tmp.name, exist_ok=True)
+        with open(self.cache.path("binance"), "w") as f:
+            json.dump({"version": -1, "markets": MARKETS}, f)
+
+        self.assertIsNone(self.cache.read("binance"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Testes unitários para os livros de ofertas L2 locais.
+"""
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock
+from scripts.feeds.orderbook import BinanceDepthFeed, BookSide, OrderBook, OrderBookManager, SequenceGap
+from scripts.feeds.stream import QuoteTable
+
+class TestBookSide(unittest.TestCase):
+    """Testes para a classe BookSide."""
+
+    def test_bids_sorted_best_first(self):
+        """Testa a ordenação dos bids do maior para o menor preço."""
+        side = BookSide(is_bid=True)
+        side.load([["100.0", "1"], ["101.0", "2"], ["99.5", "3"]])
+
+        self.assertEqual(side.best(), (101.0, 2.0))
+        self.assertEqual([price for price, _ in side.top()], [101.0, 100.0, 99.5])
+
+    def test_asks_sorted_best_first(self):
+        """Testa a ordenação dos asks do menor para o maior preço."""
+        side = BookSide(is_bid=False)
+        side.load([[102.0, 1.0], [101.5, 2.0], [103.0, 1.0]])
+
+        self.assertEqual(side.best(), (101.5, 2.0))
+        self.assertEqual(side.top(2), [(101.5, 2.0), (102.0, 1.0)])
+
+    def test_update_insert_change_delete(self):
+        """Testa inserção, alteração e remoção de níveis."""
+        side = BookSide(is_bid=True)
+        side.load([[100.0, 1.0]])
+
+        side.update(100.5, 2.0)
+        side.update(100.0, 4.0)
+        side.update(100.5, 0)
+
+        self.assertEqual(side.top(), [(100.0, 4.0)])
+
+class TestOrderBook(unittest.TestCase):
+    """Testes para a classe OrderBook."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.book = OrderBook("binance", "BTC/USDT")
+        self.book.apply_snapshot([[100.0, 1.0]], [[101.0, 1.0]], sequence=10)
+
+    def test_stale_diff_is_ignored(self):
+        """Testa que atualizações já contidas no snapshot são ignoradas."""
+        applied = self.book.apply_diff([[100.0, 0]], [], 5, 10)
+
+        self.assertFalse(applied)
+        self.assertEqual(self.book.best_bid(), (100.0, 1.0))
+
+    def test_overlapping_diff_is_applied(self):
+        """Testa a primeira atualização que cobre o ID do snapshot."""
+        self.assertTrue(self.book.apply_diff([[100.5, 3.0]], [], 8, 12))
+        self.assertEqual(self.book.best_bid(), (100.5, 3.0))
+        self.assertEqual(self.book.sequence, 12)
+
+    def test_gap_marks_book_unsynced(self):
+        """Testa a detecção de lacuna de sequência."""
+        with self.assertRaises(SequenceGap):
+            self.book.apply_diff([], [[100.8, 1.0]], 12, 13)
+        self.assertFalse(self.book.synced)
+
+class TestOrderBookManager(unittest.IsolatedAsyncioTestCase):
+    """Testes para a classe OrderBookManager."""
+
+    async def test_gap_triggers_resync_and_replay(self):
+        """Testa que a lacuna busca um snapshot e reaplica o buffer."""
+        fetcher = AsyncMock(return_value={"bids": [[100.0, 1.0]], "asks": [[101.0, 1.0]], "nonce": 20})
+        manager = OrderBookManager(snapshot_fetcher=fetcher)
+        manager.apply_snapshot("binance", "BTC/USDT", [[99.0, 1.0]], [[102.0, 1.0]], 10)
+
+        manager.apply_diff("binance", "BTC/USDT", [[100.2, 2.0]], [], 15, 21)
+        self.assertIsNone(manager.get("binance", "BTC/USDT"))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        book = manager.get("binance", "BTC/USDT")
+        fetcher.assert_awaited_once_with("binance", "BTC/USDT")
+        self.assertIsNotNone(book)
+        self.assertEqual(book.best_bid(), (100.2, 2.0))
+        self.assertEqual(book.sequence, 21)
+
+    async def test_depth_feed_skips_malformed_update(self):
+        """Testa que uma atualização de profundidade incompleta é descartada sem derrubar o stream."""
+        table = QuoteTable()
+        manager = OrderBookManager()
+        manager.apply_snapshot("binance", "BTC/USDT", [[99.0, 1.0]], [[102.0, 1.0]], 10)
+        feed = BinanceDepthFeed(table, ["BTC/USDT"], manager)
+
+        with self.assertLogs("scripts.feeds.stream", level="WARNING"):
+            feed.handle(json.dumps({"e": "depthUpdate", "s": "BTCUSDT", "b": [], "a": []}))
+        feed.handle(json.dumps({"e": "depthUpdate", "s": "BTCUSDT", "b": [["100.0", "1.0"]], "a": [], "U": 11, "u": 11}))
+
+        self.assertEqual(table.get("binance", "BTC/USDT")["bid"], 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Testes unitários para o gravador de diários de mercado.
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from scripts.feeds.recorder import (
+    DIFF, INDEX_SUFFIX, JOURNAL_SUFFIX, SNAPSHOT, TICKER, JournalReader, MarketDataRecorder
+)
+from scripts.feeds.orderbook import OrderBookManager
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.backtesting.backtest import BacktestEngine
+
+# 2025-01-01 00:00:00 UTC
+DAY = 1735689600.0
+
+def quote(bid, ask, received):
+    """Cria uma cotação no formato de fetch_market_data."""
+    return {"bid": bid, "ask": ask, "volume": 10.0, "timestamp": received - 0.05, "received": received}
+
+class TestMarketDataRecorder(unittest.IsolatedAsyncioTestCase):
+    """Testes para as classes MarketDataRecorder e JournalReader."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.recorder = MarketDataRecorder(directory=self.tmp.name, block_records=10, flush_interval=0.01)
+        self.reader = JournalReader(self.tmp.name)
+
+    async def asyncTearDown(self):
+        """Encerra o gravador e remove o diretório temporário."""
+        await self.recorder.close()
+        self.tmp.cleanup()
+
+    async def test_round_trip(self):
+        """Testa que as cotações gravadas são lidas de volta em ordem."""
+        for i in range(25):
+            self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0 + i, 101.0 + i, DAY + i))
+
+        await self.recorder.flush()
+
+        records = list(self.reader.read("binance"))
+        self.assertEqual(len(records), 25)
+        self.assertEqual(records[0][:5], [TICKER, DAY, "BTC/USDT", 100.0, 101.0])
+        self.assertAlmostEqual(records[0][6], DAY - 0.05)
+        self.assertEqual([r[1] for r in records], [DAY + i for i in range(25)])
+        self.assertEqual(self.recorder.records_written, 25)
+
+    async def test_blocks_are_compressed_and_indexed(self):
+        """Testa que cada bloco comprimido tem uma entrada no índice."""
+        for i in range(25):
+            self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY + i))
+        await self.recorder.flush()
+
+        path = os.path.join(self.tmp.name, "2025-01-01", "binance" + JOURNAL_SUFFIX)
+        blocks = self.reader.blocks(path)
+
+        self.assertEqual([count for *_, count in blocks], [10, 10, 5])
+        self.assertEqual(blocks[1][:2], (DAY + 10, DAY + 19))
+        self.assertLess(os.path.getsize(path), 25 * 60)
+
+    async def test_time_range_uses_index(self):
+        """Testa que a leitura por período retorna apenas os registros do intervalo."""
+        for i in range(30):
+            self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY + i))
+        await self.recorder.flush()
+
+        records = list(self.reader.read("binance", start=DAY + 12, end=DAY + 14))
+
+        self.assertEqual([r[1] for r in records], [DAY + 12, DAY + 13, DAY + 14])
+
+    async def test_journal_without_index_is_scanned(self):
+        """Testa que blocos sem entrada no índice são encontrados pelos cabeçalhos."""
+        for i in range(15):
+            self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY + i))
+        await self.recorder.flush()
+        os.remove(os.path.join(self.tmp.name, "2025-01-01", "binance" + INDEX_SUFFIX))
+
+        self.assertEqual(len(list(self.reader.read("binance"))), 15)
+
+    async def test_files_split_by_day_and_exchange(self):
+        """Testa que há um diário por dia UTC e por exchange."""
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY - 1))
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY + 1))
+        self.recorder.record_ticker("kraken", "BTC/USDT", quote(100.0, 101.0, DAY + 1))
+        await self.recorder.flush()
+
+        self.assertEqual(self.reader.days(), ["2024-12-31", "2025-01-01"])
+        self.assertEqual(self.reader.exchanges(), ["binance", "kraken"])
+        self.assertEqual([r[1] for r in self.reader.read("binance", start=DAY)], [DAY + 1])
+
+    async def test_replay_merges_exchanges_by_time(self):
+        """Testa que o replay intercala as exchanges pela hora de recebimento."""
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY + 1))
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY + 3))
+        self.recorder.record_ticker("kraken", "BTC/USDT", quote(100.0, 101.0, DAY + 2))
+        await self.recorder.flush()
+
+        replayed = [(exchange_id, record[1]) for exchange_id, record in self.reader.replay()]
+
+        self.assertEqual(replayed, [("binance", DAY + 1), ("kraken", DAY + 2), ("binance", DAY + 3)])
+
+    async def test_order_book_updates_rebuild_top_of_book(self):
+        """Testa que snapshots e atualizações de livro reconstroem o topo no replay."""
+        books = OrderBookManager(recorder=self.recorder)
+        books.apply_snapshot("binance", "BTC/USDT", [[100.0, 1.0]], [[101.0, 1.0]], 10)
+        books.apply_diff("binance", "BTC/USDT", [[100.5, 2.0]], [], 11, 11)
+        await self.recorder.flush()
+
+        kinds = [record[0] for record in self.reader.read("binance")]
+        snapshots = list(self.reader.snapshots(["binance"], interval=60))
+
+        self.assertEqual(kinds, [SNAPSHOT, DIFF])
+        self.assertEqual(snapshots[-1][1]["binance"]["BTC/USDT"]["bid"], 100.5)
+        self.assertEqual(snapshots[-1][1]["binance"]["BTC/USDT"]["ask"], 101.0)
+
+    async def test_snapshots_emitted_per_interval(self):
+        """Testa que o replay emite o estado do mercado a cada intervalo."""
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY))
+        self.recorder.record_ticker("kraken", "BTC/USDT", quote(102.0, 103.0, DAY + 0.5))
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(104.0, 105.0, DAY + 2.5))
+        await self.recorder.flush()
+
+        snapshots = list(self.reader.snapshots(interval=1.0))
+
+        self.assertEqual([ts for ts, _ in snapshots], [DAY + 1, DAY + 3])
+        self.assertEqual(snapshots[0][1]["kraken"]["BTC/USDT"]["bid"], 102.0)
+        self.assertEqual(snapshots[0][1]["binance"]["BTC/USDT"]["bid"], 100.0)
+        self.assertEqual(snapshots[1][1]["binance"]["BTC/USDT"]["bid"], 104.0)
+
+    async def test_journal_gap_emits_one_snapshot(self):
+        """Testa que uma lacuna no diário gera um único snapshot e retoma na fronteira seguinte."""
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY))
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(102.0, 103.0, DAY + 0.5))
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(104.0, 105.0, DAY + 3600.5))
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(106.0, 107.0, DAY + 3601.5))
+        await self.recorder.flush()
+
+        snapshots = list(self.reader.snapshots(interval=1.0))
+
+        self.assertEqual([ts for ts, _ in snapshots], [DAY + 1, DAY + 3601, DAY + 3602])
+        self.assertEqual([data["binance"]["BTC/USDT"]["bid"] for _, data in snapshots], [102.0, 104.0, 106.0])
+
+    async def test_periodic_flush(self):
+        """Testa que a task de fundo grava o buffer sem chamada explícita."""
+        self.recorder.start()
+        self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 101.0, DAY))
+
+        await self.recorder.close()
+
+        self.assertEqual(len(list(self.reader.read("binance"))), 1)
+
+    async def test_engine_tees_fetched_tickers(self):
+        """Testa que os tickers buscados pelo motor são enviados ao gravador."""
+        engine = ArbitrageEngine(client_pool=MagicMock())
+        engine.client_pool.get = AsyncMock(return_value=MagicMock(has={}))
+        engine.fetch_exchange_tickers = AsyncMock(return_value=({"BTC/USDT": quote(100.0, 101.0, DAY)}, "per_pair"))
+        engine._schedule_clock_sync = MagicMock()
+        engine.recorder = self.recorder
+
+        await engine.fetch_market_data(["binance"], ["BTC/USDT"])
+        await self.recorder.flush()
+
+        self.assertEqual([r[3] for r in self.reader.read("binance")], [100.0])
+
+    async def test_backtest_replays_journal(self):
+        """Testa que o backtest usa os diários gravados em vez de preços simulados."""
+        for i in range(5):
+            self.recorder.record_ticker("binance", "BTC/USDT", quote(100.0, 100.1, DAY + i))
+            self.recorder.record_ticker("kraken", "BTC/USDT", quote(102.0, 102.1, DAY + i))
+        await self.recorder.flush()
+
+        backtest = BacktestEngine(["binance", "kraken"], ["BTC/USDT"], datetime(2025, 1, 1),
+                                  datetime(2025, 1, 1, 0, 1), 1000, journal_dir=self.tmp.name)
+        result = await backtest.run()
+
+        self.assertEqual(result["total_trades"], 5)
+        self.assertTrue(all(t["buy_exchange"] == "binance" for t in result["trades"]))
+
+if __name__ == '__main__':
+    unittest.main()
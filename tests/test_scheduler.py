@@ -0,0 +1,91 @@
+"""
+Testes unitários para o agendador adaptativo de consultas.
+"""
+import unittest
+from scripts.feeds.scheduler import PollingScheduler, best_net_spreads
+
+def quotes(bid, ask, volume=10.0):
+    """Cria os dados de preço de um par."""
+    return {"bid": bid, "ask": ask, "volume": volume}
+
+class TestBestNetSpreads(unittest.TestCase):
+    """Testes para a função best_net_spreads."""
+
+    def test_spread_uses_taker_fees(self):
+        """Testa o spread líquido entre a melhor venda e a melhor compra."""
+        market_data = {
+            "binance": {"BTC/USDT": quotes(100.0, 100.0)},
+            "kraken": {"BTC/USDT": quotes(102.0, 102.0), "ETH/USDT": quotes(10.0, 10.0)},
+        }
+        fees = {"binance": {"taker": 0.0}, "kraken": {"taker": 0.0}}
+
+        spreads = best_net_spreads(market_data, fees)
+
+        self.assertAlmostEqual(spreads["BTC/USDT"], 2.0)
+        self.assertNotIn("ETH/USDT", spreads)
+
+class TestPollingScheduler(unittest.TestCase):
+    """Testes para a classe PollingScheduler."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.scheduler = PollingScheduler(budgets={"binance": 2.0}, threshold=0.5, min_interval=0.1, max_interval=100)
+        self.pairs = ["BTC/USDT", "DOGE/USDT"]
+
+    def test_first_call_polls_everything(self):
+        """Testa que todos os pares são consultados na primeira chamada."""
+        due = self.scheduler.due(["binance"], self.pairs, now=0.0)
+
+        self.assertEqual(due, {"binance": self.pairs})
+        self.assertEqual(self.scheduler.due(["binance"], self.pairs, now=0.1), {})
+
+    def test_budget_favours_pairs_near_threshold(self):
+        """Testa que pares próximos do limiar recebem mais orçamento."""
+        self.scheduler.due(["binance"], self.pairs, now=0.0)
+        market_data = {"binance": {"BTC/USDT": quotes(1.0, 1.0), "DOGE/USDT": quotes(1.0, 1.0)}}
+        for spread in (0.4, 0.45, 0.4):
+            self.scheduler.observe(market_data, {"BTC/USDT": spread, "DOGE/USDT": -2.0})
+
+        rates = self.scheduler.refresh_rates()["binance"]
+
+        self.assertGreater(rates["BTC/USDT"], rates["DOGE/USDT"])
+        self.assertAlmostEqual(sum(rates.values()), 2.0)
+
+    def test_illiquid_pairs_polled_less(self):
+        """Testa que pares sem volume recebem menos orçamento."""
+        self.scheduler.due(["binance"], self.pairs, now=0.0)
+        market_data = {"binance": {"BTC/USDT": quotes(1.0, 1.0), "DOGE/USDT": quotes(1.0, 1.0, volume=0)}}
+        self.scheduler.observe(market_data, {})
+
+        rates = self.scheduler.refresh_rates()["binance"]
+
+        self.assertLess(rates["DOGE/USDT"], rates["BTC/USDT"])
+
+    def test_rates_stay_within_budget(self):
+        """Testa que, com muitos pares e orçamento pequeno, os limites de intervalo não estouram o orçamento."""
+        scheduler = PollingScheduler(budgets={"binance": 1.0}, threshold=0.5, min_interval=1.0, max_interval=60.0)
+        pairs = [f"P{i}/USDT" for i in range(50)]
+        scheduler.due(["binance"], pairs, now=0.0)
+        market_data = {"binance": {pair: quotes(1.0, 1.0) for pair in pairs}}
+        spreads = {pair: -5.0 for pair in pairs}
+        spreads.update({"P0/USDT": 0.49, "P1/USDT": 0.45})
+        for _ in range(3):
+            scheduler.observe(market_data, spreads)
+
+        rates = scheduler.refresh_rates()["binance"]
+
+        self.assertLessEqual(sum(rates.values()), 1.0 + 1e-9)
+        self.assertTrue(all(1 / 60.0 - 1e-12 <= rate <= 1.0 for rate in rates.values()))
+        self.assertGreater(rates["P0/USDT"], rates["P2/USDT"])
+
+    def test_floors_above_budget_warn(self):
+        """Testa o aviso quando nem o intervalo máximo cabe no orçamento."""
+        scheduler = PollingScheduler(budgets={"binance": 1.0}, threshold=0.5, max_interval=10.0)
+
+        with self.assertLogs("scripts.feeds.scheduler", level="WARNING"):
+            scheduler.due(["binance"], [f"P{i}/USDT" for i in range(20)], now=0.0)
+
+        self.assertEqual(set(scheduler.refresh_rates()["binance"].values()), {0.1})
+
+if __name__ == '__main__':
+    unittest.main()
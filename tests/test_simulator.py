@@ -0,0 +1,141 @@
+"""
+Testes do simulador local de exchanges com os drivers ccxt e os streams reais.
+"""
+import asyncio
+import unittest
+import ccxt.async_support as ccxt
+from scripts.arbitrage_engine import ArbitrageEngine
+from scripts.connectors.pool import ExchangeClientPool
+from scripts.feeds.stream import BinanceBookTickerFeed, KrakenTickerFeed, QuoteTable
+from scripts.simulator.exchange import ExchangeSimulator
+
+PAIRS = ["BTC/USDT", "ETH/USDT"]
+
+class TestExchangeSimulator(unittest.IsolatedAsyncioTestCase):
+    """Testes para a classe ExchangeSimulator."""
+
+    async def asyncSetUp(self):
+        """Configuração inicial para os testes."""
+        self.simulator = ExchangeSimulator(port=0, message_rate=50, seed=7)
+        await self.simulator.start()
+        self.clients = []
+
+    async def asyncTearDown(self):
+        """Fecha os clientes e o simulador."""
+        for client in self.clients:
+            await client.close()
+        await self.simulator.stop()
+
+    def client(self, exchange_id):
+        """Cria um cliente ccxt apontado para o simulador."""
+        client = getattr(ccxt, exchange_id)(dict(self.simulator.ccxt_options(exchange_id), enableRateLimit=False))
+        self.clients.append(client)
+        return client
+
+    async def test_ccxt_drivers_load_markets_and_tickers(self):
+        """Testa que os drivers ccxt da Binance e da Kraken entendem as respostas simuladas."""
+        for exchange_id in ("binance", "kraken"):
+            client = self.client(exchange_id)
+
+            markets = await client.load_markets()
+            tickers = await client.fetch_tickers(PAIRS)
+            book = await client.fetch_order_book("BTC/USDT", 5)
+
+            self.assertIn("ETH/BTC", markets)
+            self.assertEqual(set(tickers), set(PAIRS))
+            self.assertLess(tickers["BTC/USDT"]["bid"], tickers["BTC/USDT"]["ask"])
+            self.assertEqual(len(book["bids"]), 5)
+            self.assertGreater(book["bids"][0][0], book["bids"][1][0])
+
+    async def test_bids_asks_and_server_time(self):
+        """Testa o endpoint bookTicker e a hora do servidor da Binance."""
+        client = self.client("binance")
+        await client.load_markets()
+
+        bids_asks = await client.fetch_bids_asks(PAIRS)
+        server_time = await client.fetch_time()
+
+        self.assertEqual(set(bids_asks), set(PAIRS))
+        self.assertGreater(server_time, 0)
+
+    async def test_injected_rate_limit_and_errors(self):
+        """Testa que 429 e 503 injetados chegam ao ccxt como exceções de rede."""
+        self.simulator.rate_limit_rate = 1.0
+        client = self.client("binance")
+        with self.assertRaises(ccxt.DDoSProtection):
+            await client.fetch_time()
+
+        self.simulator.rate_limit_rate = 0.0
+        self.simulator.error_rate = 1.0
+        with self.assertRaises(ccxt.ExchangeNotAvailable):
+            await client.fetch_time()
+        self.assertEqual(self.simulator.stats["rate_limited"], 1)
+        self.assertEqual(self.simulator.stats["errors"], 1)
+
+    async def test_requests_per_second_limit(self):
+        """Testa que requisições acima do limite por segundo recebem 429."""
+        self.simulator.requests_per_second = 2
+        client = self.client("kraken")
+
+        results = await asyncio.gather(*(client.fetch_time() for _ in range(4)), return_exceptions=True)
+
+        self.assertEqual(sum(isinstance(r, ccxt.DDoSProtection) for r in results), 2)
+
+    async def test_engine_scans_simulator(self):
+        """Testa uma varredura completa do motor contra o simulador."""
+        pool = ExchangeClientPool(options={"enableRateLimit": False}, exchange_options={
+            exchange_id: self.simulator.ccxt_options(exchange_id) for exchange_id in ("binance", "kraken")
+        })
+        engine = ArbitrageEngine(client_pool=pool)
+        try:
+            await engine.start(["binance", "kraken"])
+            market_data = await engine.fetch_market_data(["binance", "kraken"], PAIRS)
+        finally:
+            await engine.close()
+
+        self.assertEqual(market_data.missing, [])
+        self.assertEqual(set(market_data["kraken"]), set(PAIRS))
+        self.assertEqual(engine.fetch_strategies["binance"], "bulk_tickers")
+
+    async def test_streams_receive_quotes(self):
+        """Testa que os streams de ticker da Binance e da Kraken recebem cotações do simulador."""
+        table = QuoteTable()
+        feeds = [
+            BinanceBookTickerFeed(table, PAIRS, url=self.simulator.ws_url("binance")),
+            KrakenTickerFeed(table, PAIRS, url=self.simulator.ws_url("kraken")),
+        ]
+        for feed in feeds:
+            feed.start()
+        try:
+            for _ in range(50):
+                if len(table.snapshot(pairs=PAIRS).get("kraken", {})) == 2 and table.get("binance", "ETH/USDT"):
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            for feed in feeds:
+                await feed.stop()
+
+        self.assertIsNotNone(table.get("binance", "BTC/USDT"))
+        self.assertIsNotNone(table.get("kraken", "ETH/USDT"))
+
+    async def test_depth_stream_builds_local_book(self):
+        """Testa que o livro local acompanha o livro simulado via snapshot + atualizações."""
+        pool = ExchangeClientPool(options={"enableRateLimit": False},
+                                  exchange_options={"binance": self.simulator.ccxt_options("binance")})
+        engine = ArbitrageEngine(client_pool=pool)
+        engine.feed_urls["binance"] = self.simulator.ws_url("binance")
+        try:
+            await engine.start_order_books(["binance"], ["BTC/USDT"])
+            for _ in range(50):
+                if engine.order_books.get("binance", "BTC/USDT") is not None:
+                    break
+                await asyncio.sleep(0.05)
+            book = engine.order_books.get("binance", "BTC/USDT")
+            simulated = self.simulator.books[("binance", "BTC/USDT")]
+            self.assertIsNotNone(book)
+            self.assertLessEqual(abs(book.sequence - simulated.update_id), 1)
+        finally:
+            await engine.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Testes do stream de cotações contra um servidor WebSocket local.
+"""
+import asyncio
+import json
+import unittest
+import websockets
+from scripts.feeds.stream import QuoteTable, BinanceBookTickerFeed, KrakenTickerFeed
+
+BOOK_TICKERS = [
+    {"u": 1, "s": "BTCUSDT", "b": "50000.00", "B": "1.0", "a": "50001.00", "A": "2.0"},
+    {"u": 2, "s": "ETHUSDT", "b": "3000.00", "B": "5.0", "a": "3000.50", "A": "4.0"},
+]
+
+class ReplayServer:
+    """Servidor WebSocket local que reenvia mensagens gravadas e fecha a conexão."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.subscriptions = []
+
+    async def handler(self, ws, *args):
+        self.subscriptions.append(json.loads(await ws.recv()))
+        for message in self.messages:
+            await ws.send(json.dumps(message))
+        await ws.close()
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = list(self.server.sockets)[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+async def wait_until(predicate, timeout=5.0):
+    """Aguarda até que a condição seja verdadeira."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condição não atingida a tempo")
+        await asyncio.sleep(0.01)
+
+class TestWebSocketFeed(unittest.IsolatedAsyncioTestCase):
+    """Testes para os streams WebSocket."""
+
+    async def test_quotes_reach_table(self):
+        """Testa que as cotações recebidas chegam à tabela."""
+        table = QuoteTable()
+        async with ReplayServer(BOOK_TICKERS) as server:
+            feed = BinanceBookTickerFeed(table, ["BTC/USDT", "ETH/USDT"], url=server.url)
+            feed.start()
+            await wait_until(lambda: table.get("binance", "ETH/USDT") is not None)
+            await feed.stop()
+
+        self.assertEqual(table.get("binance", "BTC/USDT")["bid"], 50000.0)
+        self.assertEqual(table.get("binance", "ETH/USDT")["ask"], 3000.5)
+        self.assertEqual(server.subscriptions[0]["params"], ["btcusdt@bookTicker", "ethusdt@bookTicker"])
+
+    async def test_reconnect_and_resubscribe(self):
+        """Testa que o stream reconecta e refaz a assinatura."""
+        table = QuoteTable()
+        async with ReplayServer(BOOK_TICKERS[:1]) as server:
+            feed = BinanceBookTickerFeed(table, ["BTC/USDT"], url=server.url, reconnect_delay=0.01)
+            feed.start()
+            await wait_until(lambda: len(server.subscriptions) >= 2)
+            await feed.stop()
+
+        self.assertGreaterEqual(feed.connections, 2)
+        self.assertEqual(server.subscriptions[0], server.subscriptions[1])
+
+    async def test_snapshot_matches_market_data_shape(self):
+        """Testa o formato exchange -> par -> dados de preço do snapshot."""
+        table = QuoteTable()
+        feed = KrakenTickerFeed(table, ["BTC/USD"])
+        feed.handle(json.dumps({
+            "channel": "ticker", "type": "snapshot",
+            "data": [{"symbol": "BTC/USD", "bid": 49990.0, "ask": 50010.0, "volume": 12.5}],
+        }))
+
+        snapshot = table.snapshot(["kraken"], ["BTC/USD"])
+
+        self.assertEqual(snapshot["kraken"]["BTC/USD"]["bid"], 49990.0)
+        self.assertEqual(snapshot["kraken"]["BTC/USD"]["volume"], 12.5)
+
+    async def test_malformed_message_is_skipped(self):
+        """Testa que uma mensagem com campos inválidos é descartada sem derrubar o stream."""
+        table = QuoteTable()
+        feed = BinanceBookTickerFeed(table, ["BTC/USDT"])
+
+        with self.assertLogs("scripts.feeds.stream", level="WARNING"):
+            feed.handle(json.dumps({"s": "BTCUSDT", "b": "abc", "a": "50001.0"}))
+        feed.handle(json.dumps({"s": "BTCUSDT", "b": "50000.0", "a": "50001.0"}))
+
+        self.assertEqual(table.get("binance", "BTC/USDT")["bid"], 50000.0)
+
+    async def test_wait_for_update(self):
+        """Testa que wait_for_update acorda com uma nova cotação."""
+        table = QuoteTable()
+        asyncio.get_running_loop().call_later(0.01, table.update, "binance", "BTC/USDT", 1.0, 2.0)
+
+        self.assertTrue(await table.wait_for_update(1.0))
+        self.assertFalse(await table.wait_for_update(0.01))
+
+if __name__ == '__main__':
+    unittest.main()